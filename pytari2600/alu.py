@@ -0,0 +1,145 @@
+""" Precomputed 6502 ALU tables.
+
+    Results and status flags for ADC, SBC (binary and decimal) are indexed
+    by (carry << 16) | (a << 8) | b, compare flags by (a << 8) | b.
+
+    Add/subtract entries hold 'result | (flags << 8)', where 'flags' has the
+    N, V, Z and C bits in their status register positions. Compare entries
+    only hold the N, Z and C bits.
+
+    The tables are built once per process and shared by all cores. They
+    are also saved to the cache directory, as loading is much faster than
+    rebuilding them.
+"""
+
+import array
+import sys
+from . import cache
+
+# Bump if the table contents change, to ignore older cache files.
+VERSION = 1
+
+N_FLAG = 0x80
+V_FLAG = 0x40
+Z_FLAG = 0x02
+C_FLAG = 0x01
+
+# Status bits updated by add/subtract, and by compare.
+ADD_SUB_FLAGS = N_FLAG | V_FLAG | Z_FLAG | C_FLAG
+CMP_FLAGS     = N_FLAG | Z_FLAG | C_FLAG
+
+ADD_SUB_ENTRIES = 0x20000
+CMP_ENTRIES     = 0x10000
+
+class ALUTables(object):
+    def __init__(self, adc, sbc, adc_decimal, sbc_decimal, cmp):
+        self.adc         = adc
+        self.sbc         = sbc
+        self.adc_decimal = adc_decimal
+        self.sbc_decimal = sbc_decimal
+        self.cmp         = cmp
+
+_tables = None
+
+def get_tables():
+    """ Shared ALU tables, loaded or built on first use. """
+    global _tables
+    if _tables is None:
+        _tables = _load()
+        if _tables is None:
+            _tables = build_tables()
+            _save(_tables)
+    return _tables
+
+def _nz(value):
+    value = value & 0xFF
+    return (value & N_FLAG) | (0 if value else Z_FLAG)
+
+def _adc(a, b, c):
+    r = a + b + c
+    v = ~(a ^ b) & (a ^ r) & 0x80
+    flags = _nz(r) | (V_FLAG if v else 0) | (C_FLAG if r > 0xFF else 0)
+    return (r & 0xFF) | (flags << 8)
+
+def _sbc(a, b, c):
+    """ 'c' is the borrow (inverted carry). """
+    r = a - b - c
+    v = (a ^ b) & (a ^ r) & 0x80
+    flags = _nz(r) | (V_FLAG if v else 0) | (C_FLAG if r >= 0 else 0)
+    return (r & 0xFF) | (flags << 8)
+
+def _adc_decimal(a, b, c):
+    """ NMOS 6502 decimal add: Z is from the binary sum, N and V from the
+        sum before the high digit is adjusted.
+    """
+    lo = (a & 0xF) + (b & 0xF) + c
+    if lo > 9:
+        lo += 6
+    hi = (a >> 4) + (b >> 4) + (lo > 0xF)
+    v = ~(a ^ b) & (a ^ (hi << 4)) & 0x80
+    flags = ((hi << 4) & N_FLAG) | (V_FLAG if v else 0)
+    flags |= (0 if (a + b + c) & 0xFF else Z_FLAG)
+    if hi > 9:
+        hi += 6
+    flags |= (C_FLAG if hi > 0xF else 0)
+    return (((hi << 4) | (lo & 0xF)) & 0xFF) | (flags << 8)
+
+def _sbc_decimal(a, b, c):
+    """ NMOS 6502 decimal subtract: flags are the same as binary. """
+    lo = (a & 0xF) - (b & 0xF) - c
+    hi = (a >> 4) - (b >> 4)
+    if lo & 0x10:
+        lo -= 6
+        hi -= 1
+    if hi & 0x10:
+        hi -= 6
+    flags = _sbc(a, b, c) >> 8
+    return (((hi << 4) | (lo & 0xF)) & 0xFF) | (flags << 8)
+
+def _cmp(a, b):
+    r = a - b
+    return _nz(r) | (C_FLAG if r >= 0 else 0)
+
+def _build(func):
+    return array.array('H', [func(a, b, c) for c in range(2) for a in range(0x100) for b in range(0x100)])
+
+def build_tables():
+    cmp = array.array('H', [_cmp(a, b) for a in range(0x100) for b in range(0x100)])
+    return ALUTables(_build(_adc), _build(_sbc), _build(_adc_decimal), _build(_sbc_decimal), cmp)
+
+def _cache_name():
+    # Tables are saved in native byte order.
+    return 'alu_v%d_%d_%s.bin' % (VERSION, array.array('H').itemsize, sys.byteorder)
+
+def _load():
+    name = _cache_name()
+    data = cache.load(name)
+    if data is None:
+        return None
+    itemsize = array.array('H').itemsize
+    if len(data) != (4 * ADD_SUB_ENTRIES + CMP_ENTRIES) * itemsize:
+        print("Warning: Ignoring invalid ALU cache %s" % (name))
+        return None
+    loaded = []
+    offset = 0
+    for entries in [ADD_SUB_ENTRIES] * 4 + [CMP_ENTRIES]:
+        table = array.array('H')
+        end = offset + entries * itemsize
+        if hasattr(table, 'frombytes'):
+            table.frombytes(data[offset:end])
+        else:
+            # Python 2
+            table.fromstring(data[offset:end])
+        loaded.append(table)
+        offset = end
+    return ALUTables(*loaded)
+
+def _save(tables):
+    data = []
+    for table in (tables.adc, tables.sbc, tables.adc_decimal, tables.sbc_decimal, tables.cmp):
+        if hasattr(table, 'tobytes'):
+            data.append(table.tobytes())
+        else:
+            # Python 2
+            data.append(table.tostring())
+    cache.save(_cache_name(), b''.join(data))
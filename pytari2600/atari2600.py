@@ -1,11 +1,49 @@
 from .memory import memory
 from .memory import riot
 from .memory import cartridge
+from .memory import detect
 from . import clocks
+from . import cache
 from . import inputs
 import json
 
+# Cartridge types accepted by 'create_cartridge', 'auto' detects the type
+# from the rom.
+CARTRIDGE_TYPES = ['auto', 'default', 'pb', 'mnet', 'cbs', 'e', 'fe', 'super', 'f4', 'single_bank']
+
+def create_cartridge(cart_name, cart_type):
+    if cart_type == 'auto':
+        cart_type = detect.cartridge_type(cart_name)
+        print("Detected cartridge type: %s" % (cart_type))
+
+    if cart_type == 'pb':
+        new_cart = cartridge.PBCartridge(cart_name)
+    elif cart_type == 'mnet':
+        new_cart = cartridge.MNetworkCartridge(cart_name)
+    elif cart_type == 'fe':
+        new_cart = cartridge.GenericCartridge(cart_name, 8, 0x1000, 0xFFB, 0x080)
+    elif cart_type == 'e':
+        # Robotank, Decathelon
+        new_cart = cartridge.FECartridge(cart_name, 2, 0x1000)
+    elif cart_type == 'cbs':
+        new_cart = cartridge.GenericCartridge(cart_name, 3, 0x1000, 0xFFA, 0x100)
+    elif cart_type == 'super':
+        new_cart = cartridge.GenericCartridge(cart_name, 4, 0x1000, 0xFF9, 0x080)
+    elif cart_type == 'f4':
+        new_cart = cartridge.GenericCartridge(cart_name, 8, 0x1000, 0xFFB, 0x000)
+    elif cart_type == 'single_bank':
+        new_cart = cartridge.SingleBankCartridge(cart_name, 0x1000)
+    elif cart_type == 'default':
+        new_cart = cartridge.GenericCartridge(cart_name, 8, 0x1000, 0xFF9, 0x0)
+    else:
+        # Same as 'default'
+        new_cart = cartridge.GenericCartridge(cart_name, 4, 0x1000, 0xFF9, 0x0)
+    return new_cart
+
 class Atari(object):
+    # Clocks per (NTSC) frame, quit and custom keys are polled at this rate.
+    FRAME_CLOCKS = 262 * 228
+
     def __init__(self, Graphics, audio, cpu):
         self.clocks   = clocks.Clock()
         self.pc_state = cpu.pc_state.PC_State()
@@ -18,30 +56,14 @@ class Atari(object):
         self.core.initialise()
 
     def insert_cartridge(self, cart_name, cart_type):
-        if cart_type == 'pb':
-            new_cart = cartridge.PBCartridge(cart_name)
-        elif cart_type == 'mnet':
-            new_cart = cartridge.MNetworkCartridge(cart_name)
-        elif cart_type == 'fe':
-            new_cart = cartridge.GenericCartridge(cart_name, 8, 0x1000, 0xFFB, 0x080)
-        elif cart_type == 'e':
-            # Robotank, Decathelon
-            new_cart = cartridge.FECartridge(cart_name, 2, 0x1000)
-        elif cart_type == 'cbs':
-            new_cart = cartridge.GenericCartridge(cart_name, 3, 0x1000, 0xFFA, 0x100)
-        elif cart_type == 'super':
-            new_cart = cartridge.GenericCartridge(cart_name, 4, 0x1000, 0xFF9, 0x080)
-        elif cart_type == 'f4':
-            new_cart = cartridge.GenericCartridge(cart_name, 8, 0x1000, 0xFFB, 0x000)
-        elif cart_type == 'single_bank':
-            new_cart = cartridge.SingleBankCartridge(cart_name, 0x1000)
-        elif cart_type == 'default':
-            new_cart = cartridge.GenericCartridge(cart_name, 8, 0x1000, 0xFF9, 0x0)
-        else:
-            # Same as 'default'
-            new_cart = cartridge.GenericCartridge(cart_name, 4, 0x1000, 0xFF9, 0x0)
+        new_cart = create_cartridge(cart_name, cart_type)
         self.memory.set_cartridge(new_cart)
 
+        if hasattr(self.core, 'load_code_cache'):
+            self.core.load_code_cache(cache.rom_digest(cart_name))
+        if hasattr(self.core, 'load_static_code'):
+            self.core.load_static_code(cart_name)
+
 
     def get_save_state(self):
         state = {}
@@ -82,42 +104,47 @@ class Atari(object):
         step_func = self.core.step
         quit_func = self.inputs.get_quit
 
-        if debug:
-            if 0 == stop_clock:
-                while 0 == quit_func():
-                    print("clock:%s, %s"%((self.clocks.system_clock - self.stella._vsync_debug_output_clock)/3, str(self.core.pc_state)))
-                    step_func()
-            else:
-                with open('debug.json', 'w') as fp:
-                    clk = self.clocks
-                    while clk.system_clock < stop_clock:
+        try:
+            if debug:
+                if 0 == stop_clock:
+                    while 0 == quit_func():
                         print("clock:%s, %s"%((self.clocks.system_clock - self.stella._vsync_debug_output_clock)/3, str(self.core.pc_state)))
                         step_func()
-                        state = self.get_save_state()
-                        json.dump(state, fp)
-        elif replay_file:
-                state = self.get_save_state()
-
-                while 0 == quit_func():
-                    step_func()
-
-                    # Save/restore state depending on key press.
-                    if self.inputs.get_save_state_key():
-                        state = self.get_save_state()
-                        with open(replay_file, 'w') as fp:
+                else:
+                    with open('debug.json', 'w') as fp:
+                        clk = self.clocks
+                        while clk.system_clock < stop_clock:
+                            print("clock:%s, %s"%((self.clocks.system_clock - self.stella._vsync_debug_output_clock)/3, str(self.core.pc_state)))
+                            step_func()
+                            state = self.get_save_state()
                             json.dump(state, fp)
-                    elif self.inputs.get_restore_state_key():
-                        with open(replay_file, 'r') as fp:
-                            state = json.load(fp)
-                        self.set_save_state(state)
-
-        else:
-            if 0 == stop_clock:
-                while 0 == quit_func():
-                    step_func()
+            elif replay_file:
+                    state = self.get_save_state()
+
+                    while 0 == quit_func():
+                        self.core.run(self.clocks.system_clock + self.FRAME_CLOCKS)
+
+                        # Save/restore state depending on key press.
+                        if self.inputs.get_save_state_key():
+                            state = self.get_save_state()
+                            with open(replay_file, 'w') as fp:
+                                json.dump(state, fp)
+                        elif self.inputs.get_restore_state_key():
+                            with open(replay_file, 'r') as fp:
+                                state = json.load(fp)
+                            self.set_save_state(state)
+
             else:
-                clk = self.clocks
-                while clk.system_clock < stop_clock:
-                    step_func()
+                if 0 == stop_clock:
+                    while 0 == quit_func():
+                        self.core.run(self.clocks.system_clock + self.FRAME_CLOCKS)
+                else:
+                    self.core.run(stop_clock)
+        finally:
+            # Keep code translated during this run for the next one.
+            if hasattr(self.core, 'save_code_cache'):
+                self.core.save_code_cache()
 
         print("Atari finished")
+        if hasattr(self.core, 'get_memory_usage'):
+            print("Decoders: %d, approx %d bytes" % self.core.get_memory_usage())
@@ -19,6 +19,9 @@ class PygameStretchTIA_Sound(tiasound.TIA_Sound):
 
         self._sound_chunk_size        =   1024*4
 
+        # Check for completed chunks several times per chunk of audio.
+        self.step_clocks = int(self._sound_chunk_size * self.CPU_CLOCK_RATE / self.SAMPLERATE / 8)
+
         self.openSound()
         
         self._test_accumulated_sound  = self._sound_chunk_size * 2
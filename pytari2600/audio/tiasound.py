@@ -26,6 +26,9 @@ class TIA_Sound(object):
 
         self._freq_pos  = [0] * 2
 
+        # Clocks between calls to 'step', zero if it isn't needed.
+        self.step_clocks = 0
+
 
     def get_save_state(self):
         state = {}
@@ -0,0 +1,92 @@
+""" Location of generated data, kept between runs to speed up startup. """
+
+import hashlib
+import os
+import pickle
+
+# Off unless a directory is given, eg '~/.pytari2600'.
+CACHE_DIR = None
+
+# Bump if the contents of cached tables or code change.
+VERSION = 1
+
+def set_cache_dir(path):
+    """ Use 'path' for cache files, 'None' disables the cache. """
+    global CACHE_DIR
+    CACHE_DIR = path
+
+def cache_file(name):
+    """ Path for cache file 'name', or None if the cache isn't usable. """
+    if not CACHE_DIR:
+        return None
+    try:
+        if not os.path.isdir(CACHE_DIR):
+            os.makedirs(CACHE_DIR)
+    except (IOError, OSError):
+        return None
+    return os.path.join(CACHE_DIR, name)
+
+def replace_file(tmp_name, name):
+    """ Move a completed 'tmp_name' into place, so readers never see a
+        partially written cache file.
+    """
+    try:
+        os.rename(tmp_name, name)
+    except OSError:
+        # Windows won't rename over an existing file.
+        os.remove(name)
+        os.rename(tmp_name, name)
+
+def load(name):
+    """ Contents of cache file 'name', or None. """
+    path = cache_file(name)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as cached:
+            return cached.read()
+    except (IOError, OSError):
+        return None
+
+def save(name, data):
+    """ Write 'data' to cache file 'name', failures are ignored. """
+    path = cache_file(name)
+    if path is None:
+        return
+    tmp_name = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp_name, 'wb') as cached:
+            cached.write(data)
+        replace_file(tmp_name, path)
+    except (IOError, OSError):
+        pass
+
+def rom_digest(file_name):
+    """ Key for cached data specific to a rom, SHA-1 of the rom contents
+        and the cache version.
+    """
+    with open(file_name, 'rb') as rom_file:
+        data = rom_file.read()
+    return hashlib.sha1(data + ('pytari2600-%d' % (VERSION)).encode('ascii')).hexdigest()
+
+_shared = {}
+
+def shared_table(name, build):
+    """ Table returned by 'build()', shared by every caller in the process
+        and pickled to the cache directory between runs. The table must
+        not be modified.
+    """
+    if name not in _shared:
+        file_name = '%s_v%d.pickle' % (name, VERSION)
+        table = None
+        data = load(file_name)
+        if data is not None:
+            try:
+                table = pickle.loads(data)
+            except Exception:
+                print("Warning: Ignoring invalid cache %s" % (file_name))
+        if table is None:
+            table = build()
+            save(file_name, pickle.dumps(table, pickle.HIGHEST_PROTOCOL))
+        _shared[name] = table
+    return _shared[name]
@@ -1,9 +1,60 @@
+import heapq
+
 class Clock(object):
+    """ System clock, with a queue of device events due at future clocks.
+
+        Events are run between instructions, by the core, once the system
+        clock has reached them. Run loops execute instructions while the
+        system clock is below 'limit', scheduling an earlier event lowers it.
+    """
+    NEVER = 1 << 62
+
     def __init__(self):
         self.system_clock = 0
+        self.next_event   = self.NEVER
+        self.limit        = self.NEVER
+        self._events      = []
+        self._sequence    = 0
 
     def get_save_state(self):
         return self.system_clock
 
     def set_save_state(self, state):
+        """ Pending events are dropped, devices reschedule them when their
+            own state is restored. """
         self.system_clock = state
+        self._events      = []
+        self.next_event   = self.NEVER
+        self.limit        = self.NEVER
+
+    def schedule(self, clock, callback):
+        """ Call 'callback()' once the system clock reaches 'clock', returns
+            an event that can be passed to 'cancel'. """
+        # Sequence number keeps events due at the same clock in order.
+        self._sequence += 1
+        event = [clock, self._sequence, callback]
+        heapq.heappush(self._events, event)
+        if clock < self.next_event:
+            self.next_event = clock
+        if clock < self.limit:
+            self.limit = clock
+        return event
+
+    def cancel(self, event):
+        if event is not None:
+            event[2] = None
+
+    def run_events(self):
+        """ Run all events that are due. """
+        events = self._events
+        while events and events[0][0] <= self.system_clock:
+            callback = heapq.heappop(events)[2]
+            if callback is not None:
+                callback()
+        while events and events[0][2] is None:
+            heapq.heappop(events)
+        if events:
+            self.next_event = events[0][0]
+        else:
+            self.next_event = self.NEVER
+        self.limit = self.next_event
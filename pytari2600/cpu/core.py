@@ -66,6 +66,32 @@ class Core(object):
     
         # This will raise an exception for unsupported op_code
         self.instruction_lookup[op_code].execute()
+        if self.clocks.system_clock >= self.clocks.next_event:
+            self.clocks.run_events()
+
+    def run(self, max_clock):
+        """ Execute instructions until the system clock reaches 'max_clock'. """
+        clocks = self.clocks
+        pc_state = self.pc_state
+        read = self.memory.read
+        instruction_lookup = self.instruction_lookup
+        while clocks.system_clock < max_clock:
+            if clocks.system_clock >= clocks.next_event:
+                clocks.run_events()
+            clocks.limit = min(max_clock, clocks.next_event)
+            while clocks.system_clock < clocks.limit:
+                instruction_lookup[read(pc_state.PC)].execute()
+
+    def run_until(self, predicate):
+        """ Execute instructions until 'predicate()' is true. """
+        clocks = self.clocks
+        pc_state = self.pc_state
+        read = self.memory.read
+        instruction_lookup = self.instruction_lookup
+        while not predicate():
+            instruction_lookup[read(pc_state.PC)].execute()
+            if clocks.system_clock >= clocks.next_event:
+                clocks.run_events()
 
     def populate_instruction_map(self):
         dummy = pc_state.PC_Register()
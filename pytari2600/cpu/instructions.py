@@ -1,4 +1,4 @@
-import ctypes
+from .. import alu
 
 class Reading(object):
     def __init__(self, pc_state, memory):
@@ -73,6 +73,13 @@ class InstructionExec(object):
     def __init__(self, pc_state):
         self.pc_state = pc_state
 
+        tables = alu.get_tables()
+        self._adc         = tables.adc
+        self._sbc         = tables.sbc
+        self._adc_decimal = tables.adc_decimal
+        self._sbc_decimal = tables.sbc_decimal
+        self._cmp         = tables.cmp
+
     def NOP_exec(self, data):
         """NOP"""
         return int(data)
@@ -297,69 +304,26 @@ class InstructionExec(object):
         self.pc_state.P.set_Z((0,1)[0x00 == (value & 0xFF)])
 
     def addc(self, a, b, c):
-
+        index = ((c & 1) << 16) | (a << 8) | (b & 0xFF)
         if 0 == self.pc_state.P.get_D():
-            r  = ctypes.c_short(a + b + c).value
-            rc = ctypes.c_byte(a + b + c).value
-            self.pc_state.P.set_N((0,1)[0x80 == (rc & 0x80)])
-            self.pc_state.P.set_Z((0,1)[rc == 0x0])
-            self.pc_state.P.set_V((0,1)[rc != r])   # Overflow
-
-            r = ((a & 0xFF) + (b & 0xFF) + c) & 0xFFFF
-            self.pc_state.P.set_C((0,1)[0x100 == (r & 0x100)])
-            result = (a + b + c)
-        elif 1 == self.pc_state.P.get_D():
-            # Decimal Addition
-            # FIXME need to fix flags
-            #
-            r = ctypes.c_short(((a >> 4) & 0xF)* 10+ ((a & 0xF) %10) + ((b>>4) & 0xF)* 10 + ((b & 0xF) %10) + c).value
-            rc = ctypes.c_byte(a + b + c).value # ???? TODO
-            self.pc_state.P.set_N((0,1)[r < 0])
-            self.pc_state.P.set_Z((0,1)[rc == 0x0])
-            # self.pc_state.P.V = (rc != r) ? 1:0;   # Overflow
-
-            self.pc_state.P.set_C((0,1)[(r > 99) or (r < 0)])
-            result = ((((int(r/10) % 10) << 4) & 0xf0) + (r%10))
-
-        return result & 0xFF
+            entry = self._adc[index]
+        else:
+            entry = self._adc_decimal[index]
+        self.pc_state.P.value = (self.pc_state.P.value & ~alu.ADD_SUB_FLAGS) | (entry >> 8)
+        return entry & 0xFF
 
     def subc(self, a, b, c):
-
+        """ 'c' is the borrow (inverted carry). """
+        index = ((c & 1) << 16) | (a << 8) | (b & 0xFF)
         if 0 == self.pc_state.P.get_D():
-            r  = ctypes.c_short(ctypes.c_byte(a).value - ctypes.c_byte(b).value - ctypes.c_byte(c).value).value
-            rs = ctypes.c_byte((a - b - c) & 0xFF).value
-            self.pc_state.P.set_N((0,1)[0x80 == (rs & 0x80)]) # Negative
-            self.pc_state.P.set_Z((0,1)[rs == 0])   # Zero
-            self.pc_state.P.set_V((0,1)[r != rs])   # Overflow
-
-            r = a - b - c 
-            self.pc_state.P.set_C((1,0)[0x100 == (r & 0x100)]) # Carry (not borrow
-            result = a - b - c
-        elif 1 == self.pc_state.P.get_D():
-            # Decimal subtraction
-            # FIXME need to fix flags
-
-            r = ctypes.c_short(((a >> 4) & 0xF)* 10+ ((a & 0xF) %10) - (((b>>4) & 0xF)* 10 + ((b & 0xF) %10)) - c).value
-
-            # rc = a + b + c
-            self.pc_state.P.set_N((0,1)[r < 0])
-            self.pc_state.P.set_Z((0,1)[r == 0x0])
-            #  Need to check/fix conditions for V
-            # self.pc_state.P.V = (rc != r) ? 1:0;   # Overflow
-            self.pc_state.P.set_V(1)   # Overflow
-
-            self.pc_state.P.set_C((0,1)[(r >= 0) and (r <= 99)])
-            result = (((int(r/10) % 10) << 4) & 0xf0) + (r%10)
-
-        return result & 0xFF
+            entry = self._sbc[index]
+        else:
+            entry = self._sbc_decimal[index]
+        self.pc_state.P.value = (self.pc_state.P.value & ~alu.ADD_SUB_FLAGS) | (entry >> 8)
+        return entry & 0xFF
 
     def cmp(self, a, b):
-        r = ctypes.c_short(ctypes.c_byte(a).value - ctypes.c_byte(b).value).value
-        rs = ctypes.c_byte(a - b).value
-        self.pc_state.P.set_N((0,1)[0x80 == (rs & 0x80)])    # Negative
-        self.pc_state.P.set_Z((0,1)[rs == 0])              # Zero
-        r = (a & 0xFF) - (b & 0xFF)
-        self.pc_state.P.set_C((1,0)[0x100 == (r & 0x100)]) # Carry (not borrow)
+        self.pc_state.P.value = (self.pc_state.P.value & ~alu.CMP_FLAGS) | self._cmp[(a << 8) | (b & 0xFF)]
 
 class Instruction(object):
 
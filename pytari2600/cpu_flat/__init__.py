@@ -0,0 +1,2 @@
+from . import core
+from . import pc_state
@@ -0,0 +1,707 @@
+""" Instructions for the 'flat' core.
+
+    Mirrors 'cpu/instructions.py', with the registers and status flags of
+    'pc_state' accessed as plain ints.
+"""
+
+from .. import alu
+
+class Reading(object):
+    def __init__(self, pc_state, memory):
+        self.pc_state = pc_state
+        self.memory = memory
+
+    def get_reading_time(self):
+        return 2*self.pc_state.CYCLES_TO_CLOCK
+
+    def read(self, address):
+        return int(self.memory.read(address)) & 0xFF
+
+class NullReading(Reading):
+    def __init__(self, pc_state, memory):
+        super(NullReading, self).__init__(pc_state, memory)
+
+    def read(self, address):
+        return 0
+
+    def get_reading_time(self):
+        return self.pc_state.CYCLES_TO_CLOCK
+
+class AccumulatorReading(Reading):
+    def __init__(self, pc_state, memory):
+        super(AccumulatorReading, self).__init__(pc_state, memory)
+
+    def read(self, address):
+        return self.pc_state.A
+
+    def get_reading_time(self):
+        return self.pc_state.CYCLES_TO_CLOCK
+
+class Writing(object):
+    def __init__(self, pc_state, memory):
+        self.pc_state = pc_state
+        self.memory = memory
+
+    def write(self, address, data):
+        self.memory.write(address, data)
+
+    def get_writing_time(self):
+        return 2*self.pc_state.CYCLES_TO_CLOCK
+
+class RegWriting(Writing):
+    def __init__(self, pc_state, memory):
+        super(RegWriting, self).__init__(pc_state, memory)
+
+    def get_writing_time(self):
+        return self.pc_state.CYCLES_TO_CLOCK
+
+class NullWriting(Writing):
+    def __init__(self, pc_state, memory):
+        super(NullWriting, self).__init__(pc_state, memory)
+
+    def write(self, address, data):
+        pass
+
+    def get_writing_time(self):
+        return 0
+
+class AccumulatorWriting(Writing):
+    def __init__(self, pc_state, memory):
+        super(AccumulatorWriting, self).__init__(pc_state, memory)
+
+    def write(self, address, data):
+        self.pc_state.A = data & 0xFF
+
+    def get_writing_time(self):
+        return self.pc_state.CYCLES_TO_CLOCK
+
+class InstructionExec(object):
+    """ Instruction implementations, flags are updated directly in 'P'. """
+
+    def __init__(self, pc_state):
+        self.pc_state = pc_state
+
+        tables = alu.get_tables()
+        self._adc         = tables.adc
+        self._sbc         = tables.sbc
+        self._adc_decimal = tables.adc_decimal
+        self._sbc_decimal = tables.sbc_decimal
+        self._cmp         = tables.cmp
+
+    def NOP_exec(self, data):
+        """NOP"""
+        return data
+
+    def OR_exec(self, data):
+        """OR"""
+        ps = self.pc_state
+        ps.A = a = ps.A | data
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        return 0
+
+    def ASL_exec(self, data):
+        """ASL"""
+        ps = self.pc_state
+        data = (data << 1) & 0x1FF
+        t8 = data & 0xFF
+        ps.P = (ps.P & 0x7C) | (t8 & 0x80) | (0 if t8 else 0x02) | (data >> 8)
+        return t8
+
+    def AND_exec(self, data):
+        """AND"""
+        ps = self.pc_state
+        ps.A = a = ps.A & data
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        return 0
+
+    def CLC_exec(self, data):
+        """CLC"""
+        self.pc_state.P &= 0xFE
+        return 0
+
+    def CLD_exec(self, data):
+        """CLD"""
+        self.pc_state.P &= 0xF7
+        return 0
+
+    def CLI_exec(self, data):
+        """CLI"""
+        self.pc_state.P &= 0xFB
+        return 0
+
+    def CLV_exec(self, data):
+        """CLV"""
+        self.pc_state.P &= 0xBF
+        return 0
+
+    def SEC_exec(self, data):
+        """SEC"""
+        self.pc_state.P |= 0x01
+        return 0
+
+    def SED_exec(self, data):
+        """SED"""
+        self.pc_state.P |= 0x08
+        return 0
+
+    def SEI_exec(self, data):
+        """SEI"""
+        self.pc_state.P |= 0x04
+        return 0
+
+    def BIT_exec(self, data):
+        """BIT"""
+        ps = self.pc_state
+        ps.P = (ps.P & 0x3D) | (data & 0xC0) | (0 if (ps.A & data) else 0x02)
+        return 0
+
+    def ROL_exec(self, data):
+        """ROL"""
+        ps = self.pc_state
+        t8 = ((data << 1) | (ps.P & 0x01)) & 0xFF
+        ps.P = (ps.P & 0x7C) | (t8 & 0x80) | (0 if t8 else 0x02) | ((data >> 7) & 1)
+        return t8
+
+    def EOR_exec(self, data):
+        """EOR"""
+        ps = self.pc_state
+        ps.A = a = ps.A ^ data
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        return 0
+
+    def LSR_exec(self, data):
+        """LSR"""
+        ps = self.pc_state
+        t8 = data >> 1
+        ps.P = (ps.P & 0x7C) | (t8 & 0x80) | (0 if t8 & 0xFF else 0x02) | (data & 1)
+        return t8
+
+    def ROR_exec(self, data):
+        """ROR"""
+        ps = self.pc_state
+        t8 = ((data >> 1) | ((ps.P & 0x01) << 7)) & 0xFF
+        ps.P = (ps.P & 0x7C) | (t8 & 0x80) | (0 if t8 else 0x02) | (data & 1)
+        return t8
+
+    def LDY_exec(self, data):
+        """LDY"""
+        ps = self.pc_state
+        ps.Y = y = data & 0xFF
+        ps.P = (ps.P & 0x7D) | (y & 0x80) | (0 if y else 0x02)
+        return 0
+
+    def LDA_exec(self, data):
+        """LDA"""
+        ps = self.pc_state
+        ps.A = a = data & 0xFF
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        return 0
+
+    def LDX_exec(self, data):
+        """LDX"""
+        ps = self.pc_state
+        ps.X = x = data & 0xFF
+        ps.P = (ps.P & 0x7D) | (x & 0x80) | (0 if x else 0x02)
+        return 0
+
+    def CMP_exec(self, data):
+        """CMP"""
+        self.cmp(self.pc_state.A, data)
+        return 0
+
+    def CPX_exec(self, data):
+        """CPX"""
+        self.cmp(self.pc_state.X, data)
+        return 0
+
+    def CPY_exec(self, data):
+        """CPY"""
+        self.cmp(self.pc_state.Y, data)
+        return 0
+
+    def ADC_exec(self, data):
+        """ADC"""
+        ps = self.pc_state
+        ps.A = self.addc(ps.A, data, ps.P & 0x01)
+        return 0
+
+    def SBC_exec(self, data):
+        """SBC"""
+        ps = self.pc_state
+        ps.A = self.subc(ps.A, data, 1 - (ps.P & 0x01))
+        return 0
+
+    def INC_exec(self, data):
+        """INC"""
+        data += 1
+        self.set_status_NZ(data)
+        return data
+
+    def STA_exec(self, data):
+        """STA"""
+        return self.pc_state.A
+
+    def STY_exec(self, data):
+        """STY"""
+        return self.pc_state.Y
+
+    def STX_exec(self, data):
+        """STX"""
+        return self.pc_state.X
+
+    def SAX_exec(self, data):
+        """SAX"""
+        return self.pc_state.A & self.pc_state.X
+
+    def DEC_exec(self, data):
+        """DEC"""
+        data -= 1
+        self.set_status_NZ(data)
+        return data
+
+    def DCP_exec(self, data):
+        """DCP"""
+        data -= 1
+        self.set_status_NZ(data)
+        self.cmp(self.pc_state.A, data)
+        return data
+
+#   Register (single byte) instructions.
+    def TAX_exec(self, data):
+        """TAX"""
+        ps = self.pc_state
+        ps.X = x = ps.A
+        ps.P = (ps.P & 0x7D) | (x & 0x80) | (0 if x else 0x02)
+        return 0
+
+    def TAY_exec(self, data):
+        """TAY"""
+        ps = self.pc_state
+        ps.Y = y = ps.A
+        ps.P = (ps.P & 0x7D) | (y & 0x80) | (0 if y else 0x02)
+        return 0
+
+    def TXA_exec(self, data):
+        """TXA"""
+        ps = self.pc_state
+        ps.A = a = ps.X
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        return 0
+
+    def TYA_exec(self, data):
+        """TYA"""
+        ps = self.pc_state
+        ps.A = a = ps.Y
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        return 0
+
+    def TXS_exec(self, data):
+        """TXS"""
+        self.pc_state.S = self.pc_state.X
+        return 0
+
+    def TSX_exec(self, data):
+        """TSX"""
+        self.pc_state.X = self.pc_state.S
+        return 0
+
+    def INX_exec(self, data):
+        """INX"""
+        ps = self.pc_state
+        ps.X = x = (ps.X + 1) & 0xFF
+        ps.P = (ps.P & 0x7D) | (x & 0x80) | (0 if x else 0x02)
+        return 0
+
+    def INY_exec(self, data):
+        """INY"""
+        ps = self.pc_state
+        ps.Y = y = (ps.Y + 1) & 0xFF
+        ps.P = (ps.P & 0x7D) | (y & 0x80) | (0 if y else 0x02)
+        return 0
+
+    def DEX_exec(self, data):
+        """DEX"""
+        ps = self.pc_state
+        ps.X = x = (ps.X - 1) & 0xFF
+        ps.P = (ps.P & 0x7D) | (x & 0x80) | (0 if x else 0x02)
+        return 0
+
+    def DEY_exec(self, data):
+        """DEY"""
+        ps = self.pc_state
+        ps.Y = y = (ps.Y - 1) & 0xFF
+        ps.P = (ps.P & 0x7D) | (y & 0x80) | (0 if y else 0x02)
+        return 0
+
+    def ASL_A_exec(self, data):
+        """ASL A"""
+        self.pc_state.A = self.ASL_exec(self.pc_state.A)
+        return 0
+
+    def LSR_A_exec(self, data):
+        """LSR A"""
+        self.pc_state.A = self.LSR_exec(self.pc_state.A)
+        return 0
+
+#   Illigal instructions.
+    def SLO_exec(self, data):
+        """SLO"""
+        ps = self.pc_state
+        data = (data << 1) & 0x1FF
+        ps.A = a = ps.A | (data & 0xFF)
+        ps.P = (ps.P & 0x7C) | (a & 0x80) | (0 if a else 0x02) | (data >> 8)
+        return a
+
+    def LAX_exec(self, data):
+        """LAX"""
+        # Undocumented op code
+        ps = self.pc_state
+        ps.A = ps.X = x = data & 0xFF
+        ps.P = (ps.P & 0x7D) | (x & 0x80) | (0 if x else 0x02)
+        return 0
+
+    def ASR_exec(self, data):
+        """ASR"""
+        # Undocumented op code
+        ps = self.pc_state
+        ps.A = a = ((ps.A & data) >> 1) & 0x7F
+        ps.P = (ps.P & 0x7D) | (0 if a else 0x02)
+        return 0
+
+    def SBX_exec(self, data):
+        """STB"""
+        # Undocumented op code
+        ps = self.pc_state
+        ps.X = self.subc(ps.A & ps.X, data, 0)
+        return 0
+
+    def set_status_NZ(self, value):
+        ps = self.pc_state
+        ps.P = (ps.P & 0x7D) | (value & 0x80) | (0 if value & 0xFF else 0x02)
+
+    def addc(self, a, b, c):
+        ps = self.pc_state
+        index = ((c & 1) << 16) | (a << 8) | (b & 0xFF)
+        if 0 == (ps.P & 0x08):
+            entry = self._adc[index]
+        else:
+            entry = self._adc_decimal[index]
+        ps.P = (ps.P & 0x3C) | (entry >> 8)
+        return entry & 0xFF
+
+    def subc(self, a, b, c):
+        """ 'c' is the borrow (inverted carry). """
+        ps = self.pc_state
+        index = ((c & 1) << 16) | (a << 8) | (b & 0xFF)
+        if 0 == (ps.P & 0x08):
+            entry = self._sbc[index]
+        else:
+            entry = self._sbc_decimal[index]
+        ps.P = (ps.P & 0x3C) | (entry >> 8)
+        return entry & 0xFF
+
+    def cmp(self, a, b):
+        ps = self.pc_state
+        ps.P = (ps.P & 0x7C) | self._cmp[(a << 8) | (b & 0xFF)]
+
+class Instruction(object):
+
+    def __init__(self, clocks, pc_state, instruction_exec):
+        self.clocks = clocks
+        self.pc_state = pc_state
+        self.instruction_exec = instruction_exec
+
+    def execute(self):
+        pass
+
+    def page_clocks_delay(self, a, b):
+        # If pages don't match, add a cycle.
+        if (a & 0xF00) != (b & 0xF00):
+            self.clocks.system_clock += self.pc_state.CYCLES_TO_CLOCK
+
+class ReadWriteInstruction(Instruction):
+    def __init__(self, clocks, pc_state, address, read, write, instruction_exec, additional_delay = 0):
+        super(ReadWriteInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.address          = address
+        self.read             = read
+        self.write            = write
+        self.additional_delay = additional_delay
+
+        self._pc_increment = address.get_addressing_size() + 1
+        self._fixed_time   = read.get_reading_time() + additional_delay + write.get_writing_time()
+
+    def execute(self):
+        a = self.address
+
+        addr  = a.address(True)
+        value = self.read.read(addr)
+        data  = self.instruction_exec(value) & 0xFF
+        self.clocks.system_clock += a.get_addressing_time() + self._fixed_time
+
+        self.write.write(addr, data)
+
+        self.pc_state.PC += self._pc_increment
+
+class BreakInstruction(Instruction):
+    """BreakInstruction"""
+
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(BreakInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        cycle = ps.CYCLES_TO_CLOCK
+
+        self.clocks.system_clock += cycle
+        ps.PC += 1
+
+        self.clocks.system_clock += cycle
+        adl = self.memory.read(0xFFFE)
+
+        self.clocks.system_clock += cycle
+        self.memory.write(ps.S, ps.get_PCH())
+        ps.S = (ps.S - 1) & 0xFF
+
+        ps.PC += 1
+        self.clocks.system_clock += cycle
+        self.memory.write(ps.S, ps.get_PCL())
+        ps.S = (ps.S - 1) & 0xFF
+
+        # The 'B' flag, only alters the value on the stack, not ongoing status.
+        self.clocks.system_clock += cycle
+        self.memory.write(ps.S, ps.P | 0x10)
+        ps.S = (ps.S - 1) & 0xFF
+        ps.P &= 0xEF
+
+        self.clocks.system_clock += cycle
+        adh = self.memory.read(0xFFFF) & 0xFF
+
+        self.clocks.system_clock += cycle
+        ps.PC = adl + (adh << 8)
+
+class JumpSubRoutineInstruction(Instruction):
+    """JumpSubRoutineInstruction"""
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(JumpSubRoutineInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        cycle = ps.CYCLES_TO_CLOCK
+
+        self.clocks.system_clock += cycle
+        ps.PC += 1
+
+        self.clocks.system_clock += cycle
+        adl = self.memory.read(ps.PC)
+
+        self.clocks.system_clock += cycle
+
+        # Increment before store, to catch low to high carry.
+        ps.PC += 1
+        self.memory.write(ps.S, ps.get_PCH())
+        ps.S = (ps.S - 1) & 0xFF
+
+        self.clocks.system_clock += cycle
+        self.memory.write(ps.S, ps.get_PCL())
+        ps.S = (ps.S - 1) & 0xFF
+
+        self.clocks.system_clock += cycle
+        adh = self.memory.read(ps.PC)
+
+        self.clocks.system_clock += cycle
+        ps.PC = adl + (adh << 8)
+
+class ReturnFromSubRoutineInstruction(Instruction):
+    """ReturnFromSubRoutineInstruction"""
+
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(ReturnFromSubRoutineInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        cycle = ps.CYCLES_TO_CLOCK
+
+        # T1 - PC + 1
+        self.clocks.system_clock += cycle
+        ps.PC += 1
+        # T2 - Stack Ptr
+        self.clocks.system_clock += cycle
+        # T3 - Stack Ptr + 1 -> PCL
+        self.clocks.system_clock += cycle
+        ps.S = (ps.S + 1) & 0xFF
+        ps.set_PCL(self.memory.read(ps.S))
+        # T4 - Stack Ptr + 1 -> PCL
+        self.clocks.system_clock += cycle
+        ps.S = (ps.S + 1) & 0xFF
+        ps.set_PCH(self.memory.read(ps.S))
+        # T5 - discarded
+        self.clocks.system_clock += cycle
+        self.memory.read(ps.PC)
+        # T0 - Next instruction
+        self.clocks.system_clock += cycle
+        ps.PC += 1
+
+class ReturnFromInterrupt(Instruction):
+    """ReturnFromInterrupt"""
+
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(ReturnFromInterrupt, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        cycle = ps.CYCLES_TO_CLOCK
+
+        self.clocks.system_clock += cycle
+        ps.PC += 1
+
+        self.clocks.system_clock += cycle
+        ps.S = (ps.S + 1) & 0xFF
+        ps.P = self.memory.read(ps.S)
+
+        self.clocks.system_clock += cycle
+        ps.S = (ps.S + 1) & 0xFF
+        ps.set_PCL(self.memory.read(ps.S))
+
+        self.clocks.system_clock += cycle
+        ps.S = (ps.S + 1) & 0xFF
+        ps.set_PCH(self.memory.read(ps.S))
+
+        self.clocks.system_clock += cycle
+        self.memory.read(ps.PC)
+
+        self.clocks.system_clock += cycle
+
+class BranchInstruction(Instruction):
+    """BranchInstruction"""
+
+    def __init__(self, clocks, pc_state, memory, condition_mask, condition, instruction_exec):
+        super(BranchInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+        self.condition_mask = condition_mask
+        self.condition = condition
+
+    def execute(self):
+        ps = self.pc_state
+        cycle = ps.CYCLES_TO_CLOCK
+        if (ps.P & self.condition_mask) == self.condition:
+            tmp16 = ps.PC
+            delta = self.memory.read(tmp16 + 1) & 0xFF
+            if delta & 0x80:
+                ps.PC += delta - 0x100
+            else:
+                ps.PC += delta
+            # If branch to same page add 1, else add 2
+            self.page_clocks_delay(tmp16+2, ps.PC+2)
+            self.clocks.system_clock += 3 * cycle
+        else:
+            self.clocks.system_clock += 2 * cycle
+
+        ps.PC += 2
+
+class SingleByteInstruction(Instruction):
+    """SingleByteInstruction"""
+    def __init__(self, clocks, pc_state, instruction_exec):
+        super(SingleByteInstruction, self).__init__(clocks, pc_state, instruction_exec)
+
+    def execute(self):
+        self.clocks.system_clock += self.pc_state.CYCLES_TO_CLOCK
+        self.instruction_exec(0)
+        self.clocks.system_clock += self.pc_state.CYCLES_TO_CLOCK
+        self.pc_state.PC += 1
+
+class JumpInstruction(Instruction):
+    """JumpInstruction"""
+
+    def __init__(self, clocks, pc_state, address, instruction_exec):
+        super(JumpInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.address = address
+
+    def execute(self):
+        self.clocks.system_clock += 1 * self.pc_state.CYCLES_TO_CLOCK
+        addr    = self.address.address(False)
+        self.clocks.system_clock += self.address.get_addressing_time()
+        self.pc_state.PC = addr
+
+class PHPInstruction(Instruction):
+    """PHPInstruction"""
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(PHPInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        # T1 - PC + 1
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.PC += 1
+        # T2 - PC + 1
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.P |= 0x30
+        self.memory.writeSp(ps.S, ps.P)
+        ps.S = (ps.S - 1) & 0xFF
+        # T0 - Next kid
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+
+class PLPInstruction(Instruction):
+    """PLPInstruction"""
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(PLPInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        # T1 - PC + 1
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.PC += 1
+        # T2 Stack Ptr. (Discard data)
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        self.memory.readSp(ps.S)
+        # T3 Stack Ptr + 1.
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.S = (ps.S + 1) & 0xFF
+        ps.P = self.memory.readSp(ps.S)
+        # T0 - Next instruction
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+
+class PHAInstruction(Instruction):
+    """PHAInstruction"""
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(PHAInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        # T1 - PC + 1
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.PC += 1
+        # T2 - PC + 1
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        self.memory.writeSp(ps.S, ps.A)
+        ps.S = (ps.S - 1) & 0xFF
+        # T0 - Next kid
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+
+class PLAInstruction(Instruction):
+    """PLAInstruction"""
+    def __init__(self, clocks, pc_state, memory, instruction_exec):
+        super(PLAInstruction, self).__init__(clocks, pc_state, instruction_exec)
+        self.memory = memory
+
+    def execute(self):
+        ps = self.pc_state
+        # T1 - PC + 1
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.PC += 1
+        # T2 Stack Ptr. (Discard data)
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        self.memory.readSp(ps.S)
+        # T3 Stack Ptr + 1.
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
+        ps.S = (ps.S + 1) & 0xFF
+        ps.A = a = self.memory.readSp(ps.S) & 0xFF
+        ps.P = (ps.P & 0x7D) | (a & 0x80) | (0 if a else 0x02)
+        # T0 - Next instruction
+        self.clocks.system_clock += ps.CYCLES_TO_CLOCK
@@ -0,0 +1,63 @@
+class PC_State(object):
+    """ Register file, with the registers and status flags held as plain ints.
+
+        Save states use the same layout as the other cpu cores.
+    """
+    __slots__ = ('A', 'X', 'Y', 'PC', 'S', 'P', 'CYCLES_TO_CLOCK')
+
+    # Status flag bits.
+    N_FLAG  = 0x80
+    V_FLAG  = 0x40
+    X1_FLAG = 0x20
+    B_FLAG  = 0x10
+    D_FLAG  = 0x08
+    I_FLAG  = 0x04
+    Z_FLAG  = 0x02
+    C_FLAG  = 0x01
+
+    def __init__(self):
+        self.A  = 0
+        self.X  = 0
+        self.Y  = 0
+        self.PC = 0
+        self.S  = 0
+        self.P  = 0
+        self.CYCLES_TO_CLOCK = 3
+
+    def get_save_state(self):
+        state = {}
+        state['A']  = self.A
+        state['X']  = self.X
+        state['Y']  = self.Y
+        state['PC'] = self.PC
+        state['S']  = self.S
+        state['P']  = self.P
+        return state
+
+    def set_save_state(self, state):
+        self.A  = state['A']
+        self.X  = state['X']
+        self.Y  = state['Y']
+        self.PC = state['PC']
+        self.S  = state['S']
+        self.P  = state['P']
+
+    def __str__(self):
+        p = self.P
+        return "PC:%X X:%X Y:%X A:%X (C:%s Z:%s I:%s D:%s B:%s X1:%s V:%s N:%s)"%(
+                self.PC,
+                self.X, self.Y, self.A,
+                p & 1, (p >> 1) & 1, (p >> 2) & 1, (p >> 3) & 1,
+                (p >> 4) & 1, (p >> 5) & 1, (p >> 6) & 1, (p >> 7) & 1)
+
+    def get_PCL(self):
+        return self.PC & 0xFF
+
+    def get_PCH(self):
+        return (self.PC >> 8) & 0xFF
+
+    def set_PCL(self, value):
+        self.PC = self.PC & 0xFF00 | (value & 0xFF)
+
+    def set_PCH(self, value):
+        self.PC = self.PC &   0xFF | ((value & 0xFF) << 8)
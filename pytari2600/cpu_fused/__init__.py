@@ -0,0 +1,2 @@
+from . import core
+from ..cpu_gen import pc_state
@@ -0,0 +1,10 @@
+""" 'cpu_gen' core without block translation, common instruction sequences
+    are executed by fused decoders instead (see 'pytari2600.cpu_gen.fusion').
+"""
+
+from ..cpu_gen import core
+
+class Core(core.Core):
+    def __init__(self, clocks, memory, pc_state):
+        super(Core, self).__init__(clocks, memory, pc_state)
+        self.translator = None
@@ -38,13 +38,24 @@ class AddressIZX(Addressing):
     def address(self, check_page_delay):
         """IZX"""
         self.fixed = self.memory.read(self.pc_state.PC + 1)
-        self.address = self.address_decode
+        self.ram = getattr(self.memory, 'ram', None)
+        if self.ram is not None and (self.fixed & 0x80):
+            self.address = self.address_ram
+        else:
+            self.address = self.address_decode
         return self.address(check_page_delay)
 
     def address_decode(self, check_page_delay):
         tmp8  = self.fixed + self.pc_state.X.get_value() & 0xFFFF
         return self.memory.read16(tmp8)
 
+    def address_ram(self, check_page_delay):
+        tmp8  = self.fixed + self.pc_state.X.get_value()
+        if tmp8 < 0xFF:
+            # Pointer in RIOT ram.
+            return self.ram[tmp8 & 0x7F] + (self.ram[(tmp8 + 1) & 0x7F] << 8)
+        return self.memory.read16(tmp8)
+
 class AddressZPX(Addressing):
     def __init__(self, pc_state, memory):
         super(AddressZPX, self).__init__(pc_state, memory, 1, 2)
@@ -100,12 +111,21 @@ class AddressIZY(Addressing):
     def address(self, check_page_delay):
         """IZY"""
         self.fixed = self.memory.read(self.pc_state.PC + 1)
-        self.address = self.address_decode
+        self.ram = getattr(self.memory, 'ram', None)
+        if self.ram is not None and 0x80 <= self.fixed < 0xFF:
+            # Pointer in RIOT ram.
+            self.address = self.address_ram
+        else:
+            self.address = self.address_decode
         return self.address(check_page_delay)
 
     def address_decode(self, check_page_delay):
         return self.memory.read16(self.fixed) + self.pc_state.Y.get_value() & 0xFFFF
 
+    def address_ram(self, check_page_delay):
+        pointer = self.ram[self.fixed & 0x7F] + (self.ram[(self.fixed + 1) & 0x7F] << 8)
+        return pointer + self.pc_state.Y.get_value() & 0xFFFF
+
 class AddressAbs(Addressing):
     def __init__(self, pc_state, memory):
         super(AddressAbs, self).__init__(pc_state, memory, 2, 2)
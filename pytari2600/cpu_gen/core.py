@@ -1,6 +1,9 @@
+import sys
 from . import addressing
+from . import fusion
 from . import instructions
 from . import pc_state
+from . import translator
 
 class OpDecoder(object):
     def __init__(self, pc_state, memory, instruction_lookup):
@@ -19,6 +22,96 @@ class OpDecoder(object):
         instruction.execute() 
         self.execute = instruction.execute
 
+class BlockDecoder(OpDecoder):
+    def __init__(self, pc_state, memory, instruction_lookup, translator):
+        super(BlockDecoder, self).__init__(pc_state, memory, instruction_lookup)
+        self.translator = translator
+
+    def execute(self):
+        """ On first execution, replace the 'execute' call with the
+        translated block starting at this address, if there is one. """
+        block = self.translator.translate(self.pc_state.PC)
+        if block is None:
+            OpDecoder.execute(self)
+        else:
+            block()
+            self.execute = block
+
+class SpinLoopDecoder(object):
+    """ Decoder for a loop that only reads a device register and branches
+    back to the read, eg 'LDA INTIM; BNE loop'. After each iteration, the
+    iterations that would loop again are skipped by advancing the clock,
+    stopping at the clock limit so events still run on time. The registers
+    are left as the last skipped read set them. """
+
+    # Loads that can start a spin loop: op code -> (operand size, is BIT)
+    LOADS = {0xAD: (2, False), 0xAE: (2, False), 0xAC: (2, False), 0x2C: (2, True),
+             0xA5: (1, False), 0xA6: (1, False), 0xA4: (1, False), 0x24: (1, True)}
+
+    def __init__(self, core, load, branch, address, is_bit):
+        self.core      = core
+        self.clocks    = core.clocks
+        self.pc_state  = core.pc_state
+        self.memory    = core.memory
+        self.load      = load
+        self.branch    = branch
+        self.address   = address
+        self.is_bit    = is_bit
+        self.loop_pc   = core.pc_state.PC
+
+    def execute(self):
+        start = self.clocks.system_clock
+        self.load.execute()
+        self.branch.execute()
+        if self.pc_state.PC == self.loop_pc:
+            self.fast_forward(self.clocks.system_clock - start)
+
+    def loops(self, value, p):
+        """ True if reading 'value' would branch back to the loop. """
+        if self.is_bit:
+            p = (p & 0x3D) | (value & 0xC0)
+            if 0 == (self.pc_state.A.get_value() & value):
+                p |= 0x02
+        else:
+            p = (p & 0x7D) | (value & 0x80)
+            if 0 == value:
+                p |= 0x02
+        return (p & self.branch.condition_mask) == self.branch.condition
+
+    def fast_forward(self, period):
+        clocks  = self.clocks
+        memory  = self.memory
+        address = self.address
+        p       = self.pc_state.P.get_value()
+        clock   = clocks.system_clock
+        limit   = clocks.limit
+        # BIT sets Z from A & value, so any change of the value counts.
+        if self.is_bit:
+            next_change = memory.next_change
+        else:
+            next_change = memory.next_flags_change
+        skipped = 0
+        while clock < limit and self.loops(int(memory.peek(address, clock)) & 0xFF, p):
+            # Iterations starting before 'until' loop again.
+            until = min(next_change(address, clock), limit)
+            iterations = max(1, (until - clock + period - 1) // period)
+            clock   += iterations * period
+            skipped += iterations
+        if skipped:
+            # The load reads at the start of each iteration.
+            self.load.instruction_exec(int(memory.peek(address, clock - period)) & 0xFF)
+        clocks.system_clock = clock
+        self.core.spin_iterations_skipped += skipped
+
+class LazyDecoder(object):
+    """ Placeholder for addresses that haven't been executed yet, shared
+    by all entries of the decoder table. """
+    def __init__(self, core):
+        self.core = core
+
+    def execute(self):
+        self.core.create_decoder().execute()
+
 class Core(object):
     """
         CPU Core - Contains op code mappings.
@@ -62,8 +155,23 @@ class Core(object):
         self.pc_state.P.value = 0
         self.pc_state.PC = 0x1000
 
-        # Generate instances of the op decoder
-        self.op_decoder = [OpDecoder(pc_state, memory, self.instruction_lookup) for x in range(0x10000)]
+        self.translator = translator.BlockTranslator(self.clocks, self.memory, self.pc_state, self.instruction_lookup)
+
+        # Decoders are created on first execution of each absolute address
+        # and kept in 'bank_decoders' (all banks). 'op_decoder' holds the
+        # decoders of the banks currently mapped in, indexed by the masked
+        # PC, and is updated by the cartridge on bank switches. The tables
+        # are sized to the cartridge on 'reset'.
+        self.lazy_decoder = LazyDecoder(self)
+        self.bank_decoders = []
+        self.op_decoder = []
+        self.pc_mask = 0xFFF
+
+        self.spin_iterations_skipped = 0
+
+        # Use fused decoders for common instruction sequences, when blocks
+        # aren't translated (see 'fusion' and the 'cpu_fused' core).
+        self.fuse_instructions = True
 
     def get_save_state(self):
         state = {}
@@ -74,6 +182,7 @@ class Core(object):
         self.pc_state.set_save_state(state['pc_state'])
 
     def reset(self):
+        self.allocate_decoders()
         # 6502 Reset vector location.
         self.pc_state.PC = self.memory.read16(self.PROGRAM_ENTRY_ADDR)
 
@@ -82,7 +191,168 @@ class Core(object):
         self.populate_instruction_map()
 
     def step(self):
-        self.op_decoder[self.memory.cartridge.get_absolute_address(self.pc_state.PC)].execute()
+        self.op_decoder[self.pc_state.PC & self.pc_mask].execute()
+        if self.clocks.system_clock >= self.clocks.next_event:
+            self.clocks.run_events()
+
+    def run(self, max_clock):
+        """ Execute instructions until the system clock reaches 'max_clock'. """
+        clocks = self.clocks
+        pc_state = self.pc_state
+        pc_mask = self.pc_mask
+        op_decoder = self.op_decoder
+        while clocks.system_clock < max_clock:
+            if clocks.system_clock >= clocks.next_event:
+                clocks.run_events()
+            clocks.limit = min(max_clock, clocks.next_event)
+            while clocks.system_clock < clocks.limit:
+                op_decoder[pc_state.PC & pc_mask].execute()
+
+    def run_until(self, predicate):
+        """ Execute instructions until 'predicate()' is true. """
+        clocks = self.clocks
+        pc_state = self.pc_state
+        pc_mask = self.pc_mask
+        op_decoder = self.op_decoder
+        while not predicate():
+            op_decoder[pc_state.PC & pc_mask].execute()
+            if clocks.system_clock >= clocks.next_event:
+                clocks.run_events()
+
+    def allocate_decoders(self):
+        """ One 'bank_decoders' entry per absolute cartridge address (all
+        banks of the rom), one 'op_decoder' entry per address the cartridge
+        decodes. """
+        cartridge = self.memory.cartridge
+        size = max(getattr(cartridge, 'num_banks', 1), 1) * getattr(cartridge, 'bank_size', 0x1000)
+        self.bank_decoders = [self.lazy_decoder] * size
+        # Cartridges that select banks with more address lines than A0-A11
+        # (eg 'FECartridge') decode a larger window.
+        self.pc_mask = getattr(cartridge, 'ADDRESS_MASK', 0xFFF)
+        self.op_decoder = [self.lazy_decoder] * (self.pc_mask + 1)
+        if hasattr(cartridge, 'set_bank_listener'):
+            cartridge.set_bank_listener(self.map_banks)
+        self.map_banks()
+
+    def map_banks(self):
+        """ Point 'op_decoder' at the decoders of the banks mapped in. The
+        table is updated in place, as the run loops hold a reference. """
+        get_absolute_address = self.memory.cartridge.get_absolute_address
+        op_decoder = self.op_decoder
+        bank_decoders = self.bank_decoders
+        step = self.MAP_STEP
+        for offset in range(0, len(op_decoder), step):
+            absolute = get_absolute_address(0x1000 | offset)
+            op_decoder[offset:offset + step] = bank_decoders[absolute:absolute + step]
+
+    # Smallest unit of the cartridge mappings.
+    MAP_STEP = 0x100
+
+    def create_decoder(self):
+        """ Install the decoder for the current PC, creating it on first
+        execution of its absolute address. """
+        pc = self.pc_state.PC
+        get_absolute_address = self.memory.cartridge.get_absolute_address
+        absolute = get_absolute_address(pc)
+        decoder = self.bank_decoders[absolute]
+        if decoder is self.lazy_decoder:
+            decoder = self.build_decoder()
+            self.bank_decoders[absolute] = decoder
+        # Decoding may have switched banks, from reading a hot spot.
+        if get_absolute_address(pc) == absolute:
+            self.op_decoder[pc & self.pc_mask] = decoder
+        return decoder
+
+    def build_decoder(self):
+        """ Create the decoder for the current PC. """
+        decoder = self.detect_spin_loop()
+        if decoder is None and self.translator is None and self.fuse_instructions:
+            decoder = fusion.detect(self)
+        if decoder is None:
+            if self.translator is None:
+                decoder = OpDecoder(self.pc_state, self.memory, self.instruction_lookup)
+            else:
+                decoder = BlockDecoder(self.pc_state, self.memory, self.instruction_lookup, self.translator)
+        return decoder
+
+    def is_static_code(self, start, end):
+        """ True if the rom code from 'start' up to 'end' can be decoded
+        ahead of execution, ie it isn't cartridge ram, doesn't reach the bank
+        switching hot spots and stays in one bank switched slice. """
+        last = end - 1
+        return (0 != (start & 0x1000) and
+                (start & 0xFFF) >= 2 * getattr(self.memory.cartridge, 'ram_size', 0) and
+                (last & 0xFFF) < translator.BlockTranslator.HOTSPOT_OFFSET and
+                (last & translator.BlockTranslator.SLICE_MASK) == (start & translator.BlockTranslator.SLICE_MASK))
+
+    def detect_spin_loop(self):
+        """ Spin loop decoder, if the current PC is the start of a loop that
+        only reads a device register, eg 'LDA INTIM; BNE loop'. """
+        memory = self.memory
+        pc = self.pc_state.PC
+        offset = pc & 0xFFF
+        # Only static cartridge code, away from bank switching hot spots.
+        if (0 == (pc & 0x1000) or offset >= translator.BlockTranslator.HOTSPOT_OFFSET - 5 or
+                offset < 2 * getattr(memory.cartridge, 'ram_size', 0)):
+            return None
+
+        op_code = memory.read(pc)
+        if op_code not in SpinLoopDecoder.LOADS:
+            return None
+        (size, is_bit) = SpinLoopDecoder.LOADS[op_code]
+        if 2 == size:
+            address = memory.read16(pc + 1)
+        else:
+            address = memory.read(pc + 1)
+        if not memory.is_device(address):
+            return None
+
+        branch_pc = pc + size + 1
+        branch = self.instruction_lookup[memory.read(branch_pc)]
+        if not isinstance(branch, instructions.BranchInstruction):
+            return None
+        delta = memory.read(branch_pc + 1) & 0xFF
+        if delta & 0x80:
+            delta -= 0x100
+        if branch_pc + 2 + delta != pc:
+            return None
+
+        return SpinLoopDecoder(self, self.instruction_lookup[op_code].clone(), branch.clone(), address, is_bit)
+
+    def load_code_cache(self, rom_digest):
+        if self.translator is not None:
+            self.translator.load_code(rom_digest)
+
+    def save_code_cache(self):
+        if self.translator is not None:
+            self.translator.save_code()
+
+    def get_memory_usage(self):
+        """ Approximate bytes used by the decoder table and the decoders
+        (and the instructions they have cloned). """
+        decoders = [d for d in self.bank_decoders if d is not self.lazy_decoder]
+        total = sys.getsizeof(self.bank_decoders) + sys.getsizeof(self.op_decoder)
+        seen = set()
+        for decoder in decoders:
+            total += self._object_size(decoder, seen)
+            execute = decoder.__dict__.get('execute')
+            # Cloned instruction (and its addressing), or translated block.
+            target = getattr(execute, '__self__', execute)
+            if target is not None:
+                total += self._object_size(target, seen)
+                for value in getattr(target, '__dict__', {}).values():
+                    if hasattr(value, 'clone'):
+                        total += self._object_size(value, seen)
+        return (len(decoders), total)
+
+    def _object_size(self, obj, seen):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if hasattr(obj, '__dict__'):
+            size += sys.getsizeof(obj.__dict__)
+        return size
 
     def populate_instruction_map(self):
         dummy = pc_state.PC_Register()
@@ -0,0 +1,189 @@
+""" Fused decoders for common instruction sequences of the 'cpu_gen' core.
+
+    Kernels spend most of their time in a few short sequences, eg
+    'LDA #imm; STA zp', 'LDA (zp),Y; STA WSYNC; STA GRP0' and 'DEY; BPL'.
+    A fused decoder executes the whole sequence in a single call, with the
+    operands decoded once and the clock updates of each instruction
+    combined up to the next memory access.
+
+    Each decoder performs the same memory accesses, at the same clocks and
+    'PC' values, as executing the instructions one at a time. Execution
+    stops part way through the sequence if the clock reaches the clock
+    limit, so events still run between the same instructions.
+"""
+
+from . import instructions
+
+class LoadStoreDecoder(object):
+    """ Immediate or '(zp),Y' register load, followed by stores of the
+    register to fixed addresses. """
+
+    # Op code -> (register, '(zp),Y' addressing)
+    LOADS = {0xA9: ('A', False), 0xA2: ('X', False), 0xA0: ('Y', False),
+             0xB1: ('A', True)}
+
+    # Op code -> (register, operand size)
+    STORES = {0x85: ('A', 1), 0x8D: ('A', 2),
+              0x86: ('X', 1), 0x8E: ('X', 2),
+              0x84: ('Y', 1), 0x8C: ('Y', 2)}
+
+    MAX_STORES = 2
+
+    def __init__(self, core, register, operand, indirect, stores):
+        self.clocks   = core.clocks
+        self.memory   = core.memory
+        self.pc_state = core.pc_state
+        self.register = getattr(core.pc_state, register)
+        self.operand  = operand
+        self.pc       = core.pc_state.PC
+
+        cycle = core.pc_state.CYCLES_TO_CLOCK
+        if indirect:
+            # Read (2 cycles) and '(zp),Y' addressing (3 cycles).
+            self.load_clocks = 5 * cycle
+            self.execute = self.execute_indirect
+        else:
+            self.load_clocks = 2 * cycle
+            self.execute = self.execute_immediate
+
+        # (pc, device write function, clocks before the write), each store
+        # has null read, addressing and register write cycles.
+        self.stores = [(pc, core.memory.write_handler(address), (size + 2) * cycle)
+                       for (pc, address, size) in stores]
+        (last_pc, address, size) = stores[-1]
+        self.end_pc = last_pc + size + 1
+
+    def execute_immediate(self):
+        self.clocks.system_clock += self.load_clocks
+        self.register.set_value(self.operand)
+        self.pc_state.P.set_NZ(self.register.get_value())
+        self.store()
+
+    def execute_indirect(self):
+        memory   = self.memory
+        address  = (memory.read16(self.operand) + self.pc_state.Y.get_value()) & 0xFFFF
+        value    = memory.read(address)
+        self.clocks.system_clock += self.load_clocks
+        self.register.set_value(int(value))
+        self.pc_state.P.set_NZ(self.register.get_value())
+        if address & 0x1000:
+            # The read may have switched banks, leave the stores to their
+            # own decoders.
+            self.pc_state.PC = self.pc + 2
+            return
+        self.store()
+
+    def store(self):
+        clocks   = self.clocks
+        pc_state = self.pc_state
+        for (pc, write, store_clocks) in self.stores:
+            if clocks.system_clock >= clocks.limit:
+                pc_state.PC = pc
+                return
+            pc_state.PC = pc
+            clocks.system_clock += store_clocks
+            write(self.register.get_value())
+        pc_state.PC = self.end_pc
+
+class StepBranchDecoder(object):
+    """ Index register increment or decrement, followed by a branch on the
+    result (N or Z flag), eg 'DEX; BNE loop'. A branch back to the step
+    keeps looping until the branch falls through or the clock limit. """
+
+    # Op code -> (register, step)
+    STEPS = {0xCA: ('X', -1), 0x88: ('Y', -1), 0xE8: ('X', 1), 0xC8: ('Y', 1)}
+
+    def __init__(self, core, register, step, branch, delta):
+        self.clocks   = core.clocks
+        self.pc_state = core.pc_state
+        self.register = getattr(core.pc_state, register)
+        self.step     = step
+        self.pc       = core.pc_state.PC
+
+        cycle = core.pc_state.CYCLES_TO_CLOCK
+        self.step_clocks = 2 * cycle
+        branch_pc = self.pc + 1
+        self.fall_through = branch_pc + 2
+        self.target       = self.fall_through + delta
+        self.not_taken_clocks = 2 * cycle
+        self.taken_clocks     = 3 * cycle
+        if (self.fall_through & 0xF00) != (self.target & 0xF00):
+            self.taken_clocks += cycle
+
+        # Branch outcome for each result of the step.
+        self.taken = []
+        for value in range(0x100):
+            flags = (value & 0x80) | (0x02 if 0 == value else 0)
+            self.taken.append((flags & branch.condition_mask) == branch.condition)
+
+    def execute(self):
+        clocks   = self.clocks
+        register = self.register
+        taken    = self.taken
+        while True:
+            value = (register.get_value() + self.step) & 0xFF
+            register.set_value(value)
+            self.pc_state.P.set_NZ(value)
+            clocks.system_clock += self.step_clocks
+            if clocks.system_clock >= clocks.limit:
+                self.pc_state.PC = self.pc + 1
+                return
+            if not taken[value]:
+                clocks.system_clock += self.not_taken_clocks
+                self.pc_state.PC = self.fall_through
+                return
+            clocks.system_clock += self.taken_clocks
+            if self.target != self.pc or clocks.system_clock >= clocks.limit:
+                self.pc_state.PC = self.target
+                return
+
+def detect(core):
+    """ Fused decoder for the sequence starting at the current PC, or None
+    if it doesn't start a known sequence. """
+    memory = core.memory
+    pc     = core.pc_state.PC
+    op_code = memory.read(pc)
+
+    if op_code in LoadStoreDecoder.LOADS:
+        if not core.is_static_code(pc, pc + 2):
+            return None
+        (register, indirect) = LoadStoreDecoder.LOADS[op_code]
+        operand = memory.read(pc + 1) & 0xFF
+
+        stores = []
+        store_pc = pc + 2
+        while len(stores) < LoadStoreDecoder.MAX_STORES:
+            store = LoadStoreDecoder.STORES.get(memory.read(store_pc))
+            if store is None or store[0] != register:
+                break
+            size = store[1]
+            if not core.is_static_code(pc, store_pc + size + 1):
+                break
+            if 2 == size:
+                address = memory.read16(store_pc + 1)
+            else:
+                address = memory.read(store_pc + 1) & 0xFF
+            if address & 0x1000:
+                # Cartridge writes may switch banks.
+                break
+            stores.append((store_pc, address, size))
+            store_pc += size + 1
+
+        if not stores:
+            return None
+        return LoadStoreDecoder(core, register, operand, indirect, stores)
+
+    if op_code in StepBranchDecoder.STEPS:
+        if not core.is_static_code(pc, pc + 3):
+            return None
+        branch = core.instruction_lookup[memory.read(pc + 1)]
+        if (not isinstance(branch, instructions.BranchInstruction) or
+                branch.condition_mask not in (0x80, 0x02)):
+            return None
+        delta = memory.read(pc + 2) & 0xFF
+        if delta & 0x80:
+            delta -= 0x100
+        (register, step) = StepBranchDecoder.STEPS[op_code]
+        return StepBranchDecoder(core, register, step, branch, delta)
+
+    return None
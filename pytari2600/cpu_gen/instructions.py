@@ -1,4 +1,5 @@
-import ctypes
+from . import addressing
+from .. import alu
 
 class Reading(object):
     def __init__(self, pc_state, memory):
@@ -31,6 +32,15 @@ class AccumulatorReading(Reading):
     def get_reading_time(self):
         return self.pc_state.CYCLES_TO_CLOCK
 
+class RamReading(Reading):
+    """ Reading of an address known to be RIOT ram. """
+    def __init__(self, pc_state, memory, ram):
+        super(RamReading, self).__init__(pc_state, memory)
+        self.ram = ram
+
+    def read(self, address):
+        return self.ram[address & 0x7F]
+
 class Writing(object):
     def __init__(self, pc_state, memory):
         self.pc_state = pc_state
@@ -59,6 +69,33 @@ class NullWriting(Writing):
     def get_writing_time(self):
         return 0
 
+class RamWriting(Writing):
+    """ Writing, of 'writing', to an address known to be RIOT ram. """
+    def __init__(self, writing, ram):
+        super(RamWriting, self).__init__(writing.pc_state, writing.memory)
+        self.ram = ram
+        self._writing_time = writing.get_writing_time()
+
+    def write(self, address, data):
+        self.ram[address & 0x7F] = data
+
+    def get_writing_time(self):
+        return self._writing_time
+
+class BoundWriting(Writing):
+    """ Writing, of 'writing', to a fixed address, through the device write
+    function bound to it (see 'Memory.write_handler'). """
+    def __init__(self, writing, write_function):
+        super(BoundWriting, self).__init__(writing.pc_state, writing.memory)
+        self.write_function = write_function
+        self._writing_time = writing.get_writing_time()
+
+    def write(self, address, data):
+        self.write_function(data)
+
+    def get_writing_time(self):
+        return self._writing_time
+
 class AccumulatorWriting(Writing):
     def __init__(self, pc_state, memory):
         super(AccumulatorWriting, self).__init__(pc_state, memory)
@@ -73,6 +110,13 @@ class InstructionExec(object):
     def __init__(self, pc_state):
         self.pc_state = pc_state
 
+        tables = alu.get_tables()
+        self._adc         = tables.adc
+        self._sbc         = tables.sbc
+        self._adc_decimal = tables.adc_decimal
+        self._sbc_decimal = tables.sbc_decimal
+        self._cmp         = tables.cmp
+
     def NOP_exec(self, data):
         """NOP"""
         return int(data)
@@ -293,73 +337,29 @@ class InstructionExec(object):
 
 
     def set_status_NZ(self, value):
-        self.pc_state.P.set_N((0,1)[0x80 == (value & 0x80)])
-        self.pc_state.P.set_Z((0,1)[0x00 == (value & 0xFF)])
+        self.pc_state.P.set_NZ(value)
 
     def addc(self, a, b, c):
-
+        index = ((c & 1) << 16) | (a << 8) | (b & 0xFF)
         if 0 == self.pc_state.P.get_D():
-            r  = ctypes.c_short(a + b + c).value
-            rc = ctypes.c_byte(a + b + c).value
-            self.pc_state.P.set_N((0,1)[0x80 == (rc & 0x80)])
-            self.pc_state.P.set_Z((0,1)[rc == 0x0])
-            self.pc_state.P.set_V((0,1)[rc != r])   # Overflow
-
-            r = ((a & 0xFF) + (b & 0xFF) + c) & 0xFFFF
-            self.pc_state.P.set_C((0,1)[0x100 == (r & 0x100)])
-            result = (a + b + c)
-        elif 1 == self.pc_state.P.get_D():
-            # Decimal Addition
-            # FIXME need to fix flags
-            #
-            r = ctypes.c_short(((a >> 4) & 0xF)* 10+ ((a & 0xF) %10) + ((b>>4) & 0xF)* 10 + ((b & 0xF) %10) + c).value
-            rc = ctypes.c_byte(a + b + c).value # ???? TODO
-            self.pc_state.P.set_N((0,1)[r < 0])
-            self.pc_state.P.set_Z((0,1)[rc == 0x0])
-            # self.pc_state.P.V = (rc != r) ? 1:0;   # Overflow
-
-            self.pc_state.P.set_C((0,1)[(r > 99) or (r < 0)])
-            result = (((((r/10) % 10) << 4) & 0xf0) + (r%10))
-
-        return result & 0xFF
+            entry = self._adc[index]
+        else:
+            entry = self._adc_decimal[index]
+        self.pc_state.P.set_value((self.pc_state.P.get_value() & ~alu.ADD_SUB_FLAGS) | (entry >> 8))
+        return entry & 0xFF
 
     def subc(self, a, b, c):
-
+        """ 'c' is the borrow (inverted carry). """
+        index = ((c & 1) << 16) | (a << 8) | (b & 0xFF)
         if 0 == self.pc_state.P.get_D():
-            r  = ctypes.c_short(ctypes.c_byte(a).value - ctypes.c_byte(b).value - ctypes.c_byte(c).value).value
-            rs = ctypes.c_byte((a - b - c) & 0xFF).value
-            self.pc_state.P.set_N((0,1)[0x80 == (rs & 0x80)]) # Negative
-            self.pc_state.P.set_Z((0,1)[rs == 0])   # Zero
-            self.pc_state.P.set_V((0,1)[r != rs])   # Overflow
-
-            r = a - b - c 
-            self.pc_state.P.set_C((1,0)[0x100 == (r & 0x100)]) # Carry (not borrow
-            result = a - b - c
-        elif 1 == self.pc_state.P.get_D():
-            # Decimal subtraction
-            # FIXME need to fix flags
-
-            r = ctypes.c_short(((a >> 4) & 0xF)* 10+ ((a & 0xF) %10) - (((b>>4) & 0xF)* 10 + ((b & 0xF) %10)) - c).value
-
-            # rc = a + b + c
-            self.pc_state.P.set_N((0,1)[r < 0])
-            self.pc_state.P.set_Z((0,1)[r == 0x0])
-            #  Need to check/fix conditions for V
-            # self.pc_state.P.V = (rc != r) ? 1:0;   # Overflow
-            self.pc_state.P.set_V(1)   # Overflow
-
-            self.pc_state.P.set_C((0,1)[(r >= 0) and (r <= 99)])
-            result = (((int(r/10) % 10) << 4) & 0xf0) + (r%10)
-
-        return result & 0xFF
+            entry = self._sbc[index]
+        else:
+            entry = self._sbc_decimal[index]
+        self.pc_state.P.set_value((self.pc_state.P.get_value() & ~alu.ADD_SUB_FLAGS) | (entry >> 8))
+        return entry & 0xFF
 
     def cmp(self, a, b):
-        r = ctypes.c_short(ctypes.c_byte(a).value - ctypes.c_byte(b).value).value
-        rs = ctypes.c_byte(a - b).value
-        self.pc_state.P.set_N((0,1)[0x80 == (rs & 0x80)])    # Negative
-        self.pc_state.P.set_Z((0,1)[rs == 0])              # Zero
-        r = (a & 0xFF) - (b & 0xFF)
-        self.pc_state.P.set_C((1,0)[0x100 == (r & 0x100)]) # Carry (not borrow)
+        self.pc_state.P.set_value((self.pc_state.P.get_value() & ~alu.CMP_FLAGS) | self._cmp[(a << 8) | (b & 0xFF)])
 
 class Instruction(object):
 
@@ -405,6 +405,29 @@ class ReadWriteInstruction(Instruction):
         else:
             self.execute = self.rw_execute
         self.execute()
+        self.use_riot_ram()
+        self.bind_device()
+
+    def use_riot_ram(self):
+        """ Zero page accesses to RIOT ram, index the ram directly. """
+        address = self.address
+        ram = getattr(address.memory, 'ram', None)
+        if ram is None or address.__class__ is not addressing.AddressZP or 0 == (address.fixed & 0x80):
+            return
+        if self.read.__class__ is Reading:
+            self.read = RamReading(self.pc_state, self.read.memory, ram)
+        if self.write.__class__ in (Writing, RegWriting):
+            self.write = RamWriting(self.write, ram)
+
+    def bind_device(self):
+        """ Writes to a fixed address, call the device's write function for
+        it directly. """
+        address = self.address
+        if (self.write.__class__ not in (Writing, RegWriting) or
+                address.__class__ not in (addressing.AddressZP, addressing.AddressAbs) or
+                not hasattr(address.memory, 'write_handler')):
+            return
+        self.write = BoundWriting(self.write, address.memory.write_handler(address.fixed))
 
     def rw_execute(self):
         a = self.address
@@ -722,5 +745,4 @@ class PLAInstruction(Instruction):
         self.clocks.system_clock += self.pc_state.CYCLES_TO_CLOCK
 
     def set_status_NZ(self, value):
-        self.pc_state.P.set_N((0,1)[0x80 == (value & 0x80)])
-        self.pc_state.P.set_Z((0,1)[0x00 == (value & 0xFF)])
+        self.pc_state.P.set_NZ(value)
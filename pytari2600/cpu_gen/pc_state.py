@@ -33,22 +33,41 @@ class PC_Register(object):
         return "%X"%(self.value)
 
 class PC_StatusFlags(object):
+    """ N and Z are evaluated lazily: 'set_NZ' only records the result
+        value, which is folded into the flags when they are next read.
+    """
     def __init__(self):
         self._value = 0
+        self._nz = None
+
+    def _resolve(self):
+        nz = self._nz
+        if nz is not None:
+            self._value = (self._value & 0x7D) | (nz & 0x80) | (0 if nz & 0xFF else 0x02)
+            self._nz = None
 
     def get_save_state(self):
+        self._resolve()
         return self._value
 
     def set_save_state(self, state):
         self._value = state
+        self._nz = None
 
     def get_value(self):
+        if self._nz is not None:
+            self._resolve()
         return self._value
 
     def set_value(self, value):
         self._value = value
+        self._nz = None
+
+    def set_NZ(self, value):
+        self._nz = value
 
     def set_N(self, value):
+        self._resolve()
         self._value = (self._value & 0x7F) | ((value & 1) << 7)
 
     def set_V(self, value):
@@ -67,12 +86,14 @@ class PC_StatusFlags(object):
         self._value = (self._value & 0xFB) | ((value & 1) << 2)
 
     def set_Z(self, value):
+        self._resolve()
         self._value = (self._value & 0xFD) | ((value & 1) << 1)
 
     def set_C(self, value):
         self._value = (self._value & 0xFE) | (value & 1)
 
     def get_N(self):
+        self._resolve()
         return (self._value >> 7) & 1
 
     def get_V(self):
@@ -91,6 +112,7 @@ class PC_StatusFlags(object):
         return (self._value >> 2) & 1
 
     def get_Z(self):
+        self._resolve()
         return (self._value >> 1) & 1
 
     def get_C(self):
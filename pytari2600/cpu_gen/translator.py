@@ -0,0 +1,441 @@
+""" Basic block translation for the 'cpu_gen' core.
+
+    Straight-line runs of rom code are decoded once, converted to python
+    source and compiled into a single function.  The generated function
+    performs the same memory accesses and clock updates as executing each
+    instruction in turn, without the per instruction decoder, addressing,
+    reading and writing calls.
+"""
+
+import marshal
+import sys
+from . import addressing
+from . import instructions
+from .. import cache
+
+class _BlockSource(object):
+    """ Accumulates the source for a single translated block. """
+
+    INDENT = '        '
+
+    def __init__(self, start_pc):
+        self.lines    = []
+        self.objects  = []
+        # How to recreate each object, see 'BlockTranslator.resolve'.
+        self.recipes  = []
+        # Set instead of any code, for a block of a single delegated
+        # instruction.
+        self.delegate = None
+        self._pending = 0
+        # Value 'pc_state.PC' holds at the current point of the generated
+        # code, 'None' once a delegated instruction has changed control flow.
+        self._pc      = start_pc
+        # Set if the code indexes the RIOT ram directly.
+        self.uses_ram = False
+
+    def bind(self, obj, recipe):
+        """ Make 'obj' available to the generated code, return its name. """
+        self.objects.append(obj)
+        self.recipes.append(recipe)
+        return 'o%d' % (len(self.objects) - 1)
+
+    def emit(self, line):
+        self.lines.append(self.INDENT + line)
+
+    def add_clock(self, ticks):
+        """ Clock updates are deferred until something can observe them. """
+        self._pending += ticks
+
+    def flush_clock(self):
+        if self._pending:
+            self.emit('clocks.system_clock += %d' % (self._pending))
+            self._pending = 0
+
+    def sync_pc(self, pc):
+        if self._pc != pc:
+            self.emit('pc_state.PC = %d' % (pc))
+            self._pc = pc
+
+    def set_pc(self, pc):
+        """ Record a 'PC' change made by a delegated instruction. """
+        self._pc = pc
+
+    def end(self, pc):
+        self.flush_clock()
+        if self._pc is not None:
+            self.sync_pc(pc)
+
+    def source(self, name, make_name='make'):
+        lines = ['def %s(clocks, memory, pc_state, objects):' % (make_name),
+                 '    A = pc_state.A',
+                 '    X = pc_state.X',
+                 '    Y = pc_state.Y']
+        if self.uses_ram:
+            lines.append('    ram = memory.ram')
+        if self.objects:
+            lines.append('    (%s,) = objects' % (', '.join(['o%d' % (i) for i in range(len(self.objects))])))
+        lines.append('    def %s():' % (name))
+        lines.extend(self.lines or [self.INDENT + 'pass'])
+        lines.append('    return %s' % (name))
+        return '\n'.join(lines) + '\n'
+
+class BlockTranslator(object):
+    """ Translates runs of rom instructions into single python functions.
+
+        A block ends after a branch or jump, after a write that may hit a
+        TIA/RIOT register, or after an access that may bank switch the
+        cartridge.
+    """
+
+    # Limit on the number of instructions folded into a single block.
+    MAX_BLOCK_INSTRUCTIONS = 32
+
+    # Cartridge offsets from here up hold the bank switching hot spots and
+    # vectors. Reading ahead of execution there could switch banks, so they
+    # are left to the instruction decoder.
+    HOTSPOT_OFFSET = 0xFE0
+
+    # Blocks don't cross the smallest bank switched slice (PBCartridge).
+    SLICE_MASK = ~0x3FF
+
+    ROM_ADDRLINE = 0x1000
+
+    def __init__(self, clocks, memory, pc_state, instruction_lookup):
+        self.clocks             = clocks
+        self.memory             = memory
+        self.pc_state           = pc_state
+        self.instruction_lookup = instruction_lookup
+
+        # Address mode -> (fixed operand, expression or None if static,
+        #                  address may be in the cartridge, page delay)
+        self._address_modes = {
+            addressing.AddressIMM: self._address_imm,
+            addressing.AddressZP:  self._address_zp,
+            addressing.AddressZPX: self._address_zpx,
+            addressing.AddressZPY: self._address_zpy,
+            addressing.AddressAbs: self._address_abs,
+            addressing.AddressAbx: self._address_abx,
+            addressing.AddressAby: self._address_aby,
+            addressing.AddressIZX: self._address_izx,
+            addressing.AddressIZY: self._address_izy,
+            }
+
+        self._stack_instructions = (instructions.PHPInstruction,
+                                    instructions.PLPInstruction,
+                                    instructions.PHAInstruction,
+                                    instructions.PLAInstruction)
+
+        self._ram_limit = 0
+
+        self.blocks_compiled = 0
+
+        # Compiled code for each block source, can be kept between runs
+        # (see 'load_code').
+        self._code       = {}
+        self._code_name  = None
+        self._code_added = False
+
+    @staticmethod
+    def is_riot_ram(address):
+        """ True if 'address' is decoded to RIOT ram by memory.Memory. """
+        return (address & 0xDC80) == 0x80 and 0 == (address & 0x200)
+
+    def _in_window(self, start, pc, size):
+        last = pc + size - 1
+        return (0 != (pc & self.ROM_ADDRLINE) and
+                (pc & 0xFFF) >= self._ram_limit and
+                (last & 0xFFF) < self.HOTSPOT_OFFSET and
+                (last & self.SLICE_MASK) == (start & self.SLICE_MASK))
+
+    def translate(self, start):
+        """ Translate the run of instructions starting at 'start'.
+
+            Returns a function equivalent to executing each instruction of
+            the run, or None if 'start' isn't a translatable rom address.
+        """
+        built = self.build_block(start)
+        if built is None:
+            return None
+
+        (block, last_pc, end_pc) = built
+        if block.delegate is not None:
+            return block.delegate.execute
+
+        return self._compile(block, start)
+
+    def build_block(self, start):
+        """ Generate the source for the run of instructions starting at
+            'start'.
+
+            Returns (block, pc of the last instruction, pc following the
+            last instruction), or None if 'start' isn't a translatable rom
+            address.
+        """
+        # Cartridge ram (and its read port) sits at the bottom of the
+        # cartridge address space, code running there isn't translated.
+        self._ram_limit = 2 * getattr(self.memory.cartridge, 'ram_size', 0)
+
+        block    = _BlockSource(start)
+        pc       = start
+        last_pc  = start
+        count    = 0
+        delegate = None
+
+        while count < self.MAX_BLOCK_INSTRUCTIONS:
+            if not self._in_window(start, pc, 1):
+                break
+
+            op_code     = self.memory.read(pc)
+            instruction = self.instruction_lookup[op_code]
+            if instruction is False:
+                # Leave unknown op codes to the instruction decoder.
+                break
+
+            if isinstance(instruction, instructions.ReadWriteInstruction):
+                if instruction.address.__class__ not in self._address_modes:
+                    break
+                size = instruction.address.get_addressing_size() + 1
+                if not self._in_window(start, pc, size):
+                    break
+                ends = self._emit_read_write(block, instruction, op_code, pc, start)
+            elif isinstance(instruction, instructions.SingleByteInstruction):
+                size = 1
+                ends = False
+                self._emit_single_byte(block, instruction, op_code)
+            else:
+                # Stack, branch, jump and interrupt instructions run through
+                # their own execute.
+                size     = 1
+                delegate = instruction.clone()
+                block.flush_clock()
+                block.sync_pc(pc)
+                block.emit('%s()' % (block.bind(delegate.execute, ('delegate', op_code))))
+                if isinstance(instruction, self._stack_instructions):
+                    ends = False
+                    block.set_pc(pc + size)
+                else:
+                    # Control flow, 'PC' is only known at run time.
+                    ends = True
+                    block.set_pc(None)
+
+            last_pc = pc
+            pc     += size
+            count  += 1
+            if ends:
+                break
+
+        if 0 == count:
+            return None
+
+        if 1 == count and delegate is not None:
+            # Nothing to gain from wrapping a single instruction.
+            block.delegate = delegate
+        else:
+            block.end(pc)
+
+        return (block, last_pc, pc)
+
+    def resolve(self, recipe):
+        """ Recreate an object bound to a block, from its recipe. """
+        (kind, key) = recipe
+        if 'write' == kind:
+            # Device write function of the address 'key'.
+            return self.memory.write_handler(key)
+        op_code = key
+        instruction = self.instruction_lookup[op_code]
+        if 'delegate' == kind:
+            return instruction.clone().execute
+        elif 'exec' == kind:
+            return instruction.instruction_exec
+        else:
+            # Single byte instruction 'src' or 'dst' register.
+            return getattr(instruction, kind)
+
+    def load_code(self, rom_digest):
+        """ Use the cached code for the rom with 'rom_digest'. """
+        # Marshalled code is specific to the python version.
+        self._code_name = 'code_%s_%s_%d%d.marshal' % (rom_digest, sys.platform, sys.version_info[0], sys.version_info[1])
+        data = cache.load(self._code_name)
+        if data is not None:
+            try:
+                self._code.update(marshal.loads(data))
+            except (ValueError, EOFError, TypeError):
+                print("Warning: Ignoring invalid code cache %s" % (self._code_name))
+
+    def save_code(self):
+        """ Save the code compiled since 'load_code'. """
+        if self._code_name is not None and self._code_added:
+            cache.save(self._code_name, marshal.dumps(self._code))
+            self._code_added = False
+
+    def _compile(self, block, start):
+        name      = 'block_%x' % (start)
+        source    = block.source(name)
+        code      = self._code.get(source)
+        if code is None:
+            code = compile(source, '<%s>' % (name), 'exec')
+            self._code[source] = code
+            self._code_added = True
+        namespace = {}
+        exec(code, namespace)
+        self.blocks_compiled += 1
+        return namespace['make'](self.clocks, self.memory, self.pc_state, block.objects)
+
+    def _emit_single_byte(self, block, instruction, op_code):
+        src  = block.bind(instruction.src, ('src', op_code))
+        dst  = block.bind(instruction.dst, ('dst', op_code))
+        func = block.bind(instruction.instruction_exec, ('exec', op_code))
+        block.add_clock(self.pc_state.CYCLES_TO_CLOCK)
+        block.emit('%s.set_value(%s(%s))' % (dst, func, src))
+        block.add_clock(self.pc_state.CYCLES_TO_CLOCK)
+
+    def _emit_read_write(self, block, instruction, op_code, pc, start):
+        """ Emit an inlined 'ReadWriteInstruction', return True if the block
+            needs to end after it.
+        """
+        address = instruction.address
+        read    = instruction.read
+        write   = instruction.write
+
+        (fixed, expr, may_be_rom, page_delay) = self._address_modes[address.__class__](pc)
+
+        # Accesses to RIOT ram index the ram directly, 'ram_access' is:
+        # True - always ram, None - ram if the address has bit 7 set (zero
+        # page indexed) or False.
+        ram_access = False
+        if self.memory.ram is not None:
+            if expr is None:
+                ram_access = self.is_riot_ram(fixed)
+            elif address.__class__ in (addressing.AddressZPX, addressing.AddressZPY):
+                ram_access = None
+            if address.__class__ in (addressing.AddressIZX, addressing.AddressIZY) and 0x80 <= fixed < 0xFF:
+                expr = self._ram_pointer(address.__class__, fixed)
+                block.uses_ram = True
+            if ram_access is not False:
+                block.uses_ram = True
+
+        memory_read  = read.__class__  is instructions.Reading
+        memory_write = write.__class__ in (instructions.Writing, instructions.RegWriting)
+        immediate    = address.__class__ is addressing.AddressIMM
+        accessed     = (memory_read and not immediate) or memory_write
+        ends         = False
+
+        if accessed and (expr is not None or not self.is_riot_ram(fixed)):
+            # Keep 'PC' current for anything a device access can observe.
+            block.sync_pc(pc)
+
+        if expr is None:
+            addr = str(fixed)
+            if memory_write and not self.is_riot_ram(fixed):
+                ends = True
+            if memory_read and not immediate and (fixed & self.ROM_ADDRLINE):
+                # Possible bank switch.
+                ends = True
+        else:
+            block.flush_clock()
+            block.emit('addr = %s' % (expr))
+            addr = 'addr'
+            if memory_write:
+                ends = True
+
+        if memory_read and immediate:
+            # Rom data can't change within the block (keyed by absolute address).
+            value = str(self.memory.read(fixed))
+        elif memory_read and ram_access:
+            value = 'ram[%d]' % (fixed & 0x7F)
+        elif memory_read and ram_access is None:
+            block.flush_clock()
+            block.emit('value = ram[addr & 0x7F] if addr & 0x80 else memory.read(addr)')
+            value = 'value'
+        elif memory_read:
+            block.flush_clock()
+            block.emit('value = memory.read(%s)' % (addr))
+            value = 'value'
+        elif read.__class__ is instructions.AccumulatorReading:
+            value = 'A.value'
+        else:
+            value = '0'
+
+        block.add_clock(instruction._read_time + address._time)
+        if page_delay:
+            block.emit('if (addr ^ %d) & 0xF00:' % (fixed))
+            block.emit('    clocks.system_clock += %d' % (address._page_time - address._time))
+
+        func = block.bind(instruction.instruction_exec, ('exec', op_code))
+        block.add_clock(write.get_writing_time())
+        if memory_write and ram_access:
+            block.emit('ram[%d] = %s(%s) & 0xFF' % (fixed & 0x7F, func, value))
+        elif memory_write and ram_access is None:
+            block.flush_clock()
+            block.emit('data = %s(%s) & 0xFF' % (func, value))
+            block.emit('if addr & 0x80:')
+            block.emit('    ram[addr & 0x7F] = data')
+            block.emit('else:')
+            block.emit('    memory.write(addr, data)')
+        elif memory_write and expr is None:
+            # Fixed address, call the device's write function directly.
+            block.flush_clock()
+            handler = block.bind(self.memory.write_handler(fixed), ('write', fixed))
+            block.emit('%s(%s(%s) & 0xFF)' % (handler, func, value))
+        elif memory_write:
+            block.flush_clock()
+            block.emit('memory.write(%s, %s(%s) & 0xFF)' % (addr, func, value))
+        elif write.__class__ is instructions.AccumulatorWriting:
+            block.emit('A.set_value(%s(%s) & 0xFF)' % (func, value))
+        else:
+            block.emit('%s(%s)' % (func, value))
+
+        if memory_read and may_be_rom and not ends:
+            # A data read from the cartridge may switch banks, leaving the
+            # rest of the block stale.
+            next_pc  = pc + address.get_addressing_size() + 1
+            expected = self.memory.cartridge.get_absolute_address(start) + next_pc - start
+            block.flush_clock()
+            block.emit('if (addr & %d) and memory.cartridge.get_absolute_address(%d) != %d:' % (self.ROM_ADDRLINE, next_pc, expected))
+            block.emit('    pc_state.PC = %d' % (next_pc))
+            block.emit('    return')
+
+        return ends
+
+    # Address modes, mirroring 'addressing.py'.
+    def _address_imm(self, pc):
+        return (pc + 1, None, False, False)
+
+    def _address_zp(self, pc):
+        return (self.memory.read(pc + 1), None, False, False)
+
+    def _address_zpx(self, pc):
+        fixed = self.memory.read(pc + 1)
+        return (fixed, '(%d + X.value) & 0xFF' % (fixed), False, False)
+
+    def _address_zpy(self, pc):
+        fixed = self.memory.read(pc + 1)
+        return (fixed, '(%d + Y.value) & 0xFF' % (fixed), False, False)
+
+    def _address_abs(self, pc):
+        return (self.memory.read16(pc + 1), None, False, False)
+
+    def _address_abx(self, pc):
+        fixed = self.memory.read16(pc + 1)
+        return (fixed, '(%d + X.value) & 0xFFFF' % (fixed), True, True)
+
+    def _address_aby(self, pc):
+        fixed = self.memory.read16(pc + 1)
+        return (fixed, '(%d + Y.value) & 0xFFFF' % (fixed), True, True)
+
+    def _address_izx(self, pc):
+        fixed = self.memory.read(pc + 1)
+        return (fixed, 'memory.read16((%d + X.value) & 0xFFFF)' % (fixed), True, False)
+
+    def _address_izy(self, pc):
+        fixed = self.memory.read(pc + 1)
+        return (fixed, '(memory.read16(%d) + Y.value) & 0xFFFF' % (fixed), True, False)
+
+    def _ram_pointer(self, mode, fixed):
+        """ '_address_izx'/'_address_izy' expression, reading the pointer
+            from RIOT ram. A pointer at 0xFF or above isn't in the ram (the
+            stack page starts with TIA mirrors). """
+        if mode is addressing.AddressIZX:
+            return ('ram[(%d + X.value) & 0x7F] + (ram[(%d + X.value) & 0x7F] << 8) if X.value < %d else memory.read16(%d + X.value)' %
+                    (fixed, fixed + 1, 0xFF - fixed, fixed))
+        return '(ram[%d] + (ram[%d] << 8) + Y.value) & 0xFFFF' % (fixed & 0x7F, (fixed + 1) & 0x7F)
@@ -0,0 +1,43 @@
+""" 'cpu_gen' core using blocks translated ahead of time, see
+    'pytari2600.recompile'. Addresses without a translated block are
+    decoded at run time, as 'cpu_gen' does.
+"""
+
+from .. import recompile
+from ..cpu_gen import core
+
+class StaticBlock(object):
+    """ Decoder for a block from the recompiled module. """
+    def __init__(self, execute):
+        self.execute = execute
+
+class Core(core.Core):
+    def __init__(self, clocks, memory, pc_state):
+        super(Core, self).__init__(clocks, memory, pc_state)
+
+        # Absolute address -> (pc, make function, bound object recipes)
+        self.static_blocks = {}
+
+    def load_static_code(self, cart_name):
+        self.static_blocks = recompile.load(self.memory.cartridge, cart_name)
+
+    def build_decoder(self):
+        decoder = self.detect_spin_loop()
+        if decoder is None:
+            decoder = self.static_decoder()
+        if decoder is None:
+            decoder = super(Core, self).build_decoder()
+        return decoder
+
+    def static_decoder(self):
+        pc = self.pc_state.PC
+        entry = self.static_blocks.get(self.memory.cartridge.get_absolute_address(pc))
+        # Blocks are only used from the address mirror they were translated
+        # for, as they set 'PC'.
+        if entry is None or entry[0] != pc:
+            return None
+        (block_pc, make, recipes) = entry
+        objects = [self.translator.resolve(recipe) for recipe in recipes]
+        if make is None:
+            return StaticBlock(objects[0])
+        return StaticBlock(make(self.clocks, self.memory, self.pc_state, objects))
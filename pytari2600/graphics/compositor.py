@@ -0,0 +1,120 @@
+""" Numpy compositing of scan lines for 'Stella._screen_scan', used when
+    numpy is available.
+
+    The integer object scans are kept as arrays of a 6 bit object mask per
+    pixel, spans of a line are drawn with a lookup of the colour, by
+    priority, of each mask.
+"""
+
+import binascii
+
+# Import numpy, if it exists.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Object bits of the pixel masks, in the order of the scans given to 'scan'.
+PF = 0x01
+BL = 0x02
+M1 = 0x04
+P1 = 0x08
+M0 = 0x10
+P0 = 0x20
+
+# Colour of each mask, index to (background, playfield, player 1, player 0).
+BACKGROUND = 0
+PLAYFIELD  = 1
+PLAYER1    = 2
+PLAYER0    = 3
+
+def create(default_color, width):
+    """ Compositor for a display of 'width' pixels, None if numpy isn't
+        available or the colours aren't integers. """
+    if numpy is None or not isinstance(default_color, int):
+        return None
+    return NumpyCompositor(width)
+
+def _colour_slots(pf_priority):
+    """ Colour of each object mask, with the playfield above or below the
+        players. """
+    slots = []
+    for mask in range(64):
+        slot = BACKGROUND
+        if pf_priority:
+            order = ((P1 | M1, PLAYER1), (P0 | M0, PLAYER0), (PF | BL, PLAYFIELD))
+        else:
+            order = ((PF | BL, PLAYFIELD), (P1 | M1, PLAYER1), (P0 | M0, PLAYER0))
+        for (objects, colour) in order:
+            if mask & objects:
+                slot = colour
+        slots.append(slot)
+    return slots
+
+class NumpyCompositor(object):
+    # Spans within a line (usually up to a WSYNC) are quicker drawn by the
+    # 'Stella._screen_scan' bit runs, the numpy calls only pay off for a line
+    # or more.
+    MIN_PIXELS = 160
+    # Fewer runs of objects on a line are quicker filled run by run.
+    MIN_RUNS = 8
+
+    def __init__(self, width):
+        self._width = width
+        self._sources = [None] * 6
+        self._arrays  = [numpy.zeros(width, numpy.uint8)] * 6
+        self._mask    = numpy.zeros(width, numpy.uint8)
+
+        self._slots = [numpy.array(_colour_slots(False), numpy.uint8),
+                       numpy.array(_colour_slots(True), numpy.uint8)]
+        # Colour of each mask, for the last priority and colours drawn.
+        self._colours_key = None
+        self._colours     = None
+
+    def _scan_array(self, bits):
+        """ Integer scan as an array of 0/1 per pixel. """
+        data = binascii.unhexlify('%0*x' % (self._width // 4, bits))
+        packed = numpy.frombuffer(data, numpy.uint8)[::-1]
+        return numpy.unpackbits(packed, bitorder='little')[:self._width]
+
+    def _scan_mask(self, scans):
+        """ Object mask of each pixel, arrays are only rebuilt for scans that
+            changed. """
+        changed = False
+        for i in range(6):
+            if scans[i] != self._sources[i]:
+                self._sources[i] = scans[i]
+                self._arrays[i] = self._scan_array(scans[i]) << i
+                changed = True
+        if changed:
+            arrays = self._arrays
+            self._mask = arrays[0] | arrays[1] | arrays[2] | arrays[3] | arrays[4] | arrays[5]
+        return self._mask
+
+    def scan(self, display_lines, y_start, y_stop, x_start, last_x_stop,
+             pf_priority, colours, scans):
+        """ Draw as the 'Stella._screen_scan' runs, 'colours' is
+            (background, playfield, player 1, player 0) and 'scans' is
+            (pf, bl, m1, p1, m0, p0). Collisions are left to the caller. """
+        mask = self._scan_mask(scans)
+        key  = (pf_priority, colours)
+        if key != self._colours_key:
+            self._colours_key = key
+            self._colours = numpy.array(colours)[self._slots[pf_priority]]
+        colours = self._colours
+
+        for y in range(y_start, y_stop + 1):
+            if y == y_stop:
+                x_stop = last_x_stop
+            else:
+                x_stop = self._width - 1
+
+            if x_start < x_stop:
+                span = mask[x_start:x_stop]
+                line = display_lines[y]
+                if isinstance(line, list):
+                    line[x_start:x_stop] = colours[span].tolist()
+                else:
+                    line[x_start:x_stop] = colours[span]
+
+            x_start = 0
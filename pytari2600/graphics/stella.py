@@ -1,6 +1,26 @@
+import collections
+import copy
 import ctypes
-import time
 import pkg_resources
+from .. import cache
+from . import compositor
+
+def scan_to_bits(scan):
+    """ Scan list of pixel flags as an integer, bit x set for pixel x. """
+    bits = 0
+    for x in reversed(range(len(scan))):
+        bits = (bits << 1) | (1 if scan[x] else 0)
+    return bits
+
+def bits_to_scan(bits):
+    """ Integer scan as a list of 'Stella.FRAME_WIDTH' pixel flags. """
+    return [0 != (bits >> x) & 1 for x in range(Stella.FRAME_WIDTH)]
+
+def rotate_bits(bits, shift):
+    """ Move the pixels of an integer scan 'shift' pixels to the right,
+        wrapping around the line. """
+    shift %= Stella.FRAME_WIDTH
+    return ((bits << shift) | (bits >> (Stella.FRAME_WIDTH - shift))) & Stella.FULL_SCAN
 
 class PlayfieldState(object):
     """  Playfield state.
@@ -14,7 +34,7 @@ class PlayfieldState(object):
         self.pf2    = 0
         self.ctrlpf = 0
 
-        self._pf_lookup = [False] * Stella.FRAME_WIDTH
+        self._pf_bits = 0
         self._pre_calc_playfield()
 
     def get_save_state(self):
@@ -34,16 +54,22 @@ class PlayfieldState(object):
         self.update()
 
     def _pre_calc_playfield(self):
-        """ Pre-calc playfield lists. 
+        (self._pf0_lookup, self._pf1_lookup, self._pf2_lookup,
+         self._pf0_reversed, self._pf1_reversed, self._pf2_reversed) = cache.shared_table('playfield_bits', PlayfieldState._build_playfield_lookups)
+
+    @staticmethod
+    def _build_playfield_lookups():
+        """ Pre-calc playfield scans, as integers, and the reversed scans
+            for the reflected right half.
 
             Bit order for displaying pf1 is reverse to pf0 & pf2.
             Order:
             PF0: 4,5,6,7, PF1: 7,6,5,4,3,2,1,0 PF2: 0,1,2,3,4,5,6,7
         """
 
-        self._pf0_lookup = []
-        self._pf1_lookup = []
-        self._pf2_lookup = []
+        pf0_lookup = []
+        pf1_lookup = []
+        pf2_lookup = []
 
         for i in range(256):
             pf_lookup = [False]*8
@@ -56,28 +82,41 @@ class PlayfieldState(object):
             # Expand to 4-pixels
             pf_lookup = [x for x in pf_lookup for _ in (0,1,2,3)]
 
-            self._pf2_lookup.append(list(pf_lookup))
+            pf2_lookup.append(list(pf_lookup))
             pf_lookup.reverse()
-            self._pf1_lookup.append(list(pf_lookup))
+            pf1_lookup.append(list(pf_lookup))
 
         # PF0 is only 4-bit encoding.
         for i in range(16):
-            self._pf0_lookup.append(self._pf2_lookup[i*16][16:32])
+            pf0_lookup.append(pf2_lookup[i*16][16:32])
+
+        lookups = []
+        for reverse in (False, True):
+            for lookup in (pf0_lookup, pf1_lookup, pf2_lookup):
+                if reverse:
+                    lookups.append([scan_to_bits(scan[::-1]) for scan in lookup])
+                else:
+                    lookups.append([scan_to_bits(scan) for scan in lookup])
+        return tuple(lookups)
 
     def get_playfield_scan(self):
-        return self._pf_lookup
+        return bits_to_scan(self._pf_bits)
+
+    def get_playfield_bits(self):
+        return self._pf_bits
 
     def update(self):
         """ Pre-compute the playfield on register change. """
-        self._pf_lookup = []
-        field = self._pf0_lookup[int(self.pf0/16)] + self._pf1_lookup[self.pf1] + self._pf2_lookup[self.pf2]
-        self._pf_lookup.extend(field)
+        pf0 = int(self.pf0/16)
+        field = self._pf0_lookup[pf0] | (self._pf1_lookup[self.pf1] << 16) | (self._pf2_lookup[self.pf2] << 48)
 
         # If right half is reversed, then reverse it.
         if self.ctrlpf & 0x1:
-            field.reverse()
+            right = self._pf2_reversed[self.pf2] | (self._pf1_reversed[self.pf1] << 32) | (self._pf0_reversed[pf0] << 64)
+        else:
+            right = field
 
-        self._pf_lookup.extend(field)
+        self._pf_bits = field | (right << 80)
 
     def update_pf0(self, data):   
         self.pf0 = data
@@ -109,7 +148,7 @@ class BallState(object):
 
         self._enabled  = False
 
-        self._scan_line = [False] * Stella.FRAME_WIDTH
+        self._scan_bits = 0
 
     def get_save_state(self):
         state = {}
@@ -166,14 +205,17 @@ class BallState(object):
         """ Calculate an entire scanline for the ball, re-calculated on
         parameter change. """
         # Default scan to false.
-        self._scan_line = [False] * Stella.FRAME_WIDTH
+        self._scan_bits = 0
 
         if self._enabled:
-            for x in range(self._x_min, self._x_max):
-               self._scan_line[x % Stella.FRAME_WIDTH] = True
+            width = self._x_max - self._x_min
+            self._scan_bits = rotate_bits((1 << width) - 1, self._x_min)
 
     def get_ball_scan(self):
-        return self._scan_line
+        return bits_to_scan(self._scan_bits)
+
+    def get_ball_bits(self):
+        return self._scan_bits
 
 class MissileState(object):
 
@@ -187,7 +229,7 @@ class MissileState(object):
         self._gap    = 0
 
         # Default scan to false.
-        self._scan_line = [False] * Stella.FRAME_WIDTH
+        self._scan_bits = 0
 
     def get_save_state(self):
         state = {}
@@ -230,19 +272,21 @@ class MissileState(object):
         """ Pre-calculate an entire scan line, as update is called relatively
             infrequently. 
         """
-        self._scan_line = [False] * Stella.FRAME_WIDTH
+        self._scan_bits = 0
 
         if self.enam & 0x02:
+            # Uses same stretching as 'ball'
+            width = 1 << ((self.nusiz & 0x30) >> 4)
             for n in range(self._number):
-                # Uses same stretching as 'ball'
-                width = 1 << ((self.nusiz & 0x30) >> 4)
                 # Uses similar position to 'player'
-                for i in range(width):
-                    x = (i +self.resm + n*self._gap*8 - Stella.HORIZONTAL_BLANK) % Stella.FRAME_WIDTH 
-                    self._scan_line[x] = True
+                x = self.resm + n*self._gap*8 - Stella.HORIZONTAL_BLANK
+                self._scan_bits |= rotate_bits((1 << width) - 1, x)
 
     def get_missile_scan(self):
-        return self._scan_line
+        return bits_to_scan(self._scan_bits)
+
+    def get_missile_bits(self):
+        return self._scan_bits
 
 class PlayerState(object):
     def __init__(self, clocks):
@@ -262,7 +306,7 @@ class PlayerState(object):
 
         self._pos_start = 0
 
-        self._scan_line = [False] * Stella.FRAME_WIDTH
+        self._scan_bits = 0
 
         self._pre_calc_player()
 
@@ -311,8 +355,13 @@ class PlayerState(object):
         self.update()
 
     def _pre_calc_player(self):
-        """ Precalculate all number, gap, size, graphic combinations. """
-        self._player_scan_unshifted = []
+        # Identical for every player, shared and cached between runs.
+        self._player_scan_unshifted = cache.shared_table('player_scan_bits', PlayerState._build_player_scans)
+
+    @staticmethod
+    def _build_player_scans():
+        """ Precalculate all number, gap, size, graphic combinations, as
+            integer scans. """
 
         # Only 1,2,3 required, but 0..3 calculated
         NUMBER_RANGE = 4
@@ -326,17 +375,17 @@ class PlayerState(object):
         GRAPHIC_RANGE = 256
 
         # Create enough empty lists to allow direct indexing.
-        self._player_scan_unshifted = [[] for x in range(NUMBER_RANGE)]
+        player_scans = [[] for x in range(NUMBER_RANGE)]
         for number in [1,2,3]:
 
-            self._player_scan_unshifted[number] = [[] for x in range(SIZE_RANGE)]
+            player_scans[number] = [[] for x in range(SIZE_RANGE)]
             for size in [1,2,4]:
 
-                self._player_scan_unshifted[number][size] = [[] for x in range(GAP_RANGE)]
+                player_scans[number][size] = [[] for x in range(GAP_RANGE)]
                 for gap in [0,2,4,8]:
-                    self._player_scan_unshifted[number][size].append([])
+                    player_scans[number][size].append([])
                     for reflect in range(2):
-                        self._player_scan_unshifted[number][size][gap].append([])
+                        player_scans[number][size][gap].append([])
                         for g in range(GRAPHIC_RANGE):
                             # Create the 8-bit 'graphic'
                             graphic = [False] * 8
@@ -355,7 +404,9 @@ class PlayerState(object):
                                 offset = n*gap*8
                                 scan[offset:offset + len(graphic)] = graphic
 
-                            self._player_scan_unshifted[number][size][gap][reflect].append(scan)
+                            player_scans[number][size][gap][reflect].append(scan_to_bits(scan))
+
+        return player_scans
 
     def update(self):
         if (0 == (self.vdelp & 0x1)):
@@ -364,7 +415,7 @@ class PlayerState(object):
             self._grp = self.pOld
 
         if 0 == self._grp:
-            self._scan_line = [False] * 160
+            self._scan_bits = 0
         else:
             (number, size, gap) = Stella.nusize(self.nusiz)
             self._number = number
@@ -383,13 +434,15 @@ class PlayerState(object):
 
     def _calc_player_scan(self):
         # Rotate the scan.
-        rotation = Stella.FRAME_WIDTH-self._pos_start
         scan = self._player_scan_unshifted[self._number][self._size][self._gap][self._reflect][self._grp]
-        self._scan_line = scan[rotation:] + scan[:rotation]
+        self._scan_bits = rotate_bits(scan, self._pos_start)
                             
         
     def get_player_scan(self):
-        return self._scan_line
+        return bits_to_scan(self._scan_bits)
+
+    def get_player_bits(self):
+        return self._scan_bits
 
 class LineState(object):
   """ Line state used per stella line. """
@@ -423,6 +476,14 @@ class LineState(object):
       self.hmbl            = state['hmbl']
 
 class CollisionState(object):
+    """ Collision latches.
+        Drawn scans are only recorded, the latches are worked out from them
+        when read (most roms rarely read them).
+    """
+
+    # Recorded scans to hold before working out the latches.
+    MAX_PENDING = 64
+
     def __init__(self):
         self._cxmp = [0,0]
         self._cxpfb = [0, 0]
@@ -430,7 +491,40 @@ class CollisionState(object):
         self._cxblpf = 0
         self._cxppmm = 0
 
+        # (object scans, drawn pixels) of each scan since the latches were
+        # last worked out.
+        self._pending = []
+
+    def add_scan(self, objects, drawn):
+        """ Record the integer scans 'objects', (p0, p1, m0, m1, bl, pf), drawn
+            over the pixels 'drawn'. """
+        self._pending.append((objects, drawn))
+        if len(self._pending) >= self.MAX_PENDING:
+            self.resolve()
+
+    def resolve(self):
+        """ Latch the collisions of the recorded scans. """
+        for ((p0, p1, m0, m1, bl, pf), drawn) in self._pending:
+            # Pixels drawn with more than one object.
+            overlap = ((p0 & (p1 | m0 | m1 | bl | pf)) |
+                       (p1 & (m0 | m1 | bl | pf)) |
+                       (m0 & (m1 | bl | pf)) |
+                       (m1 & (bl | pf)) |
+                       (bl & pf))
+            if overlap & drawn:
+                # Collisions of every pair of objects drawn over the same pixels.
+                objects = (p0 & drawn, p1 & drawn, m0 & drawn, m1 & drawn, bl & drawn, pf & drawn)
+                for i in range(6):
+                    for j in range(i + 1, 6):
+                        if objects[i] & objects[j]:
+                            hits = [False] * 6
+                            hits[i] = True
+                            hits[j] = True
+                            self.update_collisions(*hits)
+        self._pending = []
+
     def get_save_state(self):
+        self.resolve()
         state = {}
         state['cxmp']   = self._cxmp
         state['cxpfb']  = list(self._cxpfb)
@@ -445,8 +539,10 @@ class CollisionState(object):
         self._cxmfb  = state['cxmfb']
         self._cxblpf = state['cxblpf']
         self._cxppmm = state['cxppm']
+        self._pending = []
 
     def clear(self):
+        self._pending = []
         self._cxmp = [0,0]
         self._cxpfb = [0, 0]
         self._cxmfb = [0, 0]
@@ -494,6 +590,70 @@ class CollisionState(object):
         if p1 & pf:
             self._cxpfb[1]     |= 0x80 # p1 & pf
 
+class LineCache(object):
+    """ Least recently used cache of drawn lines.
+        A line's pixels only depend on the object scans, colours and
+        priority it's drawn with (the key), so any span drawn with a cached
+        key is copied from the cached row. Only lines drawn with a single
+        key, without mid-line register changes, are cached.
+    """
+
+    MAX_LINES = 256
+
+    def __init__(self):
+        self._rows = collections.OrderedDict()
+        # Line being drawn, and the key it was drawn with so far (None if
+        # it changed mid-line).
+        self._line_y   = None
+        self._line_key = None
+
+        self.hits   = 0
+        self.misses = 0
+
+    def skip_line(self):
+        """ Forget the line being drawn, for lines left undrawn. """
+        self._line_y   = None
+        self._line_key = None
+
+    def get(self, key):
+        """ Cached row drawn with 'key', None if there isn't one. """
+        row = self._rows.pop(key, None)
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._rows[key] = row
+        return row
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return float(self.hits) / lookups
+
+    def drawn(self, key, display_lines, y_start, y_stop, x_start):
+        """ Cache the lines completed by a scan drawn with 'key'. """
+        if x_start == 0:
+            completed = y_start
+        elif y_start == self._line_y and key == self._line_key:
+            completed = y_start
+        else:
+            completed = y_start + 1
+
+        if y_start == y_stop:
+            # Line isn't finished yet.
+            self._line_y   = y_start
+            self._line_key = key if completed == y_start else None
+            return
+
+        if completed < y_stop and key not in self._rows:
+            self._rows[key] = copy.copy(display_lines[completed])
+            if len(self._rows) > self.MAX_LINES:
+                self._rows.popitem(last=False)
+
+        self._line_y   = y_stop
+        self._line_key = key
+
 class Colors(object):
 
     def __init__(self):
@@ -521,6 +681,8 @@ class Stella(object):
 
     HORIZONTAL_BLANK  = 68
     FRAME_WIDTH       = 160
+    # Every pixel of an integer scan.
+    FULL_SCAN         = (1 << FRAME_WIDTH) - 1
     FRAME_HEIGHT      = 280
     PIXEL_HEIGHT      = 2
     PIXEL_WIDTH       = 4
@@ -579,15 +741,33 @@ class Stella(object):
           self._display_lines.append([self.default_color]*self.FRAME_WIDTH)
 
         self._collision_state = CollisionState()
+        # Drawn lines, None if the colours can't be cached.
+        self.line_cache = None
+        if isinstance(self.default_color, int):
+            self.line_cache = LineCache()
+        # Numpy drawing of longer scans, None to only fill runs of object bits.
+        self._compositor = compositor.create(self.default_color, self.FRAME_WIDTH)
         # Dummy input return values
         self._inpt = [0, 0, 0, 0, 0, 0] 
 
-        self._debug_display_time = 0
+        # Frames are drawn and displayed if rendering is on, for one frame in
+        # every 'frameskip + 1'. Skipped frames still latch collisions.
+        self._render_enabled = True
+        self._frameskip      = 0
+        self._frame_count    = 0
+        self._render         = True
+
         self._vsync_debug_output_clock = 0
 
         # Initialse write lookup
         self._populate_write_lookup()
 
+        # Display and audio updates are driven by clock events, rather than
+        # checked on each access.
+        self._audio_event = None
+        self._schedule_audio()
+        self.clocks.schedule(self.clocks.system_clock, self._update_scans)
+
         self.driver_open_display()
 
     def get_save_state(self):
@@ -631,6 +811,7 @@ class Stella(object):
 
         # Update after load
         self._update_scans()
+        self._schedule_audio()
 
     def driver_open_display(self):
         """ Open display function to be implemented based on implementing
@@ -645,10 +826,10 @@ class Stella(object):
         raise Exception("missing implementation ")
 
     def read(self, address):
-        self._update_scans()
-        self.tiasound.step()
-
         masked_address = address & 0xF
+        if masked_address < 0x8:
+            self._collision_state.resolve()
+
         if 0x0   == masked_address:
             result = self._collision_state._cxmp[0]
         elif 0x1 == masked_address:
@@ -686,16 +867,34 @@ class Stella(object):
 
         return result
 
-    def write(self, address, data):
-        self._update_scans()
-        self.tiasound.step()
+    def peek(self, address, clock):
+        """ Value a read at 'clock' returns. Reads have no side effects, and
+            the values only change on writes or input changes. """
+        return self.read(address)
+
+    def next_change(self, address, clock):
+        return self.clocks.NEVER
 
+    def write(self, address, data):
         if False == self._is_blank:
             self._screen_scan(self.nextLine, self._display_lines)
 
         masked_address = address & 0x3F
         self._write_function[masked_address](data)
 
+    def write_handler(self, address):
+        """ Function equivalent to 'write(address, data)', for binding writes
+            to a fixed register ahead of time. """
+        write_function = self._write_function[address & 0x3F]
+
+        # The screen catches up on every write (as 'write'), the drawn lines
+        # depend on where the scans are split.
+        def write(data):
+            if False == self._is_blank:
+                self._screen_scan(self.nextLine, self._display_lines)
+            write_function(data)
+        return write
+
     def _dummy_write(self, data):
         pass
 
@@ -878,7 +1077,16 @@ class Stella(object):
       y_start = int(last_screen_pos/Stella.HORIZONTAL_TICKS) - self.START_DRAW_Y
       y_stop  = int(screen_pos/Stella.HORIZONTAL_TICKS) - self.START_DRAW_Y
 
-      if y_stop < (self.END_DRAW_Y - self.START_DRAW_Y):
+      x_start = 0
+      if (last_screen_pos % Stella.HORIZONTAL_TICKS) >= Stella.HORIZONTAL_BLANK:
+          x_start = (last_screen_pos % Stella.HORIZONTAL_TICKS) - Stella.HORIZONTAL_BLANK
+
+      last_x_stop = 0
+      if (screen_pos % Stella.HORIZONTAL_TICKS) >= Stella.HORIZONTAL_BLANK:
+        last_x_stop = screen_pos % Stella.HORIZONTAL_TICKS - Stella.HORIZONTAL_BLANK
+
+      # Nothing to draw within the horizontal blank.
+      if y_stop < (self.END_DRAW_Y - self.START_DRAW_Y) and (y_start < y_stop or x_start < last_x_stop):
 
         priority_ctrl = (0 == next_line.ctrlpf & self.PF_PRIORITY)
         nl_pColor0  = next_line.pColor[0]
@@ -886,81 +1094,97 @@ class Stella(object):
         nl_pfColor  = next_line.playfieldColor
         nl_bgColor  = next_line.backgroundColor
 
-        p0_scan = self.p0_state.get_player_scan()
-        p1_scan = self.p1_state.get_player_scan()
-        pf_scan = self.playfield_state.get_playfield_scan()
-        m0_scan = self.missile0.get_missile_scan()
-        m1_scan = self.missile1.get_missile_scan()
-        bl_scan = self.ball.get_ball_scan()
-
-        x_start = 0
-        if (last_screen_pos % Stella.HORIZONTAL_TICKS) >= Stella.HORIZONTAL_BLANK:
-            x_start = (last_screen_pos % Stella.HORIZONTAL_TICKS) - Stella.HORIZONTAL_BLANK
-
-        last_x_stop = 0
-        if (screen_pos % Stella.HORIZONTAL_TICKS) >= Stella.HORIZONTAL_BLANK:
-          last_x_stop = screen_pos % Stella.HORIZONTAL_TICKS - Stella.HORIZONTAL_BLANK
-
-        for y in range(y_start, y_stop+1):
-    
-          if y == y_stop:
-            x_stop = last_x_stop
+        p0_bits = self.p0_state.get_player_bits()
+        p1_bits = self.p1_state.get_player_bits()
+        pf_bits = self.playfield_state.get_playfield_bits()
+        m0_bits = self.missile0.get_missile_bits()
+        m1_bits = self.missile1.get_missile_bits()
+        bl_bits = self.ball.get_ball_bits()
+
+        pfbl_bits = pf_bits | bl_bits
+        p1m1_bits = p1_bits | m1_bits
+        p0m0_bits = p0_bits | m0_bits
+        objects_bits = pfbl_bits | p1m1_bits | p0m0_bits
+
+        # Pixels drawn on any of the lines, for the collisions.
+        if y_start == y_stop:
+          drawn = (1 << last_x_stop) - (1 << x_start)
+        else:
+          drawn = ((1 << (self.FRAME_WIDTH - 1)) - (1 << x_start)) | ((1 << last_x_stop) - 1)
+          if y_stop - y_start > 1:
+            drawn = (1 << (self.FRAME_WIDTH - 1)) - 1
+        if objects_bits & drawn:
+          self._collision_state.add_scan((p0_bits, p1_bits, m0_bits, m1_bits, bl_bits, pf_bits), drawn)
+
+        if not self._render:
+          self._last_screen_update_clock = self.clocks.system_clock + FUTURE_PIXELS
+          return
+
+        line_cache = self.line_cache
+        row = None
+        if line_cache is not None:
+          key = (p0_bits, p1_bits, m0_bits, m1_bits, bl_bits, pf_bits,
+                 nl_bgColor, nl_pfColor, nl_pColor1, nl_pColor0, priority_ctrl)
+          row = line_cache.get(key)
+        first_x_start = x_start
+
+        # Numpy drawing of long scans with many runs of objects, the
+        # bit runs are quicker drawn for sparse lines.
+        pixels = (y_stop - y_start) * (self.FRAME_WIDTH - 1) + last_x_stop - x_start
+        if row is not None:
+          for y in range(y_start, y_stop+1):
+            if y == y_stop:
+              x_stop = last_x_stop
+            else:
+              x_stop = self.FRAME_WIDTH - 1
+            display_lines[y][x_start:x_stop] = row[x_start:x_stop]
+            x_start = 0
+        elif (self._compositor is not None and pixels >= self._compositor.MIN_PIXELS and
+                bin(objects_bits ^ (objects_bits << 1)).count('1') >= 2 * self._compositor.MIN_RUNS):
+          self._compositor.scan(display_lines, y_start, y_stop, x_start, last_x_stop,
+                                not priority_ctrl,
+                                (nl_bgColor, nl_pfColor, nl_pColor1, nl_pColor0),
+                                (pf_bits, bl_bits, m1_bits, p1_bits, m0_bits, p0_bits))
+        else:
+          # Priorities (bit 2 set):  Priorities (bit 2 clear):
+          #  PF, BL                   P0, M0
+          #  P0, M0                   P1, M1
+          #  P1, M1                   PF, BL
+          #  BK                       BK
+          # Objects are drawn lowest priority first, over the background.
+          if priority_ctrl:
+            layers = ((pfbl_bits, nl_pfColor), (p1m1_bits, nl_pColor1), (p0m0_bits, nl_pColor0))
           else:
-            x_stop = self.FRAME_WIDTH - 1
-    
-          current_y_line = display_lines[y]
-          for x in range(x_start, x_stop):
+            layers = ((p1m1_bits, nl_pColor1), (p0m0_bits, nl_pColor0), (pfbl_bits, nl_pfColor))
+
+          for y in range(y_start, y_stop+1):
     
-            pf = pf_scan[x]
-            bl = bl_scan[x]
-            m1 = m1_scan[x]
-            p1 = p1_scan[x]
-            m0 = m0_scan[x]
-            p0 = p0_scan[x]
-
-            # Priorities (bit 2 set):  Priorities (bit 2 clear):
-            #  PF, BL                   P0, M0
-            #  P0, M0                   P1, M1
-            #  P1, M1                   PF, BL
-            #  BK                       BK
-            pixelColor = nl_bgColor
-            hits = 0
-            if priority_ctrl:
-              if pf or bl: 
-                  pixelColor = nl_pfColor
-                  hits += bl + pf
-              if p1 or m1: 
-                  pixelColor = nl_pColor1
-                  hits += m1 + p1
-              if p0 or m0: 
-                  pixelColor = nl_pColor0
-                  hits += m0 + p0
+            if y == y_stop:
+              x_stop = last_x_stop
             else:
-              if p1 or m1: 
-                  pixelColor = nl_pColor1
-                  hits += m1 + p1
-              if p0 or m0: 
-                  pixelColor = nl_pColor0
-                  hits += m0 + p0
-              if pf or bl: 
-                  pixelColor = nl_pfColor
-                  hits += bl + pf
-
-            if hits > 1:
-                self._collision_state.update_collisions(p0, p1, m0, m1, bl, pf)
-
-#       Display scan 'start position'.
-#            ps0 = self.p0_state._pos_start
-#            ps1 = self.p1_state._pos_start
-#            if x == ps0:
-#                pixelColor = self._colors.get_color(2)
-#            if x == ps1:
-#                pixelColor = self._colors.get_color(3)
-#
-            current_y_line[x] = pixelColor
-
-          x_start = 0
-    
+              x_stop = self.FRAME_WIDTH - 1
+
+            if x_start < x_stop:
+              current_y_line = display_lines[y]
+              current_y_line[x_start:x_stop] = [nl_bgColor] * (x_stop - x_start)
+
+              span = (1 << x_stop) - (1 << x_start)
+              if objects_bits & span:
+                for (layer, color) in layers:
+                  # Fill each run of set bits in the span.
+                  run_bits = layer & span
+                  while run_bits:
+                    x = (run_bits & -run_bits).bit_length() - 1
+                    run = run_bits >> x
+                    width = (run ^ (run + 1)).bit_length() - 1
+                    current_y_line[x:x + width] = [color] * width
+                    run_bits &= -1 << (x + width)
+
+            x_start = 0
+
+        if line_cache is not None:
+          line_cache.drawn(key, display_lines, y_start, y_stop, first_x_start)
+
       self._last_screen_update_clock = self.clocks.system_clock + FUTURE_PIXELS
 
     @staticmethod
@@ -985,13 +1209,41 @@ class Stella(object):
 
     def _update_scans(self):
         if self._is_update_time:
-            tmp = time.clock()
-            print(tmp - self._debug_display_time)
-            self._debug_display_time = tmp
-
             self._is_update_time = False
 
-            self.driver_update_display()
+            if self._render:
+                self.driver_update_display()
+            self._next_frame()
+
+    def set_render(self, enabled):
+        """ Draw and display frames (the default), or only keep the
+            collisions and timing. Applies from the next frame. """
+        self._render_enabled = enabled
+
+    def set_frameskip(self, frameskip):
+        """ Only draw one frame in every 'frameskip + 1'. """
+        self._frameskip   = frameskip
+        self._frame_count = 0
+
+    def is_rendering(self):
+        """ True if the current frame is being drawn. """
+        return self._render
+
+    def _next_frame(self):
+        self._frame_count += 1
+        self._render = self._render_enabled and 0 == self._frame_count % (self._frameskip + 1)
+        if not self._render and self.line_cache is not None:
+            # Lines aren't drawn, so aren't completed.
+            self.line_cache.skip_line()
+
+    def _schedule_audio(self):
+        self.clocks.cancel(self._audio_event)
+        if self.tiasound.step_clocks:
+            self._audio_event = self.clocks.schedule(self.clocks.system_clock + self.tiasound.step_clocks, self._step_audio)
+
+    def _step_audio(self):
+        self.tiasound.step()
+        self._schedule_audio()
 
     def _draw_display(self):
         self.poll_events()
@@ -1023,6 +1275,7 @@ class Stella(object):
             if self.VSYNC_ON == (data & self.VSYNC_MASK):
                 self._is_update_time = True
                 self._is_vsync = True
+                self.clocks.schedule(self.clocks.system_clock, self._update_scans)
         else:
             if self.VSYNC_OFF == (data & self.VSYNC_MASK):
                 self._is_vsync = False
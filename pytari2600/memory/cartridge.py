@@ -1,477 +1,369 @@
 """
     Implementations of different cartridge types.
-"""
-
-class PBCartridge(object):
-    MAXBANKS = 8
-    BANKSIZE = 0x0400
-
-    def __init__(self, file_name):
-
-        self.max_banks = PBCartridge.MAXBANKS
-        self.bank_size = PBCartridge.BANKSIZE
-
-        self._slice = [0]*4
-        self._slice[0] = 4
-        self._slice[1] = 5
-        self._slice[2] = 6
-        self._slice[3] = 7
-
-        self.num_banks = 0
-        self.current_bank = 0
-
-        self._file_name = file_name
-        self._load_cartridge(file_name)
-
-    def get_save_state(self):
-        state = {}
-        state['current_bank'] = self.current_bank 
-        state['file_name']    = self._file_name 
-        state['slices']       = list(self._slice)
-        return state
-
-    def set_save_state(self, state):
-        self.current_bank = state['current_bank'] 
-        self._file_name   = state['file_name']
-        self._slice       = list(state['slices'])
-
-    def get_absolute_address(self, address):
-        absolute = self.bank_size * self._slice[(address & 0xC00) >> 10] + (address & 0x3FF)
-        return absolute
-
-    def write(self, address, data):
-        address = address & 0xFFF
 
-        if 0xFE0 == (address & 0xFF8):
-            self._slice[0] = address & 0x7
+    Each cartridge type describes its bank switching to 'BankedCartridge'
+    (see 'describe'): the size of the rom banks, the bank mapped into each
+    slice of the cartridge window at power on, the hot spots that switch
+    banks and the ram windows. The read, write and 'get_absolute_address'
+    functions are created from the description when the rom is loaded.
 
-        elif 0xFE8 == (address & 0xFF8):
-            self._slice[1] = address & 0x7
+    Reads and writes index a map of the window offsets with side effects
+    (hot spots and ram windows), other reads are a single index of a copy of
+    the banks currently mapped in.
 
-        elif 0xFF0 == (address & 0xFF8):
-            self._slice[2] = address & 0x7
+    Rom banks are read only views of a memory map of the rom file, so
+    processes running the same rom share it.
 
-    def read(self, address):
-        """
-           0xFF6 == address: Last bank - 3
-           0xFF7 == address: Last bank - 2
-           0xFF8 == address: Last bank - 1
-           0xFF9 == address: Last bank
-        """
-        address = address & 0xFFF
-        if 0xFE0 == (address & 0xFF8):
-            self._slice[0] = address & 0x7
-
-        elif 0xFE8 == (address & 0xFF8):
-            self._slice[1] = address & 0x7
-
-        elif 0xFF0 == (address & 0xFF8):
-            self._slice[2] = address & 0x7
-
-        return self.cartridge_banks[self._slice[(address & 0xC00) >> 10]][address & 0x3FF]
-
-    def _load_cartridge(self, filename):
-        bytes_read = 0
-        total_bytes_read = 0
-
-        self.max_cartridge = [[]] * self.max_banks
-
-        print("Opening: ", filename)
-        with open(filename, 'rb') as rom_file:
-
-            full = rom_file.read()
-            for bank in self._chunks(full, self.bank_size):
-
-                bytes_read = len(bank)
+    Cartridges that switch banks call their bank listener (see
+    'set_bank_listener') after the mapping of addresses to absolute
+    addresses, 'get_absolute_address', changes.
+"""
 
-                if (bytes_read != 0):
-                    self.max_cartridge[self.num_banks] = bytearray(bank)
-                    self.num_banks += 1
+import mmap
+from . import snapshot
 
-                total_bytes_read += bytes_read
+def _ignore_bank_switch():
+    pass
 
-        if (bytes_read > 0) and (bytes_read < self.bank_size):
-            print("Warning: Short Cartridge")
+def _map_rom(file_name):
+    """ Read only view of the rom 'file_name', memory mapped where possible. """
+    with open(file_name, 'rb') as rom_file:
+        try:
+            return memoryview(mmap.mmap(rom_file.fileno(), 0, access=mmap.ACCESS_READ))
+        except (ValueError, TypeError, EnvironmentError):
+            # Empty file, or no memoryview of a map (python 2).
+            rom_file.seek(0)
+            return bytearray(rom_file.read())
 
-        self.cartridge_banks = [[]] * self.num_banks
+class BankedCartridge(object):
+    """ Cartridge rom, and ram, mapped into the cartridge window by the
+        description passed to 'describe'. """
 
-        for i in range(self.num_banks):
-            self.cartridge_banks[i] = self.max_cartridge[i]
+    # Address lines decoded by the cartridge, the size of the window.
+    ADDRESS_MASK = 0xFFF
 
-        # Set default bank to the last bank.
+    def __init__(self, file_name, max_banks, bank_size):
+        self.max_banks = max_banks
+        self.bank_size = bank_size
+        self.num_banks    = 0
         self.current_bank = 0
-
-        print("PBCartridge read:")
-        print(" banks =", self.num_banks)
-        print(" bytes =", total_bytes_read)
-
-    def _chunks(self, l, n):
-        for i in range(0, len(l), n):
-            yield l[i:i+n]
-
-class MNetworkCartridge(object):
-    MAXBANKS = 8
-    BANKSIZE = 0x0800
-    RAMSIZE  = 0x0800
-
-    def __init__(self, file_name):
-        self.max_banks = MNetworkCartridge.MAXBANKS
-        self.bank_size = MNetworkCartridge.BANKSIZE
-        self.ram_size  = MNetworkCartridge.RAMSIZE
-
-        self.num_banks = 0
-        self.bank_select = 0
+        self.ram_size   = 0
+        self.ram        = bytearray()
         self.ram_select = 0
 
-        self.ram = []
-
         self._file_name = file_name
+        self._bank_listener = _ignore_bank_switch
 
         self._load_cartridge(file_name)
 
+    def describe(self, slices, hotspots=(), ram_size=0, ram_windows=()):
+        """ Map the rom banks into the cartridge window.
+              slices:      Bank mapped into each 'bank_size' slice of the
+                           window at power on.
+              hotspots:    [(start, count, slice)], accessing window offset
+                           'start + n', for n < count, maps bank 'n' into
+                           'slice'. A 'slice' of None selects ram bank 'n'
+                           for the selectable ram windows instead.
+              ram_windows: [(access, start, size, ram_offset, selectable,
+                           condition)], 'size' bytes of ram from
+                           'ram_offset' (plus 'size' times the selected ram
+                           bank, if 'selectable'), read ('r') or written
+                           ('w') at window offset 'start'. Windows with a
+                           'condition', (slice, bank), are only mapped while
+                           'bank' is in 'slice'.
+        """
+        window = self.ADDRESS_MASK + 1
+        self.ram_size = ram_size
+        self.ram      = bytearray(ram_size)
+
+        self._slice          = list(slices)
+        self._slice_base     = [0] * len(slices)
+        self._bank           = bytearray(window)
+        self._hotspots       = bytearray(window)
+        self._write_hotspots = bytearray(window)
+        self._switchable     = set([index for (start, count, index) in hotspots])
+
+        # Map entries hold an index to these (0 is no side effect).
+        self._read_actions  = [None]
+        self._write_actions = [None]
+        # (access, start, end, action, condition)
+        self._map_entries = []
+        for (start, count, index) in hotspots:
+            self._add_action('rw', start, start + count, None,
+                             self._hotspot_read(start, index),
+                             self._hotspot_write(start, index))
+        for (access, start, size, ram_offset, selectable, condition) in ram_windows:
+            if 'r' == access:
+                self._add_action(access, start, start + size, condition,
+                                 self._ram_read(start, size, ram_offset, selectable), None)
+            else:
+                self._add_action(access, start, start + size, condition,
+                                 None, self._ram_write(start, size, ram_offset, selectable))
+
+        self._conditional = len([entry for entry in self._map_entries if entry[4] is not None]) > 0
+        self._maps = {}
+
+        for index in range(len(self._slice)):
+            self._map_slice(index)
+        self._update_maps()
+
+        self.read  = self._make_read()
+        self.write = self._make_write()
+        self.get_absolute_address = self._make_get_absolute_address()
+
+    def set_bank_listener(self, listener):
+        self._bank_listener = listener
+
     def get_save_state(self):
         state = {}
-        state['ram']          = list(self.ram)
-        state['current_bank'] = self.current_bank 
-        state['ram_select']   = self.ram_select 
-        state['file_name']    = self._file_name 
+        state['ram']          = snapshot.encode_ram(self.ram)
+        state['current_bank'] = self.current_bank
+        state['slices']       = list(self._slice)
+        state['ram_select']   = self.ram_select
+        state['file_name']    = self._file_name
         return state
 
     def set_save_state(self, state):
-        self.ram          = list(state['ram'])
-        self.current_bank = state['current_bank']
-        self.ram_select   = state['ram_select']
-        self._file_name   = state['file_name']
-
-    def get_absolute_address(self, address):
-        bank = self.bank_select
-        if ((address & 0xF00) >= 0xA00):
-            bank = 7
-        return bank * self.bank_size + (address & 0x7FF)
-
-    def write(self, address, data):
-        address = address & 0xFFF
-        if 0xFE0 == (address & 0xFF8):
-            # Bank select 0 to 7 
-            self.bank_select = address & 0x7
-        elif 0xFE8 == (address & 0xFF8):
-            # 256k Ram select. 
-            self.ram_select = address & 0x3
-
-        if (self.bank_select == 7 and 0x000 == (address & 0x800)):
-            self.ram[address & 0x3FF] = data
-        elif 0x800 == (address & 0xF00):
-            # Selectable 256Kb RAM. write on 1800-18FF
-            self.ram[(address & 0x7FF) | 0x400 | (self.ram_select << 8)] = data
+        ram = snapshot.decode_ram(state.get('ram', []))
+        # Updated in place, as the ram windows hold it. States saved before
+        # the M-Network ram was allocated have no ram.
+        if len(ram) == len(self.ram):
+            self.ram[:] = ram
+        self.ram_select = state.get('ram_select', 0)
+        self._file_name = state['file_name']
+        if 'slices' in state:
+            self._slice[:] = state['slices']
+        elif 0 in self._switchable:
+            self._slice[0] = state['current_bank']
+        for index in range(len(self._slice)):
+            self._map_slice(index)
+        self._update_maps()
+        self._bank_listener()
+
+    def _add_action(self, access, start, end, condition, read_action, write_action):
+        self._map_entries.append((access, start, end, len(self._read_actions), condition))
+        self._read_actions.append(read_action)
+        self._write_actions.append(write_action)
+
+    def _hotspot_read(self, start, index):
+        bank = self._bank
+        if index is None:
+            def read(offset):
+                self.ram_select = offset - start
+                return bank[offset]
         else:
-            print("Invalid write address %x"%(address))
-
-    def read(self, address):
-        address = address & 0xFFF
-        if (0xFE0 == (address & 0xFF8)):
-            self.bank_select = address & 0x7
-        elif (0xFE8 == (address & 0xFF8)):
-            self.ram_select = address & 0x3
-
-        if ((self.bank_select == 7) and (0x400 == (address & 0xC00))):
-            # Return reads from ram.
-            byte = self.ram[address & 0x3FF]
-        elif (0x000 == (address & 0x800)):
-            # Return cartridge select.
-            byte = self.cartridge_banks[self.bank_select][address & 0x7FF]
-        elif (0x900 == (address & 0xF00)):
-            # Selectable 256Kb RAM. write on 1800-18FF
-            byte = self.ram[(address & 0x7FF) | 0x400 | (self.ram_select << 8)]
-        elif ((address & 0xF00) >= 0xA00):
-            # Return fixed cartridge location.
-            byte = self.cartridge_banks[7][address & 0x7FF]
+            def read(offset):
+                self._select_slice(index, offset - start)
+                return bank[offset]
+        return read
+
+    def _hotspot_write(self, start, index):
+        if index is None:
+            def write(offset, data):
+                self.ram_select = offset - start
         else:
-            print("Invalid address %x"%(address))
-            byte = 0
-
-        return byte
+            def write(offset, data):
+                self._select_slice(index, offset - start)
+        return write
+
+    def _ram_read(self, start, size, ram_offset, selectable):
+        ram  = self.ram
+        base = ram_offset - start
+        if selectable:
+            def read(offset):
+                return ram[base + self.ram_select * size + offset]
+        else:
+            def read(offset):
+                return ram[base + offset]
+        return read
+
+    def _ram_write(self, start, size, ram_offset, selectable):
+        ram  = self.ram
+        base = ram_offset - start
+        if selectable:
+            def write(offset, data):
+                ram[base + self.ram_select * size + offset] = data & 0xFF
+        else:
+            def write(offset, data):
+                ram[base + offset] = data & 0xFF
+        return write
+
+    def _make_read(self):
+        mask     = self.ADDRESS_MASK
+        bank     = self._bank
+        hotspots = self._hotspots
+        actions  = self._read_actions
+        def read(address):
+            offset = address & mask
+            action = hotspots[offset]
+            if action:
+                return actions[action](offset)
+            return bank[offset]
+        return read
+
+    def _make_write(self):
+        mask     = self.ADDRESS_MASK
+        hotspots = self._write_hotspots
+        actions  = self._write_actions
+        def write(address, data):
+            offset = address & mask
+            action = hotspots[offset]
+            if action:
+                actions[action](offset, data)
+        return write
+
+    def _make_get_absolute_address(self):
+        mask       = self.ADDRESS_MASK
+        shift      = self.bank_size.bit_length() - 1
+        low_mask   = self.bank_size - 1
+        slice_base = self._slice_base
+        def get_absolute_address(address):
+            offset = address & mask
+            return slice_base[offset >> shift] + (offset & low_mask)
+        return get_absolute_address
+
+    def _select_slice(self, index, bank):
+        if self._slice[index] != bank:
+            self._slice[index] = bank
+            self._map_slice(index)
+            if self._conditional:
+                self._update_maps()
+            self._bank_listener()
+
+    def _select_bank(self, bank):
+        self._select_slice(0, bank)
+
+    def _map_slice(self, index):
+        """ Copy the bank mapped into slice 'index' into the window. """
+        bank = self._slice[index]
+        if 0 == index:
+            self.current_bank = bank
+        # Banks past the end of a short rom mirror the banks it has.
+        rom_bank = bank % max(self.num_banks, 1)
+        self._slice_base[index] = rom_bank * self.bank_size
+        if rom_bank < self.num_banks:
+            start = index * self.bank_size
+            self._bank[start:start + self.bank_size] = self.cartridge_banks[rom_bank]
+
+    def _update_maps(self):
+        """ Update the maps of offsets with side effects, in place as the
+            read and write functions hold them. """
+        key = tuple(self._slice) if self._conditional else None
+        if key not in self._maps:
+            self._maps[key] = self._build_maps()
+        (read_map, write_map) = self._maps[key]
+        self._hotspots[:] = read_map
+        self._write_hotspots[:] = write_map
+
+    def _build_maps(self):
+        read_map  = bytearray(len(self._bank))
+        write_map = bytearray(len(self._bank))
+        for (access, start, end, action, condition) in self._map_entries:
+            if condition is None or self._slice[condition[0]] == condition[1]:
+                for offset in range(max(start, 0), min(end, len(self._bank))):
+                    if 'r' in access:
+                        read_map[offset] = action
+                    if 'w' in access:
+                        write_map[offset] = action
+        return (read_map, write_map)
 
     def _load_cartridge(self, filename):
-        bytes_read = 0
-        total_bytes_read = 0
-
-        self.max_cartridge = [[]] * self.max_banks
-
-        print("Opening: ", filename)
-
-        self.ram = [] * self.RAMSIZE
-        with open(filename, 'rb') as rom_file:
-            full = rom_file.read()
-            for bank in self._chunks(full, self.bank_size):
-
-                bytes_read = len(bank)
-                if bytes_read != 0:
-                    self.max_cartridge[self.num_banks] = bytearray(bank)
-                    self.num_banks += 1
-                total_bytes_read += bytes_read
-
-            self.cartridge_banks = [[]] * self.num_banks
+        print("Opening:", filename)
 
-            for i in range(self.num_banks):
-              self.cartridge_banks[i] = self.max_cartridge[i]
-    
-            # Set default bank to the last bank.
-            self.current_bank = 0
-    
-            print("MNetworkCartridge read:")
-            print(" banks = ", self.num_banks)
-            print(" bytes = ", total_bytes_read)
-            print(" first bank size = ", len(self.cartridge_banks[0]))
+        full = _map_rom(filename)
+
+        # Full banks are views of the rom, short banks are padded copies.
+        self.cartridge_banks = []
+        for bank in self._chunks(full, self.bank_size):
+            bytes_read = len(bank)
+            if bytes_read < self.bank_size:
+                print("Warning: Short cartridge")
+                # If the bank is short, pad it with zeros.
+                bank = bytearray(bank) + bytearray(self.bank_size - bytes_read)
+                # If the read size was less than a half bank, copy the
+                # shortfall.
+                if bytes_read <= self.bank_size // 2:
+                    bank = bank[0:self.bank_size // 2] + bank[0:self.bank_size // 2]
+            if len(self.cartridge_banks) == self.max_banks:
+                print("Warning: Ignoring banks after bank %d" % (self.max_banks))
+                break
+            self.cartridge_banks.append(bank)
+
+        self.num_banks = len(self.cartridge_banks)
+
+        print("Cartridge read:")
+        print(" banks = ", self.num_banks)
+        print(" bytes = ", len(full))
 
     def _chunks(self, l, n):
         for i in range(0, len(l), n):
             yield l[i:i+n]
 
-class FECartridge(object):
-
-    def __init__(self, file_name, max_banks, bank_size):
-        self.max_banks = max_banks
-        self.bank_size = bank_size
-        self.cartridge_banks = [[]] * self.max_banks
-        self.num_banks    = 0
-        self.current_bank = 0
-
-        self._load_cartridge(file_name)
-
-    def get_save_state(self):
-        state = {}
-        state['current_bank'] = self.current_bank 
-        state['file_name']    = self._file_name 
-        return state
-
-    def set_save_state(self, state):
-        self.current_bank = state['current_bank']
-        self._file_name   = state['file_name']
-
-    def get_absolute_address(self, address):
-        if 0x0000   == (address & 0x2000):
-            current_bank = 1
-        elif 0x2000 == (address & 0x2000):
-            current_bank = 0
-        return current_bank * self.bank_size + (address & 0xFFF)
-
-    def read(self, address):
-        if 0x0000   == (address & 0x2000):
-            self.current_bank = 1
-        elif 0x2000 == (address & 0x2000):
-            self.current_bank = 0
-
-        address = address & 0xFFF
-
-        return self.cartridge_banks[self.current_bank][address]
-
-    def write(self, address, data):
-        if 0x0000 == (address & 0x2000):
-            self.current_bank = 1
-        elif 0x2000 == (address & 0x2000):
-            self.current_bank = 0
-
-    def _load_cartridge(self, filename):
-        total_bytes_read = 0
-
-        print("Opening:", filename)
-
-        with open(filename, 'rb') as rom_file:
-
-            self.max_cartridge = [[]] * self.max_banks
-            full = rom_file.read()
-            for bank in self._chunks(full, self.bank_size):
-
-                bytes_read = len(bank)
-
-                print("nb:%d,%x"%(self.num_banks, self.bank_size))
-                if bytes_read != 0:
-                    self.max_cartridge[self.num_banks] = bytearray(bank)
-                    self.num_banks += 1
-
-                total_bytes_read += bytes_read
-
-            self.cartridge_banks = [[]] * self.num_banks
-
-            for i in range(self.num_banks):
-              self.cartridge_banks[i] = self.max_cartridge[i]
+class PBCartridge(BankedCartridge):
+    """ Parker Brothers (E0), three switched 1K slices and a fourth fixed to
+        the last bank. """
+    MAXBANKS = 8
+    BANKSIZE = 0x0400
 
-            # Set default bank to the last bank.
-            self.current_bank = 0
+    def __init__(self, file_name):
+        super(PBCartridge, self).__init__(file_name, PBCartridge.MAXBANKS, PBCartridge.BANKSIZE)
+        self.describe(slices=[4, 5, 6, 7],
+                      hotspots=[(0xFE0, 8, 0), (0xFE8, 8, 1), (0xFF0, 8, 2)])
+
+class MNetworkCartridge(BankedCartridge):
+    """ M-Network (E7), a switched 2K slice and the last bank fixed above it.
+        1K of ram replaces bank 7 in the switched slice, and a selectable
+        256 byte ram bank is at 0x800-0x9FF. """
+    MAXBANKS = 8
+    BANKSIZE = 0x0800
+    RAMSIZE  = 0x0800
 
-            print("Cartridge read:")
-            print(" banks = ", self.num_banks)
-            print(" bytes = ", total_bytes_read)
-            print(" first bank size = ", len(self.cartridge_banks[0]))
+    def __init__(self, file_name):
+        super(MNetworkCartridge, self).__init__(file_name, MNetworkCartridge.MAXBANKS, MNetworkCartridge.BANKSIZE)
+        self.describe(slices=[0, 7],
+                      hotspots=[(0xFE0, 8, 0), (0xFE8, 4, None)],
+                      ram_size=MNetworkCartridge.RAMSIZE,
+                      ram_windows=[('w', 0x000, 0x400, 0x000, False, (0, 7)),
+                                   ('r', 0x400, 0x400, 0x000, False, (0, 7)),
+                                   ('w', 0x800, 0x100, 0x400, True, None),
+                                   ('r', 0x900, 0x100, 0x400, True, None)])
+
+class FECartridge(BankedCartridge):
+    """ Activision (FE), A13 selects the bank, bank 1 when clear and bank 0
+        when set. """
+    # Banks are selected by A13, as well as A0-A11.
+    ADDRESS_MASK = 0x2FFF
 
-    def _chunks(self, l, n):
-        for i in range(0, len(l), n):
-            yield l[i:i+n]
+    def __init__(self, file_name, max_banks, bank_size):
+        super(FECartridge, self).__init__(file_name, max_banks, bank_size)
+        # The middle slice (A12 set) is masked out.
+        self.describe(slices=[1, 0, 0])
 
-class SingleBankCartridge(object):
+class SingleBankCartridge(BankedCartridge):
     """ Simple, single bank cartridge, no bank switching. """
 
     def __init__(self, file_name, bank_size):
-        self.bank_size = bank_size
-        self.cartridge_bank = [] 
-        self.num_banks    = 0
-
-        self._load_cartridge(file_name)
-
-    def get_save_state(self):
-        state = {}
-        state['file_name']    = self._file_name 
-        return state
-
-    def set_save_state(self, state):
-        self._file_name   = state['file_name']
-
-    def get_absolute_address(self, address):
-        return (address & 0xFFF)
-
-    def read(self, address):
-        return self.cartridge_bank[address & 0xFFF]
-
-    def write(self, address, data):
-        pass
-
-    def _load_cartridge(self, filename):
-        total_bytes_read = 0
-
-        print("Opening:", filename)
-
-        with open(filename, 'rb') as rom_file:
-
-            self.max_cartridge = [] 
-            full = rom_file.read()
-
-            for bank in self._chunks(full, self.bank_size):
-
-                bytes_read = len(bank)
-
-                if (bytes_read > 0) and (bytes_read < self.bank_size):
-                    # If the bank is short, pad it with zeros.
-                    bank += '\000' * (self.bank_size-bytes_read)
-                    # If the read size was less than a half bank, copy the
-                    # shortfall.
-                    if bytes_read <= self.bank_size/2:
-                        bank = bank[0:self.bank_size/2] + bank[0:self.bank_size/2]
-                        self.max_cartridge = bank[0:self.bank_size/2] + bank[0:self.bank_size/2]
-                self.max_cartridge = bytearray(bank)
-
-                total_bytes_read += bytes_read
-
-            self.cartridge_bank = []
-            self.cartridge_bank = self.max_cartridge
+        super(SingleBankCartridge, self).__init__(file_name, 1, bank_size)
+        self.describe(slices=[0] * ((self.ADDRESS_MASK + 1) // bank_size))
 
-            print("Cartridge read:")
-            print(" banks = ", self.num_banks)
-            print(" bytes = ", total_bytes_read)
-            print(" first bank size = ", len(self.cartridge_bank))
-
-    def _chunks(self, l, n):
-        for i in range(0, len(l), n):
-            yield l[i:i+n]
-
-class GenericCartridge(object):
+class GenericCartridge(BankedCartridge):
+    """ Atari style bank switching (F8, F6, F4, and FA), the hot spots end at
+        'hot_swap'. With 'ram_size' bytes of ram written at the start of the
+        window and read after it. """
 
     def __init__(self, file_name, max_banks, bank_size, hot_swap, ram_size):
-        self.max_banks = max_banks
-        self.bank_size = bank_size
+        super(GenericCartridge, self).__init__(file_name, max_banks, bank_size)
         self.hot_swap = hot_swap
-        self.ram_size = ram_size
-        self.ram_addr_mask = 0xFFFF & (self.ram_size - 1)
-        self.cartridge_banks = [[]] * self.max_banks
-        self.ram = []
-        self.num_banks    = 0
-        self.current_bank = 0
-        self.bank_select  = 0
-        self._file_name = file_name
-
-        self._load_cartridge(file_name)
-
-    def get_save_state(self):
-        state = {}
-        state['ram'] = list(self.ram)
-        state['current_bank'] = self.current_bank 
-        state['file_name'] = self._file_name 
-        return state
-
-    def set_save_state(self, state):
-        self.ram           = list(state['ram'])
-        self.current_bank  = state['current_bank']
-        self._file_name    = state['file_name']
-
-    def get_absolute_address(self, address):
-        return self.bank_size * self.current_bank + (address & 0xFFF)
-
-    def read(self, address):
-        address = address & 0xFFF
-        if (self.ram_size > 0) and (address < 2*self.ram_size) and (address >= self.ram_size):
-            data = self.ram[address & self.ram_addr_mask]
-        else:
-             # 0xFF8 == address: Last bank - 2
-             # 0xFF9 == address: Last bank - 1
-             # 0xFFA == address: Last bank
-            if (((self.hot_swap +1) - self.num_banks) <=  address) and ((self.hot_swap+1) >  address):
-                self.current_bank = self.num_banks - ((self.hot_swap+1) - address)
-
-            data = self.cartridge_banks[self.current_bank][address]
-        return data
-
-    def write(self, address, data):
-        address = address & 0xFFF
-        if (self.ram_size > 0) and (address < self.ram_size):
-            self.ram[address & self.ram_addr_mask] = data
-
-        if (((self.hot_swap+1) - self.num_banks) <=  address) and ((self.hot_swap+1) >  address):
-            self.current_bank = self.num_banks - ((self.hot_swap+1) - address)
-
-    def _load_cartridge(self, filename):
-        total_bytes_read = 0
-
-        print("Opening:", filename)
-
-        with open(filename, 'rb') as rom_file:
-
-            if (self.ram_size > 0):
-                self.ram = [0] * self.ram_size
-
-            self.max_cartridge = [[]] * self.max_banks
-            full = rom_file.read()
-            for bank in self._chunks(full, self.bank_size):
 
-                bytes_read = len(bank)
-
-                if (bytes_read > 0) and (bytes_read < self.bank_size):
-                    # If the bank is short, pad it with zeros.
-                    bank += bytearray('\000'.encode() * (self.bank_size-bytes_read))
-                    # If the read size was less than a half bank, copy the
-                    # shortfall.
-                    if bytes_read <= int(self.bank_size/2):
-                        bank = bank[0:int(self.bank_size/2)] + bank[0:int(self.bank_size/2)]
-                        self.max_cartridge[self.num_banks] = bank[0:int(self.bank_size/2)] + bank[0:int(self.bank_size/2)]
-                self.max_cartridge[self.num_banks] = bytearray(bank)
-
-                self.num_banks += 1
-                total_bytes_read += bytes_read
-
-            self.cartridge_banks = [[]] * self.num_banks
-
-            for i in range(self.num_banks):
-              self.cartridge_banks[i] = self.max_cartridge[i]
-
-            # Set default bank to the last bank.
-            self.current_bank = 0
-
-            print("Cartridge read:")
-            print(" banks = ", self.num_banks)
-            print(" bytes = ", total_bytes_read)
-            print(" first bank size = ", len(self.cartridge_banks[0]))
-
-    def _chunks(self, l, n):
-        for i in range(0, len(l), n):
-            yield l[i:i+n]
+        ram_windows = []
+        if ram_size > 0:
+            ram_windows = [('w', 0, ram_size, 0, False, None),
+                           ('r', ram_size, ram_size, 0, False, None)]
+        # eg 0xFF8: Last bank - 1, 0xFF9: Last bank
+        self.describe(slices=[0],
+                      hotspots=[((hot_swap + 1) - self.num_banks, self.num_banks, 0)],
+                      ram_size=ram_size,
+                      ram_windows=ram_windows)
 
 if __name__ == '__main__':
     import sys
@@ -0,0 +1,114 @@
+""" Cartridge type detection, from the rom size and the bank switching hot
+    spots the code accesses.
+
+    Detected types are kept in an index in the cache directory, keyed by the
+    rom digest, so each rom is only scanned once.
+"""
+
+import json
+from .. import cache
+
+# Bump if detection changes, to discard the index.
+VERSION = 1
+
+INDEX_NAME = 'cartridge_types.json'
+
+# Absolute addressing op codes that may access a hot spot (LDA, LDX, LDY,
+# STA, STX, STY, BIT, NOP).
+_ABSOLUTE_ACCESS = (0xAD, 0xAE, 0xAC, 0x8D, 0x8E, 0x8C, 0x2C, 0x0C)
+
+# Activision (FE) bank switches on subroutine calls, recognised by the
+# code around the calls.
+_FE_SIGNATURES = (bytearray([0x20, 0x00, 0xD0, 0xC6, 0xC5]),   # JSR $D000; DEC $C5
+                  bytearray([0x20, 0xC3, 0xF8, 0xA5, 0x82]),   # JSR $F8C3; LDA $82
+                  bytearray([0xD0, 0xFB, 0x20, 0x73, 0xFE]),   # BNE *-3; JSR $FE73
+                  bytearray([0x20, 0x00, 0xF0, 0x84, 0xD6]))   # JSR $F000; STY $D6
+
+# Tigervision (3F) selects banks by writing to $3F (STA, STX, STY).
+_3F_SIGNATURES = (bytearray([0x85, 0x3F]), bytearray([0x86, 0x3F]), bytearray([0x84, 0x3F]))
+
+def hotspot_accesses(rom, start, end):
+    """ Number of absolute accesses to cartridge offsets 'start' up to
+        'end'. """
+    count = 0
+    for i in range(len(rom) - 2):
+        if rom[i] in _ABSOLUTE_ACCESS and (rom[i + 2] & 0x10):
+            offset = ((rom[i + 2] << 8) | rom[i + 1]) & 0xFFF
+            if start <= offset < end:
+                count += 1
+    return count
+
+def _count(rom, signatures):
+    data = bytes(rom)
+    return sum([data.count(bytes(signature)) for signature in signatures])
+
+def has_superchip(rom):
+    """ Superchip ram is the first 256 bytes of every 4K bank, the unused
+        rom behind it is usually the same in the write and read halves. """
+    if len(rom) % 0x1000:
+        return False
+    for bank in range(0, len(rom), 0x1000):
+        if rom[bank:bank + 0x80] != rom[bank + 0x80:bank + 0x100]:
+            return False
+    return True
+
+def detect_type(rom):
+    """ 'atari2600.CARTRIDGE_TYPES' entry for the rom contents 'rom'. """
+    rom = bytearray(rom)
+    size = len(rom)
+
+    if _count(rom, _3F_SIGNATURES) >= 2:
+        print("Warning: Tigervision (3F) bank switching isn't supported")
+
+    if size <= 0x1000:
+        return 'default'
+    elif size == 0x2000:
+        if _count(rom, _FE_SIGNATURES) > 0:
+            return 'e'
+        if hotspot_accesses(rom, 0xFE0, 0xFF8) > hotspot_accesses(rom, 0xFF8, 0xFFA):
+            return 'pb'
+        if has_superchip(rom):
+            return 'super'
+        return 'default'
+    elif size == 0x3000:
+        return 'cbs'
+    elif size == 0x4000:
+        if hotspot_accesses(rom, 0xFE0, 0xFEC) > hotspot_accesses(rom, 0xFF6, 0xFFA):
+            return 'mnet'
+        if has_superchip(rom):
+            return 'super'
+        return 'default'
+    elif size == 0x8000:
+        if has_superchip(rom):
+            # 'fe' is F4 with superchip ram.
+            return 'fe'
+        return 'f4'
+
+    print("Warning: Unrecognised cartridge size %d" % (size))
+    return 'default'
+
+def _load_index():
+    data = cache.load(INDEX_NAME)
+    if data is not None:
+        try:
+            index = json.loads(data.decode('utf-8'))
+            if index.get('version') == VERSION:
+                return index
+        except (ValueError, AttributeError):
+            print("Warning: Ignoring invalid cache %s" % (INDEX_NAME))
+    return {'version': VERSION, 'roms': {}}
+
+def cartridge_type(file_name):
+    """ Detected type of the rom 'file_name', from the index if it has been
+        seen before. """
+    digest = cache.rom_digest(file_name)
+    index = _load_index()
+    cart_type = index['roms'].get(digest)
+    if cart_type is None:
+        with open(file_name, 'rb') as rom_file:
+            cart_type = detect_type(rom_file.read())
+        # Re-read, to keep types added by other processes since.
+        index = _load_index()
+        index['roms'][digest] = cart_type
+        cache.save(INDEX_NAME, json.dumps(index, sort_keys=True).encode('utf-8'))
+    return cart_type
@@ -1,3 +1,5 @@
+import functools
+
 class Memory(object):
     STELLA_MASK  = 0xFE80
     STELLA_ADDR  = 0x0
@@ -5,11 +7,24 @@ class Memory(object):
     STACK_LENGTH = 0x100
     RIOT_MASK    = 0xDC80
     RIOT_ADDR    = 0x80
+    RIOT_IO_ADDR = 0x200
+    RIOT_RAM_MASK = 0x7F
     ROM_MASK     = 0xD000
     ROM_ADDRLINE = 0x1000
 
+    # The devices are decoded from address lines 7 and up, so the address
+    # space is split into pages of 128 bytes, each with a read and a write
+    # (handler, address mask).
+    PAGE_SHIFT = 7
+    PAGE_MASK  = 0xFFFF >> PAGE_SHIFT
+
     def __init__(self):
-        pass
+        self.cartridge = None
+        self.stella    = None
+        self.riot      = None
+        # RIOT ram, if the RIOT shares it, for accesses known to hit it.
+        self.ram       = None
+        self._build_pages()
 
     def get_save_state(self):
         state = {}
@@ -18,54 +33,137 @@ class Memory(object):
 
     def set_cartridge(self, cartridge):
         self.cartridge = cartridge
+        self._build_pages()
 
     def set_save_state(self, state):
         self.cartridge.set_save_state(state['cartridge'])
 
     def set_stella(self, stella):
         self.stella = stella
+        self._build_pages()
 
     def set_riot(self, riot):
         self.riot = riot
+        ram = getattr(riot, 'ram', None)
+        self.ram = ram if isinstance(ram, bytearray) else None
+        self._build_pages()
 
-    def write(self, address, data):
-        if ((address & 0xFFEF) & self.STELLA_MASK) == self.STELLA_ADDR:
-            self.stella.write(address & ~self.STELLA_MASK, data);
-        elif ((address & self.RIOT_MASK) == self.RIOT_ADDR):
-            self.riot.write(address & ~self.RIOT_MASK, data);
-        elif (address >= self.STACK_OFFSET) and ((address < self.STACK_OFFSET + self.STACK_LENGTH)):
-            self.riot.write(address, data);
-        elif (address & self.ROM_ADDRLINE) == self.ROM_ADDRLINE:
+    @classmethod
+    def _decode_read(cls, address):
+        """ (device, address mask) of reads from the page of 'address'. """
         # Only address lines 1-13 are connected, higher bits ignored.
-            return self.cartridge.write(address & ~self.ROM_MASK, data);
+        if (address & cls.ROM_ADDRLINE) == cls.ROM_ADDRLINE:
+            return ('cartridge', 0xFFFF & ~cls.ROM_MASK)
+
+        if (address & cls.RIOT_MASK) == cls.RIOT_ADDR:
+            return ('riot', 0xFFFF & ~cls.RIOT_MASK)
+
+        # Includes the bottom half of the stack page, the top half is RIOT
+        # ram (address line 7 selects the RIOT).
+        if (address & cls.STELLA_MASK) == cls.STELLA_ADDR:
+            return ('stella', 0xFFFF & ~cls.STELLA_MASK)
+
+        return ('cartridge', 0xFFFF & ~cls.ROM_MASK)
+
+    @classmethod
+    def _decode_write(cls, address):
+        """ (device, address mask) of writes to the page of 'address'. """
+        if ((address & 0xFFEF) & cls.STELLA_MASK) == cls.STELLA_ADDR:
+            return ('stella', 0xFFFF & ~cls.STELLA_MASK)
+        elif ((address & cls.RIOT_MASK) == cls.RIOT_ADDR):
+            return ('riot', 0xFFFF & ~cls.RIOT_MASK)
+        elif (address & cls.ROM_ADDRLINE) == cls.ROM_ADDRLINE:
+            return ('cartridge', 0xFFFF & ~cls.ROM_MASK)
         else:
-            print("Write:", hex(address))
-            raise Exception("invalid_write_address" + address)
-
-    def read(self, address):
-      # Only address lines 1-13 are connected, higher bits ignored.
-      if (address & self.ROM_ADDRLINE) == self.ROM_ADDRLINE:
-          return self.cartridge.read(address & ~self.ROM_MASK)
-
-      if (address & self.RIOT_MASK) == self.RIOT_ADDR:
-          return self.riot.read(address & ~self.RIOT_MASK)
+            return (None, 0xFFFF)
+
+    _layout = None
+
+    def _build_pages(self):
+        """ Bind the handlers of each page, rebuilt when a device is
+        changed. """
+        if Memory._layout is None:
+            pages = range(self.PAGE_MASK + 1)
+            Memory._layout = ([self._decode_read(page << self.PAGE_SHIFT) for page in pages],
+                              [self._decode_write(page << self.PAGE_SHIFT) for page in pages])
+        (read_layout, write_layout) = Memory._layout
+        read  = {}
+        write = {None: self._invalid_write}
+        for name in ('cartridge', 'riot', 'stella'):
+            device = getattr(self, name)
+            read[name]  = self._missing_device if device is None else device.read
+            write[name] = self._missing_device if device is None else device.write
+        self._read_pages  = [(read[name], mask) for (name, mask) in read_layout]
+        self._write_pages = [(write[name], mask) for (name, mask) in write_layout]
+
+    def _missing_device(self, address, data=None):
+        raise Exception("no device at address %s" % (hex(address)))
+
+    def _invalid_write(self, address, data):
+        print("Write:", hex(address))
+        raise Exception("invalid_write_address %s" % (hex(address)))
+
+    def write_handler(self, address):
+        """ Function equivalent to 'write(address, data)', bound to the device
+            'address' is decoded to now. Devices with a 'write_handler' can
+            resolve the register ahead of time too. """
+        page = (address >> self.PAGE_SHIFT) & self.PAGE_MASK
+        (handler, mask) = self._write_pages[page]
+        name = Memory._layout[1][page][0]
+        device = getattr(self, name) if name is not None else None
+        if device is not None and hasattr(device, 'write_handler'):
+            return device.write_handler(address & mask)
+        return functools.partial(handler, address & mask)
 
-      if (address & self.STELLA_MASK) == self.STELLA_ADDR:
-          return self.stella.read(address & ~self.STELLA_MASK)
-
-      if (address >= self.STACK_OFFSET) and (address < self.STACK_OFFSET + self.STACK_LENGTH):
-          return self.riot.read(address)
-
-      return self.cartridge.read(address & ~self.ROM_MASK);
+    def write(self, address, data):
+        (handler, mask) = self._write_pages[(address >> self.PAGE_SHIFT) & self.PAGE_MASK]
+        handler(address & mask, data)
 
-      print("Read:", hex(address))
-      raise Exception("invalid_read_address" + address)
+    def read(self, address):
+        (handler, mask) = self._read_pages[(address >> self.PAGE_SHIFT) & self.PAGE_MASK]
+        return handler(address & mask)
+
+    def is_device(self, address):
+        """ True for TIA and RIOT I/O registers, not RAM or cartridge. """
+        if (address & self.ROM_ADDRLINE) == self.ROM_ADDRLINE:
+            return False
+        if (address & self.RIOT_MASK) == self.RIOT_ADDR:
+            return 0 != (address & self.RIOT_IO_ADDR)
+        return (address & self.STELLA_MASK) == self.STELLA_ADDR
+
+    def peek(self, address, clock):
+        """ Value a read of device register 'address' would return at
+            'clock', see 'is_device'. """
+        if (address & self.RIOT_MASK) == self.RIOT_ADDR:
+            return self.riot.peek(address & ~self.RIOT_MASK, clock)
+        return self.stella.peek(address & ~self.STELLA_MASK, clock)
+
+    def next_change(self, address, clock):
+        """ First clock after 'clock' where a read of device register
+            'address' may return a different value. """
+        if (address & self.RIOT_MASK) == self.RIOT_ADDR:
+            return self.riot.next_change(address & ~self.RIOT_MASK, clock)
+        return self.stella.next_change(address & ~self.STELLA_MASK, clock)
+
+    def next_flags_change(self, address, clock):
+        """ First clock after 'clock' where the N or Z flags of a read of
+            device register 'address' may change. """
+        if (address & self.RIOT_MASK) == self.RIOT_ADDR:
+            return self.riot.next_flags_change(address & ~self.RIOT_MASK, clock)
+        return self.stella.next_change(address & ~self.STELLA_MASK, clock)
 
     def read16(self, address):
         return self.read(address) + (self.read(address + 1) << 8)
 
     def readSp(self, address):
+        # The stack page is decoded as any other page, the top half is the
+        # RIOT ram and the bottom half mirrors the TIA.
+        if self.ram is not None and (address & self.RIOT_ADDR):
+            return self.ram[address & self.RIOT_RAM_MASK]
         return self.read(address + self.STACK_LENGTH)
 
     def writeSp(self, address, data):
-        self.write(address + self.STACK_LENGTH, data)
+        if self.ram is not None and (address & self.RIOT_ADDR):
+            self.ram[address & self.RIOT_RAM_MASK] = data & 0xFF
+        else:
+            self.write(address + self.STACK_LENGTH, data)
@@ -1,3 +1,4 @@
+from . import snapshot
 
 class Riot(object):
 
@@ -22,28 +23,39 @@ class Riot(object):
         self.set_time        = clock.system_clock
         self.inputs          = inputs
         self.interval        = 1024
+        # Timer reads are calculated from the clock, no event is scheduled
+        # for the underflow (the 6507 has no interrupt line).
         self.expiration_time = 1000000
 
-        self.ram = [0] * self.RAMSIZE
+        # Shared with 'Memory', for accesses known to hit the ram.
+        self.ram = bytearray(self.RAMSIZE)
 
     def get_save_state(self):
         state = {}
         state['set_time']        = self.set_time
         state['interval']        = self.interval
         state['expiration_time'] = self.expiration_time
-        state['ram']             = list(self.ram)
+        state['ram']             = snapshot.encode_ram(self.ram)
         return state
 
     def set_save_state(self, state):
         self.set_time        = state['set_time']
         self.interval        = state['interval']
         self.expiration_time = state['expiration_time']
-        self.ram             = list(state['ram'])
+        # Updated in place, as the ram is shared.
+        self.ram[:]          = snapshot.decode_ram(state['ram'])
 
     def read(self, addr):
+        if 0 == (addr & self.NOT_RAMSELECT):
+            return self.ram[addr & self.RIOT_ADDRMASK]
+        return self.peek(addr, self.clock.system_clock)
+
+    def peek(self, addr, clock):
+        """ Value a read of 'addr' at 'clock' returns, reads have no side
+            effects. """
         value = 0
     
-        future_clock = self.clock.system_clock + 12
+        future_clock = clock + 12
     
         if 0 == (addr & self.NOT_RAMSELECT):
             return self.ram[addr & self.RIOT_ADDRMASK]
@@ -56,14 +68,14 @@ class Riot(object):
         elif test == self.RIOT_Swchb:
             value = self.inputs.swchb
     
-        elif test == self.RIOT_Tim1t or test == self.RIOT_Tim8t or test == self.RIOT_Tim64t or test == self.RIOT_T1024t or test == self.TIMERADDR:
+        elif self._is_timer(test):
 
             if self.expiration_time >= future_clock:
                 # If expiration hasn't occured, return the time remaining. 
-                value = (self.expiration_time - future_clock) / (self.interval * self.CYCLES_TO_CLOCK)
+                value = (self.expiration_time - future_clock) // (self.interval * self.CYCLES_TO_CLOCK)
             else: # Calculate ticks past zero, may not be quite right
                 # The interval was passed, value counts down from 255. 
-                value = 0x100 - (((future_clock - self.expiration_time)/self.CYCLES_TO_CLOCK) & 0xFF)
+                value = 0x100 - (((future_clock - self.expiration_time) // self.CYCLES_TO_CLOCK) & 0xFF)
         elif test == self.RIOT_Interrupt:
             if self.expiration_time >= future_clock:
                 value = 0
@@ -75,9 +87,52 @@ class Riot(object):
     
         return value
 
+    def next_change(self, addr, clock):
+        """ First clock after 'clock' where a read of 'addr' may return a
+            different value. Writes and input changes aren't included.
+        """
+        future_clock = clock + 12
+        test = addr & self.RIOT_ADDRMASK & ~self.INT_ENABLE_MASK
+        if 0 == (addr & self.NOT_RAMSELECT):
+            return self.clock.NEVER
+        elif self._is_timer(test):
+            if self.expiration_time >= future_clock:
+                tick = self.interval * self.CYCLES_TO_CLOCK
+                remaining = (self.expiration_time - future_clock) // tick
+                return self.expiration_time - 12 - remaining * tick + 1
+            else:
+                return clock + self.CYCLES_TO_CLOCK - (future_clock - self.expiration_time) % self.CYCLES_TO_CLOCK
+        elif test == self.RIOT_Interrupt:
+            if self.expiration_time >= future_clock:
+                return self.expiration_time - 11
+        return self.clock.NEVER
+
+    def next_flags_change(self, addr, clock):
+        """ First clock after 'clock' where the N or Z flags of a read of
+            'addr' may change. The timer counts down, so they only change
+            on reaching 127 or 0, or on leaving 0. """
+        change = self.next_change(addr, clock)
+        test = addr & self.RIOT_ADDRMASK & ~self.INT_ENABLE_MASK
+        if 0 == (addr & self.NOT_RAMSELECT) or not self._is_timer(test):
+            return change
+
+        value = self.peek(addr, clock) & 0xFF
+        if self.expiration_time >= clock + 12:
+            tick = self.interval * self.CYCLES_TO_CLOCK
+        else:
+            tick = self.CYCLES_TO_CLOCK
+        if value > 128:
+            return change + (value - 128) * tick
+        elif 0 < value < 128:
+            return change + (value - 1) * tick
+        return change
+
+    def _is_timer(self, test):
+        return test == self.RIOT_Tim1t or test == self.RIOT_Tim8t or test == self.RIOT_Tim64t or test == self.RIOT_T1024t or test == self.TIMERADDR
+
     def write(self, addr, data):
         if 0 == (addr & self.NOT_RAMSELECT):
-            self.ram[addr & self.RIOT_ADDRMASK] = data
+            self.ram[addr & self.RIOT_ADDRMASK] = data & 0xFF
         else:
             test = addr & self.RIOT_ADDRMASK
             if test == self.RIOT_Tim1t:
@@ -0,0 +1,16 @@
+""" Encoding of emulated ram in save states, as base64 text so states stay
+    json serialisable.
+"""
+
+import base64
+
+def encode_ram(ram):
+    """ Save state value of the bytearray 'ram'. """
+    return base64.b64encode(bytes(ram)).decode('ascii')
+
+def decode_ram(data):
+    """ bytearray of the ram saved as 'data', states saved before ram was
+        encoded hold a list of ints. """
+    if isinstance(data, list):
+        return bytearray(data)
+    return bytearray(base64.b64decode(data))
@@ -4,6 +4,7 @@
 
 import argparse
 from . import atari2600
+from . import cache
 
 # Possible audio drivers
 audio_options = {
@@ -23,6 +24,9 @@ graphics_options = {
 # Possible graphics drivers
 cpu_options = {
     'cpu_gen': 'from pytari2600 import cpu_gen as cpu',
+    'cpu_flat': 'from pytari2600 import cpu_flat as cpu',
+    'static': 'from pytari2600 import cpu_static as cpu',
+    'fused': 'from pytari2600 import cpu_fused as cpu',
     'cpu': 'import pytari2600.cpu as cpu'
     }
 
@@ -42,9 +46,11 @@ def config(graphics_selection, audio_selection, cpu_selection):
 def run(args):
     (graphics, audio, cpu) = config(args.graphics_driver, args.audio_driver, args.cpu_driver)
 
+    cache.set_cache_dir(args.cache_dir or None)
+
     atari = atari2600.Atari(graphics, audio, cpu)
     atari.insert_cartridge(args.cartridge_name, args.cart_type)
-
+    atari.stella.set_frameskip(args.frameskip)
 
     atari.power_on(args.stop_clock, args.no_delay, args.debug, args.replay_file)
 
@@ -57,10 +63,9 @@ def main():
     parser.add_argument('-s', dest='stop_clock',     type=int, default=0,
                               help="Set a clock time to stop (useful for profiling), setting to '0' is disable stop")
     parser.add_argument('-c', dest='cart_type', 
-                              choices=['default', 'pb', 'mnet', 'cbs',
-                              'e', 'fe','super','f4', 'single_bank'], 
-                              default='default',
-                              help="Select the cartridge type of the rom being run (default is for 'common' bankswitching)")
+                              choices=atari2600.CARTRIDGE_TYPES,
+                              default='auto',
+                              help="Select the cartridge type of the rom being run (default is to detect it from the rom, 'default' is for 'common' bankswitching)")
     parser.add_argument('-g', dest='graphics_driver', 
                               choices=graphics_options.keys(), 
                               default='pygame',
@@ -73,6 +78,11 @@ def main():
                               choices=audio_options.keys(), 
                               default='tia_dummy',
                               help="Select an alternate CPU emulation, primarily to allow trying different optimisations.")
+    parser.add_argument('--cache_dir', dest='cache_dir', type=str,
+                              default=None,
+                              help="Directory to keep precalculated tables and translated code between runs, eg ~/.pytari2600 (off by default)")
+    parser.add_argument('--frameskip', dest='frameskip', type=int, default=0,
+                              help="Number of frames to run without drawing them, after each frame drawn.")
     parser.add_argument('-n', dest='no_delay',       action='store_true',
                               help="Wishful flag for when the emulator runs too fast.")
 
@@ -0,0 +1,208 @@
+""" Whole rom, ahead of time translation for the 'static' cpu core.
+
+    Follows the code reachable from the reset and break vectors of each
+    bank, through branches, jumps and subroutine calls, and writes a python
+    module next to the rom, with a function per block as generated by the
+    'cpu_gen' block translator. Code only reached through indirect jumps,
+    returns or bank switches is left to the 'cpu_gen' decoders at run time.
+
+    usage: python -m pytari2600.recompile [-c CART_TYPE] cartridge_name
+"""
+
+import argparse
+import hashlib
+import marshal
+import os
+import sys
+from . import atari2600
+from . import cache
+from . import clocks
+from .cpu_gen import addressing
+from .cpu_gen import core
+from .cpu_gen import instructions
+from .cpu_gen import pc_state
+from .memory import cartridge
+from .memory import memory
+
+# Bump if the generated modules change.
+VERSION = 1
+
+def module_path(cart_name):
+    """ Location of the translated module for rom 'cart_name'. """
+    return os.path.splitext(cart_name)[0] + '_static.py'
+
+class Recompiler(object):
+    """ Translates the blocks reachable in a cartridge. """
+
+    def __init__(self, cart):
+        self.memory = memory.Memory()
+        self.memory.set_cartridge(cart)
+        self.core = core.Core(clocks.Clock(), self.memory, pc_state.PC_State())
+        self.core.initialise()
+        self.translator = self.core.translator
+
+        # Absolute address -> (pc, block)
+        self.blocks = {}
+        self._visited = set()
+
+    def _banks(self):
+        cart = self.memory.cartridge
+        if isinstance(cart, cartridge.GenericCartridge):
+            return range(cart.num_banks)
+        # Other mappers are only followed in their current mapping.
+        return [None]
+
+    def recompile(self):
+        """ Returns {absolute address: (pc, block)}. """
+        cart = self.memory.cartridge
+        current_bank = getattr(cart, 'current_bank', None)
+        for bank in self._banks():
+            if bank is not None:
+                cart._select_bank(bank)
+            self._follow([self.memory.read16(0xFFFC), self.memory.read16(0xFFFE)])
+        if isinstance(cart, cartridge.GenericCartridge):
+            cart._select_bank(current_bank)
+        return self.blocks
+
+    def _follow(self, entries):
+        get_absolute_address = self.memory.cartridge.get_absolute_address
+        pending = list(entries)
+        while pending:
+            pc = pending.pop() & 0xFFFF
+            if not self.core.is_static_code(pc, pc + 1):
+                # Cartridge ram, hot spots or not in the cartridge.
+                continue
+            absolute = get_absolute_address(pc)
+            if absolute in self._visited:
+                continue
+            self._visited.add(absolute)
+
+            built = self.translator.build_block(pc)
+            if built is not None:
+                (block, last_pc, end_pc) = built
+                self.blocks[absolute] = (pc, block)
+                pending.extend(self._successors(last_pc, end_pc))
+            else:
+                # An instruction the translator leaves to the decoder, carry
+                # on after it.
+                instruction = self.core.instruction_lookup[self.memory.read(pc)]
+                if instruction is not False:
+                    pending.extend(self._successors(pc, pc + self._size(instruction)))
+
+    def _size(self, instruction):
+        if isinstance(instruction, instructions.ReadWriteInstruction):
+            return instruction.address.get_addressing_size() + 1
+        return 1
+
+    def _successors(self, last_pc, end_pc):
+        """ Addresses executed after a block, where they are known. """
+        memory = self.memory
+        instruction = self.core.instruction_lookup[memory.read(last_pc)]
+        if isinstance(instruction, instructions.BranchInstruction):
+            delta = memory.read(last_pc + 1) & 0xFF
+            if delta & 0x80:
+                delta -= 0x100
+            return [last_pc + 2 + delta, last_pc + 2]
+        elif isinstance(instruction, instructions.JumpSubRoutineInstruction):
+            return [memory.read16(last_pc + 1), last_pc + 3]
+        elif isinstance(instruction, instructions.JumpInstruction):
+            if isinstance(instruction.address, addressing.AddressAbs):
+                return [memory.read16(last_pc + 1)]
+            return []
+        elif isinstance(instruction, (instructions.ReturnFromSubRoutineInstruction,
+                                      instructions.ReturnFromInterrupt,
+                                      instructions.BreakInstruction)):
+            return []
+        return [end_pc]
+
+    def module_source(self, rom_digest, rom_name):
+        blocks = self.recompile()
+        lines   = ['""" Blocks of \'%s\' translated ahead of time by pytari2600.recompile. """' % (rom_name),
+                   '',
+                   module_header(rom_digest)]
+        entries = []
+        for absolute in sorted(blocks):
+            (pc, block) = blocks[absolute]
+            if block.delegate is None:
+                make_name = 'make_%x' % (absolute)
+                lines.append(block.source('block_%x' % (pc), make_name))
+            else:
+                make_name = 'None'
+            entries.append('    0x%x: (0x%x, %s, %r),' % (absolute, pc, make_name, tuple(block.recipes)))
+
+        lines.append('# Absolute address: (pc, make function, bound object recipes)')
+        lines.append('BLOCKS = {')
+        lines.extend(entries)
+        lines.append('    }')
+        return '\n'.join(lines) + '\n'
+
+def module_header(rom_digest):
+    """ Lines identifying the rom and version a module was written for. """
+    return 'VERSION = %d\nROM_DIGEST = %r\n' % (VERSION, rom_digest)
+
+def run_module(source, path):
+    """ Namespace of the module 'source', the compiled code is kept in the
+        cache directory. """
+    key  = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    name = 'static_%s_%s_%d%d.marshal' % (key, sys.platform, sys.version_info[0], sys.version_info[1])
+    code = None
+    data = cache.load(name)
+    if data is not None:
+        try:
+            code = marshal.loads(data)
+        except (ValueError, EOFError, TypeError):
+            print("Warning: Ignoring invalid code cache %s" % (name))
+    if code is None:
+        code = compile(source, path, 'exec')
+        cache.save(name, marshal.dumps(code))
+    namespace = {}
+    exec(code, namespace)
+    return namespace
+
+def write_module(cart, cart_name):
+    """ Recompile 'cart', write the module next to the rom and return its
+        source. """
+    path   = module_path(cart_name)
+    source = Recompiler(cart).module_source(cache.rom_digest(cart_name), os.path.basename(cart_name))
+    try:
+        with open(path, 'w') as module_file:
+            module_file.write(source)
+    except (IOError, OSError):
+        print("Warning: Unable to write %s" % (path))
+    return source
+
+def load(cart, cart_name):
+    """ Translated blocks for rom 'cart_name', recompiled if the module is
+        missing or out of date. """
+    path   = module_path(cart_name)
+    header = module_header(cache.rom_digest(cart_name))
+    try:
+        with open(path, 'r') as module_file:
+            source = module_file.read()
+        # Only run modules written for this rom and version, and recompile
+        # any that fail to run (eg a partially written module).
+        if header in source:
+            return run_module(source, path)['BLOCKS']
+    except (IOError, OSError):
+        pass
+    except Exception as e:
+        print("Warning: Ignoring invalid module %s: %s" % (path, e))
+
+    print("Recompiling %s" % (cart_name))
+    return run_module(write_module(cart, cart_name), path)['BLOCKS']
+
+def main():
+    parser = argparse.ArgumentParser(description='Translate a rom ahead of time, for use with "--cpu static"')
+    parser.add_argument('cartridge_name', action='store')
+    parser.add_argument('-c', dest='cart_type',
+                              choices=atari2600.CARTRIDGE_TYPES,
+                              default='auto',
+                              help="Select the cartridge type of the rom being run (default is to detect it from the rom, 'default' is for 'common' bankswitching)")
+    args = parser.parse_args()
+
+    cart = atari2600.create_cartridge(args.cartridge_name, args.cart_type)
+    write_module(cart, args.cartridge_name)
+    print("Wrote %s" % (module_path(args.cartridge_name)))
+
+if __name__ == '__main__':
+    main()
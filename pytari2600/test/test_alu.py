@@ -0,0 +1,77 @@
+import pytari2600.alu as alu
+import pytari2600.cache as cache
+import pytari2600.cpu.instructions as instructions
+import pytari2600.cpu.pc_state as pc_state
+import shutil
+import tempfile
+import unittest
+
+class TestALU(unittest.TestCase):
+
+    def adc(self, table, a, b, c):
+        entry = table[(c << 16) | (a << 8) | b]
+        return (entry & 0xFF, entry >> 8)
+
+    def test_binary(self):
+        tables = alu.get_tables()
+        self.assertEqual(self.adc(tables.adc, 0x50, 0x10, 0), (0x60, 0))
+        self.assertEqual(self.adc(tables.adc, 0x50, 0x50, 0), (0xA0, alu.N_FLAG | alu.V_FLAG))
+        self.assertEqual(self.adc(tables.adc, 0x90, 0x10, 0), (0xA0, alu.N_FLAG))
+        self.assertEqual(self.adc(tables.adc, 0xFF, 0x00, 1), (0x00, alu.Z_FLAG | alu.C_FLAG))
+        # Subtract with no borrow.
+        self.assertEqual(self.adc(tables.sbc, 0x50, 0x30, 0), (0x20, alu.C_FLAG))
+        self.assertEqual(self.adc(tables.sbc, 0x50, 0xB0, 0), (0xA0, alu.N_FLAG | alu.V_FLAG))
+        self.assertEqual(self.adc(tables.sbc, 0x10, 0x10, 1), (0xFF, alu.N_FLAG))
+
+    def test_decimal(self):
+        tables = alu.get_tables()
+        self.assertEqual(self.adc(tables.adc_decimal, 0x12, 0x34, 0), (0x46, 0))
+        self.assertEqual(self.adc(tables.adc_decimal, 0x58, 0x46, 1), (0x05, alu.N_FLAG | alu.V_FLAG | alu.C_FLAG))
+        self.assertEqual(self.adc(tables.adc_decimal, 0x99, 0x01, 0), (0x00, alu.N_FLAG | alu.C_FLAG))
+        self.assertEqual(self.adc(tables.adc_decimal, 0x79, 0x00, 1), (0x80, alu.N_FLAG | alu.V_FLAG))
+        self.assertEqual(self.adc(tables.sbc_decimal, 0x46, 0x12, 0), (0x34, alu.C_FLAG))
+        self.assertEqual(self.adc(tables.sbc_decimal, 0x40, 0x13, 0), (0x27, alu.C_FLAG))
+        self.assertEqual(self.adc(tables.sbc_decimal, 0x32, 0x02, 1), (0x29, alu.C_FLAG))
+        self.assertEqual(self.adc(tables.sbc_decimal, 0x00, 0x01, 0), (0x99, alu.N_FLAG))
+
+    def test_cmp(self):
+        tables = alu.get_tables()
+        self.assertEqual(tables.cmp[(0x10 << 8) | 0x10], alu.Z_FLAG | alu.C_FLAG)
+        self.assertEqual(tables.cmp[(0x10 << 8) | 0x20], alu.N_FLAG)
+        self.assertEqual(tables.cmp[(0x20 << 8) | 0x10], alu.C_FLAG)
+
+    def test_shared(self):
+        self.assertTrue(alu.get_tables() is alu.get_tables())
+        built = alu.build_tables()
+        self.assertEqual(built.adc_decimal, alu.get_tables().adc_decimal)
+        self.assertEqual(built.cmp, alu.get_tables().cmp)
+
+    def test_cache(self):
+        saved_dir = cache.CACHE_DIR
+        cache_dir = tempfile.mkdtemp()
+        cache.set_cache_dir(cache_dir)
+        try:
+            self.assertEqual(alu._load(), None)
+            tables = alu.get_tables()
+            alu._save(tables)
+            loaded = alu._load()
+            for name in ('adc', 'sbc', 'adc_decimal', 'sbc_decimal', 'cmp'):
+                self.assertEqual(getattr(loaded, name), getattr(tables, name))
+
+            # Truncated files are ignored.
+            cache.save(alu._cache_name(), b'\0' * 16)
+            self.assertEqual(alu._load(), None)
+        finally:
+            cache.set_cache_dir(saved_dir)
+            shutil.rmtree(cache_dir)
+
+    def test_instruction_exec(self):
+        current_pc_state = pc_state.PC_State()
+        instruction_exec = instructions.InstructionExec(current_pc_state)
+
+        current_pc_state.P.value = 0x08 | 0x04
+        self.assertEqual(instruction_exec.addc(0x58, 0x46, 1), 0x05)
+        self.assertEqual(current_pc_state.P.value, 0x08 | 0x04 | alu.N_FLAG | alu.V_FLAG | alu.C_FLAG)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import pytari2600.cpu.core as core
+import pytari2600.cpu.pc_state as pc_state
+import pytari2600.cpu_gen.core as gen_core
+import pytari2600.cpu_gen.pc_state as gen_pc_state
+import pytari2600.memory.cartridge as cartridge
+from .test_translator import CoreHarness
+import os
+import shutil
+import tempfile
+import unittest
+
+class TestBankDecoders(unittest.TestCase):
+
+    # Bank 0: start: LDX #2
+    #         loop:  LDA $1FF9 (switch to bank 1)
+    #                ...
+    #         ret:   DEX; BNE loop
+    #         end:   JMP end
+    # Bank 1: loop+3: ADC #7; LDY $1FF8 (switch to bank 0)
+    BANKS = [[0xA2, 0x02, 0xAD, 0xF9, 0x1F, 0xEA, 0xEA, 0xEA, 0xEA, 0xEA,
+              0xCA, 0xD0, 0xF5, 0x4C, 0x0D, 0xF0],
+             [0xEA, 0xEA, 0xEA, 0xEA, 0xEA, 0x69, 0x07, 0xAC, 0xF8, 0x1F]]
+    END = 0xF00D
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.rom_name = os.path.join(self.temp_dir, 'rom.bin')
+        with open(self.rom_name, 'wb') as rom_file:
+            for bank in self.BANKS:
+                rom = bytearray(0x1000)
+                rom[0:len(bank)] = bytearray(bank)
+                rom[0xFFC] = 0x00
+                rom[0xFFD] = 0xF0
+                rom_file.write(rom)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_program(self, cpu_module, state_module, translate=True):
+        harness = CoreHarness(cartridge.GenericCartridge(self.rom_name, 2, 0x1000, 0xFF9, 0),
+                              cpu_module, state_module, translate=translate)
+        harness.run_to(self.END)
+        return (harness.cpu, harness.clocks.system_clock, harness.pc_state.get_save_state())
+
+    def test_matches_cpu(self):
+        (ref_cpu, ref_clock, ref_state) = self.run_program(core, pc_state)
+        for translate in (True, False):
+            (cpu, clock, state) = self.run_program(gen_core, gen_pc_state, translate)
+            self.assertEqual(clock, ref_clock)
+            self.assertEqual(state, ref_state)
+
+            # 'loop+3' was only executed in bank 1, bank 0 is mapped in.
+            self.assertNotEqual(cpu.bank_decoders[0x1005], cpu.lazy_decoder)
+            self.assertEqual(cpu.bank_decoders[0x005], cpu.lazy_decoder)
+            self.assertEqual(cpu.op_decoder[0x005], cpu.lazy_decoder)
+            self.assertEqual(cpu.op_decoder[0x00A], cpu.bank_decoders[0x00A])
+
+    def test_table_size(self):
+        # Sized to the rom, not the most banks the cartridge type allows.
+        for banks in (self.BANKS[:1], self.BANKS):
+            with open(self.rom_name, 'wb') as rom_file:
+                for bank in banks:
+                    rom = bytearray(0x1000)
+                    rom[0:len(bank)] = bytearray(bank)
+                    rom_file.write(rom)
+            harness = CoreHarness(cartridge.GenericCartridge(self.rom_name, 8, 0x1000, 0xFF9, 0))
+            self.assertEqual(len(harness.cpu.bank_decoders), 0x1000 * len(banks))
+
+if __name__ == '__main__':
+    unittest.main()
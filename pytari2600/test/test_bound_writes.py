@@ -0,0 +1,56 @@
+import pytari2600.cpu_gen.pc_state as pc_state
+import pytari2600.memory.memory as memory
+import pytari2600.clocks as clocks
+from .test_translator import CoreHarness, DummyCartridge, DummyDevice
+from . import test_fusion
+import unittest
+
+class BoundDevice(DummyDevice):
+    """ Device providing write functions for fixed addresses. """
+    def __init__(self, clocks, pc_state):
+        super(BoundDevice, self).__init__(clocks, pc_state)
+        self.bound = []
+
+    def write_handler(self, address):
+        self.bound.append(address)
+        return lambda data: self.write(address, data)
+
+class TestBoundWrites(unittest.TestCase):
+
+    PROGRAM = test_fusion.TestFusion.PROGRAM
+    END     = test_fusion.TestFusion.END
+
+    def run_program(self, device_class, translate, fuse):
+        harness = CoreHarness(DummyCartridge(self.PROGRAM), translate=translate,
+                              fuse=fuse, device_class=device_class)
+        harness.run_to(self.END)
+        return (harness.device,) + harness.result()
+
+    def test_matches_write(self):
+        for translate in (True, False):
+            for fuse in (True, False):
+                (device, clock, state, log) = self.run_program(BoundDevice, translate, fuse)
+                (ref_device, ref_clock, ref_state, ref_log) = self.run_program(DummyDevice, translate, fuse)
+                self.assertEqual(clock, ref_clock)
+                self.assertEqual(state, ref_state)
+                self.assertEqual(log, ref_log)
+                self.assertTrue(len(device.bound) > 0)
+
+    def test_memory_write_handler(self):
+        clock   = clocks.Clock()
+        state   = pc_state.PC_State()
+        device  = DummyDevice(clock, state)
+        mem     = memory.Memory()
+        mem.set_cartridge(DummyCartridge([]))
+        mem.set_riot(device)
+        mem.set_stella(device)
+
+        # Mirrors are masked as 'write', devices without 'write_handler' are
+        # called through 'write'.
+        for address in (0x02, 0x142, 0x81, 0x1F0, 0x280, 0x2280):
+            mem.write_handler(address)(0x12)
+            mem.write(address, 0x12)
+            self.assertEqual(device.log[-2], device.log[-1])
+
+if __name__ == '__main__':
+    unittest.main()
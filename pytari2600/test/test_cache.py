@@ -0,0 +1,81 @@
+import pytari2600.cache as cache
+from pytari2600.test.test_translator import TestTranslator
+import os
+import shutil
+import tempfile
+import unittest
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_dir = cache.CACHE_DIR
+        self.saved_shared = dict(cache._shared)
+        self.cache_dir = tempfile.mkdtemp()
+        cache.set_cache_dir(self.cache_dir)
+
+    def tearDown(self):
+        cache.set_cache_dir(self.saved_dir)
+        cache._shared.clear()
+        cache._shared.update(self.saved_shared)
+        shutil.rmtree(self.cache_dir)
+
+    def test_disabled(self):
+        cache.set_cache_dir(None)
+        self.assertEqual(cache.cache_file('test'), None)
+        cache.save('test', b'data')
+        self.assertEqual(cache.load('test'), None)
+
+    def test_load_save(self):
+        self.assertEqual(cache.load('test'), None)
+        cache.save('test', b'data')
+        self.assertEqual(cache.load('test'), b'data')
+        self.assertEqual(os.listdir(self.cache_dir), ['test'])
+
+    def test_shared_table(self):
+        built = []
+        def build():
+            built.append(1)
+            return [1, 2, 3]
+
+        table = cache.shared_table('test_table', build)
+        self.assertEqual(table, [1, 2, 3])
+        self.assertTrue(cache.shared_table('test_table', build) is table)
+        self.assertEqual(len(built), 1)
+
+        # A new process loads the table from the cache directory.
+        cache._shared.clear()
+        self.assertEqual(cache.shared_table('test_table', build), [1, 2, 3])
+        self.assertEqual(len(built), 1)
+
+    def test_rom_digest(self):
+        rom_name = os.path.join(self.cache_dir, 'rom.bin')
+        with open(rom_name, 'wb') as rom_file:
+            rom_file.write(b'\x00' * 0x1000)
+        digest = cache.rom_digest(rom_name)
+        self.assertEqual(cache.rom_digest(rom_name), digest)
+        with open(rom_name, 'wb') as rom_file:
+            rom_file.write(b'\x00' * 0xFFF + b'\x01')
+        self.assertNotEqual(cache.rom_digest(rom_name), digest)
+
+    def test_code_cache(self):
+        program = TestTranslator('test_run')
+        def run(cpu, state):
+            cpu.load_code_cache('test')
+            while state.PC != program.END:
+                cpu.step()
+            cpu.save_code_cache()
+
+        (cpu, clock, state, log) = program.run_program(True, run)
+        compiled = len(cpu.translator._code)
+        self.assertTrue(compiled > 0)
+
+        # Second run uses the saved code, without compiling any blocks.
+        (cached_cpu, cached_clock, cached_state, cached_log) = program.run_program(True, run)
+        self.assertEqual(len(cached_cpu.translator._code), compiled)
+        self.assertFalse(cached_cpu.translator._code_added)
+        self.assertEqual(cached_clock, clock)
+        self.assertEqual(cached_state, state)
+        self.assertEqual(cached_log, log)
+
+if __name__ == '__main__':
+    unittest.main()
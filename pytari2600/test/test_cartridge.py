@@ -1,4 +1,7 @@
 import pytari2600.memory.cartridge as cartridge
+import pytari2600.memory.snapshot as snapshot
+import os
+import tempfile
 import unittest
 import pkg_resources
 
@@ -20,5 +23,185 @@ class TestCartridge(unittest.TestCase):
         cart.write(0,31)
         self.assertEqual(cart.read(0x80), 31)
 
+    def test_bank_listener(self):
+        rom_file = tempfile.NamedTemporaryFile(suffix='.bin', delete=False)
+        rom_file.write(bytearray(0x4000))
+        rom_file.close()
+        cart = cartridge.GenericCartridge(rom_file.name, 4, 0x1000, 0xFF9, 0x0)
+        os.remove(rom_file.name)
+        switches = []
+        cart.set_bank_listener(lambda: switches.append(cart.current_bank))
+        # Only called when the bank changes.
+        cart.read(0xFF7)
+        cart.read(0xFF7)
+        cart.read(0x100)
+        cart.write(0xFF9, 0)
+        cart.write(0xFF6, 0)
+        self.assertEqual(switches, [1, 3, 0])
+        self.assertEqual(cart.get_absolute_address(0x1123), 0x123)
+
+    def write_rom(self, size):
+        rom = bytearray([(address * 7 + (address >> 10)) & 0xFF for address in range(size)])
+        rom_file = tempfile.NamedTemporaryFile(suffix='.bin', delete=False)
+        rom_file.write(rom)
+        rom_file.close()
+        self.addCleanup(os.remove, rom_file.name)
+        return (rom_file.name, rom)
+
+    def check_rom_reads(self, cart, rom):
+        # Reads away from the hot spots, are the rom at the absolute address.
+        for address in range(0x1000):
+            if not cart._hotspots[address]:
+                self.assertEqual(cart.read(0x1000 | address), rom[cart.get_absolute_address(0x1000 | address)])
+
+    def test_hotspots(self):
+        (rom_name, rom) = self.write_rom(0x4000)
+        cart = cartridge.GenericCartridge(rom_name, 4, 0x1000, 0xFF9, 0x080)
+        self.assertEqual([a for a in range(0x1000) if cart._hotspots[a]],
+                         list(range(0x080, 0x100)) + list(range(0xFF6, 0xFFA)))
+        for hot_spot in (0xFF6, 0xFF9, 0xFF8):
+            cart.read(hot_spot)
+            self.check_rom_reads(cart, rom)
+
+        state = cart.get_save_state()
+        cart.read(0xFF7)
+        cart.set_save_state(state)
+        self.assertEqual(cart.current_bank, 2)
+        self.check_rom_reads(cart, rom)
+
+    def test_pb_hotspots(self):
+        (rom_name, rom) = self.write_rom(0x2000)
+        cart = cartridge.PBCartridge(rom_name)
+        self.check_rom_reads(cart, rom)
+        for hot_spot in (0xFE3, 0xFEE, 0xFF1, 0xFE0):
+            cart.read(hot_spot)
+            self.check_rom_reads(cart, rom)
+        self.assertEqual(cart._slice, [0, 6, 1, 7])
+
+        state = cart.get_save_state()
+        cart.read(0xFE5)
+        cart.set_save_state(state)
+        self.check_rom_reads(cart, rom)
+
+    def test_mnetwork_hotspots(self):
+        (rom_name, rom) = self.write_rom(0x4000)
+        cart = cartridge.MNetworkCartridge(rom_name)
+        for hot_spot in (0xFE3, 0xFE7, 0xFE0):
+            cart.read(hot_spot)
+            self.check_rom_reads(cart, rom)
+        # Bank 7 maps ram over 0x400-0x7FF.
+        cart.read(0xFE7)
+        self.assertTrue(cart._hotspots[0x400])
+        cart.read(0xFE6)
+        self.assertFalse(cart._hotspots[0x400])
+
+    def test_mnetwork_ram(self):
+        (rom_name, rom) = self.write_rom(0x4000)
+        cart = cartridge.MNetworkCartridge(rom_name)
+        # Selectable 256 byte ram, written at 0x800 and read at 0x900.
+        cart.read(0xFE9)
+        cart.write(0x812, 0x34)
+        self.assertEqual(cart.read(0x912), 0x34)
+        cart.read(0xFEA)
+        self.assertEqual(cart.read(0x912), 0)
+        cart.read(0xFE9)
+        self.assertEqual(cart.read(0x912), 0x34)
+
+        # 1K ram, written at 0x000 and read at 0x400 while bank 7 is selected.
+        cart.write(0x012, 0x56)
+        self.assertEqual(cart.read(0x412), rom[0x412])
+        cart.read(0xFE7)
+        cart.write(0x012, 0x56)
+        self.assertEqual(cart.read(0x412), 0x56)
+        self.assertEqual(cart.read(0x012), rom[0x3812])
+
+        state = cart.get_save_state()
+        cart.read(0xFE0)
+        cart.set_save_state(state)
+        self.assertEqual(cart.read(0x412), 0x56)
+
+    def test_fe(self):
+        (rom_name, rom) = self.write_rom(0x2000)
+        cart = cartridge.FECartridge(rom_name, 2, 0x1000)
+        # A13 clear is bank 1, set is bank 0.
+        self.assertEqual(cart.read(0x1123), rom[0x1123])
+        self.assertEqual(cart.read(0x3123), rom[0x0123])
+        self.assertEqual(cart.get_absolute_address(0xF123), 0x0123)
+        self.assertEqual(cart.get_absolute_address(0xD123), 0x1123)
+
+    def test_single_bank(self):
+        # A 2K rom is mirrored.
+        (rom_name, rom) = self.write_rom(0x800)
+        cart = cartridge.SingleBankCartridge(rom_name, 0x1000)
+        self.assertEqual(cart.read(0x1812), rom[0x012])
+        self.assertEqual(cart.get_absolute_address(0x1812), 0x812)
+
+    def test_save_state(self):
+        (rom_name, rom) = self.write_rom(0x4000)
+        cart = cartridge.GenericCartridge(rom_name, 4, 0x1000, 0xFF9, 0x080)
+        cart.write(0x12, 0x34)
+        # States without 'slices' restore the current bank.
+        cart.set_save_state({'ram': [0] * 0x80, 'current_bank': 2, 'file_name': rom_name})
+        self.assertEqual(cart.read(0x92), 0)
+        self.assertEqual(cart.read(0x123), rom[0x2123])
+
+        cart.write(0x12, 0x34)
+        state = cart.get_save_state()
+        cart.write(0x12, 0x56)
+        cart.set_save_state(state)
+        self.assertEqual(cart.read(0x92), 0x34)
+        self.assertEqual(snapshot.decode_ram(state['ram']), cart.ram)
+        self.assertTrue(isinstance(cart.ram, bytearray))
+
+    def test_short_roms(self):
+        # 4K and 3K banks, the short bank is padded with zeros.
+        (rom_name, rom) = self.write_rom(0x1C00)
+        cart = cartridge.GenericCartridge(rom_name, 4, 0x1000, 0xFF9, 0)
+        self.assertEqual(cart.num_banks, 2)
+        self.assertEqual([len(bank) for bank in cart.cartridge_banks], [0x1000, 0x1000])
+        cart.read(0xFF9)
+        self.assertEqual(cart.read(0xBFF), rom[0x1BFF])
+        self.assertEqual(cart.read(0xC00), 0)
+
+        # Banks of up to half the bank size are mirrored.
+        (rom_name, rom) = self.write_rom(0x1600)
+        cart = cartridge.GenericCartridge(rom_name, 4, 0x1000, 0xFF9, 0)
+        cart.read(0xFF9)
+        self.assertEqual(cart.read(0x5FF), rom[0x15FF])
+        self.assertEqual(cart.read(0x600), 0)
+        self.assertEqual(cart.read(0x812), rom[0x1012])
+
+        # Slices smaller than the bank size.
+        (rom_name, rom) = self.write_rom(0x1F00)
+        cart = cartridge.PBCartridge(rom_name)
+        self.assertEqual(cart.num_banks, 8)
+        self.assertEqual(cart.read(0xEFF), rom[0x1EFF])
+        self.assertEqual(cart.read(0xF00), 0)
+
+        # Banks past the end of the rom mirror its banks.
+        (rom_name, rom) = self.write_rom(0x1000)
+        cart = cartridge.PBCartridge(rom_name)
+        self.assertEqual(cart.num_banks, 4)
+        self.assertEqual(cart.read(0xC12), rom[0xC12])
+        self.assertEqual(cart.get_absolute_address(0xC12), 0xC12)
+        cart.read(0xFE6)
+        self.assertEqual(cart.read(0x012), rom[0x812])
+        self.assertEqual(cart.get_absolute_address(0x012), 0x812)
+
+    def test_empty_rom(self):
+        (rom_name, rom) = self.write_rom(0)
+        cart = cartridge.GenericCartridge(rom_name, 4, 0x1000, 0xFF9, 0)
+        self.assertEqual(cart.num_banks, 0)
+        self.assertEqual(cart.read(0x123), 0)
+
+    def test_shared_rom(self):
+        # Full banks aren't copied from the rom.
+        (rom_name, rom) = self.write_rom(0x2000)
+        cart = cartridge.GenericCartridge(rom_name, 4, 0x1000, 0xFF9, 0)
+        for bank in cart.cartridge_banks:
+            if isinstance(bank, memoryview):
+                self.assertTrue(bank.readonly)
+            self.assertEqual(bytearray(bank), rom[0:0x1000] if bank is cart.cartridge_banks[0] else rom[0x1000:])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import pytari2600.clocks as clocks
+import unittest
+
+class TestClock(unittest.TestCase):
+
+    def test_events(self):
+        clock = clocks.Clock()
+        fired = []
+        clock.schedule(200, lambda: fired.append(200))
+        clock.schedule(100, lambda: fired.append(100))
+        cancelled = clock.schedule(150, lambda: fired.append(150))
+        clock.schedule(100, lambda: fired.append(101))
+        self.assertEqual(clock.next_event, 100)
+        self.assertEqual(clock.limit, 100)
+
+        clock.cancel(cancelled)
+        clock.system_clock = 99
+        clock.run_events()
+        self.assertEqual(fired, [])
+
+        clock.system_clock = 160
+        clock.run_events()
+        self.assertEqual(fired, [100, 101])
+        self.assertEqual(clock.next_event, 200)
+
+        clock.system_clock = 300
+        clock.run_events()
+        self.assertEqual(fired, [100, 101, 200])
+        self.assertEqual(clock.next_event, clocks.Clock.NEVER)
+
+    def test_reschedule(self):
+        clock = clocks.Clock()
+        fired = []
+        def periodic():
+            fired.append(clock.system_clock)
+            clock.schedule(clock.system_clock + 10, periodic)
+        clock.schedule(10, periodic)
+        for system_clock in (5, 10, 15, 20, 35):
+            clock.system_clock = system_clock
+            clock.run_events()
+        self.assertEqual(fired, [10, 20, 35])
+        self.assertEqual(clock.next_event, 45)
+
+    def test_save_state(self):
+        clock = clocks.Clock()
+        clock.schedule(100, lambda: None)
+        clock.set_save_state(50)
+        self.assertEqual(clock.get_save_state(), 50)
+        self.assertEqual(clock.next_event, clocks.Clock.NEVER)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import random
+import unittest
+import pytari2600.graphics.compositor as compositor
+import pytari2600.graphics.stella as stella
+import pytari2600.audio.tiasound as tiasound
+import pytari2600.clocks as clocks
+import pytari2600.inputs as inputs
+
+WIDTH = stella.Stella.FRAME_WIDTH
+
+class TestStella(stella.Stella):
+    def __init__(self, *args):
+        self.default_color = 0
+        self.displayed = 0
+        super(TestStella, self).__init__(*args)
+
+    def driver_open_display(self):
+        pass
+
+    def driver_update_display(self):
+        self.displayed += 1
+
+class TestCompositor(unittest.TestCase):
+
+    def reference_scan(self, display_lines, y_start, y_stop, x_start, last_x_stop,
+                       pf_priority, colours, scans, collision_state):
+        """ Per pixel drawing, as 'Stella._screen_scan'. """
+        (bg, pf_colour, p1_colour, p0_colour) = colours
+        (pf_scan, bl_scan, m1_scan, p1_scan, m0_scan, p0_scan) = scans
+        for y in range(y_start, y_stop + 1):
+            x_stop = last_x_stop if y == y_stop else WIDTH - 1
+            for x in range(x_start, x_stop):
+                (pf, bl, m1, p1, m0, p0) = [scan[x] for scan in scans]
+                colour = bg
+                if pf_priority:
+                    order = ((p1 or m1, p1_colour), (p0 or m0, p0_colour), (pf or bl, pf_colour))
+                else:
+                    order = ((pf or bl, pf_colour), (p1 or m1, p1_colour), (p0 or m0, p0_colour))
+                for (drawn, c) in order:
+                    if drawn:
+                        colour = c
+                display_lines[y][x] = colour
+                if pf + bl + m1 + p1 + m0 + p0 > 1:
+                    collision_state.update_collisions(p0, p1, m0, m1, bl, pf)
+            x_start = 0
+
+    def collisions(self, collision_state):
+        collision_state.resolve()
+        return (collision_state._cxmp, collision_state._cxpfb, collision_state._cxmfb,
+                collision_state._cxblpf, collision_state._cxppmm)
+
+    def test_scan(self):
+        if compositor.numpy is None:
+            self.skipTest('numpy not available')
+
+        scan_compositor = compositor.create(0, WIDTH)
+        rand = random.Random(2600)
+        for pf_priority in (False, True):
+            for density in (0.05, 0.3):
+                scans = [[rand.random() < density for x in range(WIDTH)] for i in range(6)]
+                colours = (1, 2, 3, 4)
+                expected = [[0] * WIDTH for y in range(4)]
+                actual   = [[0] * WIDTH for y in range(4)]
+
+                self.reference_scan(expected, 1, 3, 20, 100, pf_priority, colours, scans, stella.CollisionState())
+                scan_compositor.scan(actual, 1, 3, 20, 100, pf_priority, colours,
+                                     [stella.scan_to_bits(scan) for scan in scans])
+
+                self.assertEqual(expected, actual)
+
+    def randomise(self, test_stella, rand):
+        """ Random object state, returns the line colours. """
+        test_stella.playfield_state.pf1 = rand.randint(0, 255)
+        test_stella.playfield_state.pf2 = rand.choice([0, 0x55, 0xF0])
+        test_stella.playfield_state.ctrlpf = rand.randint(0, 1)
+        test_stella.playfield_state.update()
+        for player in (test_stella.p0_state, test_stella.p1_state):
+            player.p = rand.randint(0, 255)
+            player.nusiz = rand.randint(0, 7)
+            player.resp = rand.randint(0, 227)
+            player.update()
+        for missile in (test_stella.missile0, test_stella.missile1):
+            missile.enam = rand.choice([0, 2])
+            missile.nusiz = rand.randint(0, 0x37)
+            missile.resm = rand.randint(0, 227)
+            missile.update()
+        test_stella.ball.enabl = rand.choice([0, 2])
+        test_stella.ball.ctrlpf = rand.randint(0, 0x30)
+        test_stella.ball.resbl = rand.randint(0, 227)
+        test_stella.ball.update()
+        test_stella.nextLine.ctrlpf = rand.choice([0, stella.Stella.PF_PRIORITY])
+        colours = (1, 2, 3, 4)
+        (test_stella.nextLine.backgroundColor, test_stella.nextLine.playfieldColor,
+         test_stella.nextLine.pColor[1], test_stella.nextLine.pColor[0]) = colours
+        return colours
+
+    def test_screen_scan(self):
+        rand = random.Random(2600)
+        test_stella = TestStella(clocks.Clock(), inputs.Input(), tiasound.TIA_Sound)
+        scan_compositor = test_stella._compositor
+        for test_stella._compositor in (None, scan_compositor):
+            for i in range(50):
+                colours = self.randomise(test_stella, rand)
+
+                # Anywhere from part of a line to a few lines, from line 10.
+                ticks = stella.Stella.HORIZONTAL_TICKS
+                test_stella._screen_start_clock = 0
+                test_stella._last_screen_update_clock = 10 * ticks + rand.randint(0, ticks - 1)
+                test_stella.clocks.system_clock = test_stella._last_screen_update_clock + rand.randint(0, 4 * ticks)
+                test_stella._collision_state.clear()
+
+                scan_lines = [[0] * WIDTH for y in range(len(test_stella._display_lines))]
+                expected = [[0] * WIDTH for y in range(len(test_stella._display_lines))]
+                expected_collisions = stella.CollisionState()
+                test_stella._display_lines = scan_lines
+
+                last_pos = test_stella._last_screen_update_clock
+                pos = test_stella.clocks.system_clock + 1
+                blank = stella.Stella.HORIZONTAL_BLANK
+                scans = (test_stella.playfield_state.get_playfield_scan(), test_stella.ball.get_ball_scan(),
+                         test_stella.missile1.get_missile_scan(), test_stella.p1_state.get_player_scan(),
+                         test_stella.missile0.get_missile_scan(), test_stella.p0_state.get_player_scan())
+                self.reference_scan(expected, last_pos // ticks, pos // ticks,
+                                    max(0, last_pos % ticks - blank), max(0, pos % ticks - blank),
+                                    0 != test_stella.nextLine.ctrlpf, colours, scans, expected_collisions)
+                test_stella._screen_scan(test_stella.nextLine, scan_lines)
+
+                self.assertEqual(expected, scan_lines)
+                self.assertEqual(self.collisions(expected_collisions), self.collisions(test_stella._collision_state))
+
+                # Drawn again, from the line cache for completed lines.
+                scan_lines = [[0] * WIDTH for y in range(len(test_stella._display_lines))]
+                test_stella._last_screen_update_clock = last_pos
+                test_stella._screen_scan(test_stella.nextLine, scan_lines)
+                self.assertEqual(expected, scan_lines)
+                self.assertEqual(self.collisions(expected_collisions), self.collisions(test_stella._collision_state))
+        self.assertTrue(test_stella.line_cache.hits > 0)
+
+    def test_render_off(self):
+        rand = random.Random(2600)
+        test_stella = TestStella(clocks.Clock(), inputs.Input(), tiasound.TIA_Sound)
+        test_stella.set_render(False)
+        self.assertTrue(test_stella.is_rendering())
+        # Applies from the next frame.
+        test_stella._next_frame()
+        self.assertFalse(test_stella.is_rendering())
+
+        ticks = stella.Stella.HORIZONTAL_TICKS
+        for i in range(20):
+            self.randomise(test_stella, rand)
+            test_stella._screen_start_clock = 0
+            test_stella._last_screen_update_clock = 10 * ticks
+            test_stella.clocks.system_clock = 13 * ticks
+            test_stella._collision_state.clear()
+            scan_lines = [[0] * WIDTH for y in range(len(test_stella._display_lines))]
+            test_stella._screen_scan(test_stella.nextLine, scan_lines)
+            collisions = self.collisions(test_stella._collision_state)
+
+            # Nothing is drawn, collisions and the scan time are as drawn.
+            self.assertEqual(scan_lines, [[0] * WIDTH for y in range(len(test_stella._display_lines))])
+            self.assertEqual(test_stella._last_screen_update_clock, 13 * ticks + 1)
+            test_stella._render = True
+            test_stella._last_screen_update_clock = 10 * ticks
+            test_stella._collision_state.clear()
+            test_stella._screen_scan(test_stella.nextLine, scan_lines)
+            self.assertEqual(self.collisions(test_stella._collision_state), collisions)
+            test_stella._render = False
+
+    def test_frameskip(self):
+        test_stella = TestStella(clocks.Clock(), inputs.Input(), tiasound.TIA_Sound)
+        test_stella.set_frameskip(2)
+        rendered = []
+        for frame in range(6):
+            test_stella._next_frame()
+            rendered.append(test_stella.is_rendering())
+        self.assertEqual(rendered, [False, False, True, False, False, True])
+
+    def test_update_display(self):
+        # Frames are only displayed when drawn.
+        test_stella = TestStella(clocks.Clock(), inputs.Input(), tiasound.TIA_Sound)
+        test_stella.set_frameskip(1)
+        for frame in range(4):
+            test_stella._is_update_time = True
+            test_stella._update_scans()
+        self.assertEqual(test_stella.displayed, 2)
+
+    def test_no_numpy(self):
+        # Non integer colours are left to the pixel loop.
+        self.assertEqual(compositor.create((0, 0, 0), WIDTH), None)
+
+if __name__ == '__main__':
+    unittest.main()
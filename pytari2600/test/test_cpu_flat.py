@@ -0,0 +1,61 @@
+import pytari2600.cpu_flat.instructions as flat_instructions
+import pytari2600.cpu_flat.pc_state as flat_pc_state
+import pytari2600.cpu.instructions as instructions
+import pytari2600.cpu.pc_state as pc_state
+import pytari2600.cpu_gen.pc_state as gen_pc_state
+import unittest
+
+class TestFlatPCState(unittest.TestCase):
+
+    def test_save_state(self):
+        gen_state = gen_pc_state.PC_State()
+        gen_state.A.set_value(0x12)
+        gen_state.X.set_value(0x34)
+        gen_state.Y.set_value(0x56)
+        gen_state.S.set_value(0xFD)
+        gen_state.P.set_value(0xA5)
+        gen_state.PC = 0xF123
+
+        flat_state = flat_pc_state.PC_State()
+        flat_state.set_save_state(gen_state.get_save_state())
+        self.assertEqual(flat_state.A, 0x12)
+        self.assertEqual(flat_state.P, 0xA5)
+        self.assertEqual(flat_state.get_save_state(), gen_state.get_save_state())
+
+        restored = gen_pc_state.PC_State()
+        restored.set_save_state(flat_state.get_save_state())
+        self.assertEqual(restored.get_save_state(), gen_state.get_save_state())
+
+    def test_slots(self):
+        state = flat_pc_state.PC_State()
+        with self.assertRaises(AttributeError):
+            state.Z = 1
+
+class TestFlatInstructionExec(unittest.TestCase):
+
+    def test_alu_matches(self):
+        """ Flat arithmetic matches the results and flags of 'cpu'. """
+        state      = pc_state.PC_State()
+        flat_state = flat_pc_state.PC_State()
+        exe        = instructions.InstructionExec(state)
+        flat_exe   = flat_instructions.InstructionExec(flat_state)
+
+        for p in (0x00, 0x08, 0xC9):
+            for a in range(0, 0x100, 7):
+                for b in range(0, 0x100, 3):
+                    for c in (0, 1):
+                        for name in ('addc', 'subc'):
+                            state.P.value = p
+                            flat_state.P  = p
+                            result = getattr(exe, name)(a, b, c)
+                            self.assertEqual(getattr(flat_exe, name)(a, b, c), result)
+                            self.assertEqual(flat_state.P, state.P.value)
+
+                    state.P.value = p
+                    flat_state.P  = p
+                    exe.cmp(a, b)
+                    flat_exe.cmp(a, b)
+                    self.assertEqual(flat_state.P, state.P.value)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import pytari2600.memory.detect as detect
+import pytari2600.cache as cache
+import os
+import shutil
+import tempfile
+import unittest
+
+class TestDetect(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_dir = cache.CACHE_DIR
+        self.temp_dir = tempfile.mkdtemp()
+        cache.set_cache_dir(os.path.join(self.temp_dir, 'cache'))
+
+    def tearDown(self):
+        cache.set_cache_dir(self.saved_dir)
+        shutil.rmtree(self.temp_dir)
+
+    def make_rom(self, size, code=()):
+        # Distinct bytes, so the superchip ram area doesn't repeat.
+        rom = bytearray([(i * 13 + (i >> 7)) & 0x7F for i in range(size)])
+        for (offset, data) in code:
+            rom[offset:offset + len(data)] = bytearray(data)
+        return rom
+
+    def make_superchip(self, rom):
+        for bank in range(0, len(rom), 0x1000):
+            rom[bank:bank + 0x100] = bytearray([0xFF] * 0x100)
+        return rom
+
+    def test_sizes(self):
+        self.assertEqual(detect.detect_type(self.make_rom(0x800)), 'default')
+        self.assertEqual(detect.detect_type(self.make_rom(0x1000)), 'default')
+        self.assertEqual(detect.detect_type(self.make_rom(0x2000)), 'default')
+        self.assertEqual(detect.detect_type(self.make_rom(0x3000)), 'cbs')
+        self.assertEqual(detect.detect_type(self.make_rom(0x4000)), 'default')
+        self.assertEqual(detect.detect_type(self.make_rom(0x8000)), 'f4')
+
+    def test_superchip(self):
+        self.assertEqual(detect.detect_type(self.make_superchip(self.make_rom(0x2000))), 'super')
+        self.assertEqual(detect.detect_type(self.make_superchip(self.make_rom(0x4000))), 'super')
+        self.assertEqual(detect.detect_type(self.make_superchip(self.make_rom(0x8000))), 'fe')
+
+    def test_hotspots(self):
+        # LDA $1FE3; STA $FFF0 ; LDA $1FF9
+        pb = [(0x100, [0xAD, 0xE3, 0x1F, 0x8D, 0xF0, 0xFF]), (0x1100, [0xAD, 0xF9, 0x1F])]
+        self.assertEqual(detect.detect_type(self.make_rom(0x2000, pb)), 'pb')
+        self.assertEqual(detect.hotspot_accesses(self.make_rom(0x2000, pb), 0xFE0, 0xFF8), 2)
+
+        # NOP $1FE7; LDA $FFE5 ; BIT $1FF6
+        mnet = [(0x100, [0x0C, 0xE7, 0x1F, 0xAD, 0xE5, 0xFF]), (0x1100, [0x2C, 0xF6, 0x1F])]
+        self.assertEqual(detect.detect_type(self.make_rom(0x4000, mnet)), 'mnet')
+
+        # Accesses to the zero page mirror of the offsets aren't hot spots.
+        self.assertEqual(detect.hotspot_accesses(self.make_rom(0x2000, [(0x100, [0xAD, 0xE3, 0x0F])]), 0xFE0, 0xFF8), 0)
+
+    def test_fe(self):
+        fe = [(0x200, [0x20, 0x00, 0xD0, 0xC6, 0xC5])]
+        self.assertEqual(detect.detect_type(self.make_rom(0x2000, fe)), 'e')
+
+    def test_index(self):
+        rom_name = os.path.join(self.temp_dir, 'rom.bin')
+        with open(rom_name, 'wb') as rom_file:
+            rom_file.write(self.make_rom(0x3000))
+        self.assertEqual(detect.cartridge_type(rom_name), 'cbs')
+        self.assertTrue(os.path.exists(cache.cache_file(detect.INDEX_NAME)))
+
+        # The index is used for a rom seen before.
+        saved_detect_type = detect.detect_type
+        detect.detect_type = None
+        try:
+            self.assertEqual(detect.cartridge_type(rom_name), 'cbs')
+        finally:
+            detect.detect_type = saved_detect_type
+
+        # A changed rom is detected again.
+        with open(rom_name, 'wb') as rom_file:
+            rom_file.write(self.make_rom(0x8000))
+        self.assertEqual(detect.cartridge_type(rom_name), 'f4')
+
+if __name__ == '__main__':
+    unittest.main()
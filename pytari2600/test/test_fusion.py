@@ -0,0 +1,59 @@
+import pytari2600.cpu_fused.core as fused_core
+import pytari2600.cpu_gen.fusion as fusion
+from .test_translator import CoreHarness, DummyCartridge
+import unittest
+
+class TestFusion(unittest.TestCase):
+
+    # LDX #5; LDY #3; LDA #$12; STA WSYNC; STA $0081
+    # loop:  LDA ($84),Y; STA WSYNC; STA GRP0; DEY; BPL loop
+    #        LDA #0; STX $90
+    # delay: DEX; BNE delay
+    #        LDY #0; STY $91; STY $0092
+    # end:   JMP end
+    PROGRAM = [0xA2, 0x05, 0xA0, 0x03, 0xA9, 0x12, 0x85, 0x02, 0x8D, 0x81, 0x00,
+               0xB1, 0x84, 0x85, 0x02, 0x85, 0x1B, 0x88, 0x10, 0xF7,
+               0xA9, 0x00, 0x86, 0x90,
+               0xCA, 0xD0, 0xFD,
+               0xA0, 0x00, 0x84, 0x91, 0x8C, 0x92, 0x00,
+               0x4C, 0x22, 0xF0]
+    END = 0xF022
+
+    def run_program(self, fuse, run):
+        harness = CoreHarness(DummyCartridge(self.PROGRAM), core_module=fused_core, fuse=fuse)
+        run(harness.cpu, harness.pc_state)
+        return (harness.cpu,) + harness.result()
+
+    def fused_decoders(self, cpu):
+        return [d for d in cpu.op_decoder if isinstance(d, (fusion.LoadStoreDecoder, fusion.StepBranchDecoder))]
+
+    def test_matches_unfused(self):
+        run = lambda cpu, state: cpu.run_until(lambda: state.PC == self.END)
+        (cpu, clock, state, log) = self.run_program(True, run)
+        (ref_cpu, ref_clock, ref_state, ref_log) = self.run_program(False, run)
+
+        self.assertEqual(clock, ref_clock)
+        self.assertEqual(state, ref_state)
+        self.assertEqual(log, ref_log)
+        self.assertEqual(len(self.fused_decoders(cpu)), 5)
+        self.assertEqual(len(self.fused_decoders(ref_cpu)), 0)
+
+    def test_clock_limit(self):
+        # Stopping part way through a fused sequence matches stopping
+        # between the unfused instructions.
+        for max_clock in range(0, 400, 5):
+            run = lambda cpu, state: cpu.run(max_clock)
+            (cpu, clock, state, log) = self.run_program(True, run)
+            (ref_cpu, ref_clock, ref_state, ref_log) = self.run_program(False, run)
+            self.assertEqual(clock, ref_clock)
+            self.assertEqual(state, ref_state)
+            self.assertEqual(log, ref_log)
+
+    def test_not_fused(self):
+        # Store of a different register, or a branch on carry.
+        for program in ([0xA9, 0x00, 0x86, 0x80], [0xCA, 0x90, 0xFD], [0xA9, 0x00, 0x8D, 0xF8, 0x1F]):
+            harness = CoreHarness(DummyCartridge(program))
+            self.assertEqual(fusion.detect(harness.cpu), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import pytari2600.cpu_gen.instructions as instructions
+import pytari2600.cpu_gen.pc_state as pc_state
+import unittest
+
+class TestStatusFlags(unittest.TestCase):
+
+    def test_lazy_nz(self):
+        flags = pc_state.PC_StatusFlags()
+        flags.set_value(0x01)
+        for value, expected in ((0x00, 0x03), (0x80, 0x81), (0x100, 0x03), (0x7F, 0x01)):
+            flags.set_NZ(value)
+            self.assertEqual(flags.get_value(), expected)
+
+        flags.set_NZ(0x80)
+        self.assertEqual(flags.get_N(), 1)
+        self.assertEqual(flags.get_Z(), 0)
+
+    def test_overrides(self):
+        flags = pc_state.PC_StatusFlags()
+        # Explicit writes replace a pending result.
+        flags.set_NZ(0x00)
+        flags.set_value(0x80)
+        self.assertEqual(flags.get_value(), 0x80)
+
+        flags.set_NZ(0x00)
+        flags.set_N(1)
+        self.assertEqual(flags.get_value(), 0x82)
+
+        flags.set_NZ(0x00)
+        flags.set_C(1)
+        self.assertEqual(flags.get_save_state(), 0x03)
+
+        flags.set_NZ(0x00)
+        flags.set_save_state(0x40)
+        self.assertEqual(flags.get_value(), 0x40)
+
+    def test_instruction_exec(self):
+        state = pc_state.PC_State()
+        exe = instructions.InstructionExec(state)
+        state.P.set_value(0xFF)
+        exe.set_status_NZ(0x01)
+        self.assertEqual(state.P.get_value(), 0x7D)
+        exe.cmp(0x10, 0x10)
+        self.assertEqual(state.P.get_value(), 0x7F)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,5 +24,92 @@ class TestMemory(unittest.TestCase):
         r = m.read(0x100)
         self.assertEqual(r, 3)
 
+class Recorder(object):
+    def __init__(self, name, log):
+        self.name = name
+        self.log  = log
+
+    def read(self, address):
+        self.log.append((self.name, address))
+        return 0
+
+    def write(self, address, data):
+        self.log.append((self.name, address, data))
+
+class TestMemoryPages(unittest.TestCase):
+
+    # Reference decoding, as chains of mask comparisons.
+    def decode_read(self, address):
+        m = memory.Memory
+        if address & m.ROM_ADDRLINE:
+            return ('cartridge', address & ~m.ROM_MASK)
+        if (address & m.RIOT_MASK) == m.RIOT_ADDR:
+            return ('riot', address & ~m.RIOT_MASK)
+        if (address & m.STELLA_MASK) == m.STELLA_ADDR:
+            return ('stella', address & ~m.STELLA_MASK)
+        if m.STACK_OFFSET <= address < m.STACK_OFFSET + m.STACK_LENGTH:
+            return ('riot', address)
+        return ('cartridge', address & ~m.ROM_MASK)
+
+    def decode_write(self, address):
+        m = memory.Memory
+        if (address & m.STELLA_MASK) == m.STELLA_ADDR:
+            return ('stella', address & ~m.STELLA_MASK)
+        if (address & m.RIOT_MASK) == m.RIOT_ADDR:
+            return ('riot', address & ~m.RIOT_MASK)
+        if m.STACK_OFFSET <= address < m.STACK_OFFSET + m.STACK_LENGTH:
+            return ('riot', address)
+        if address & m.ROM_ADDRLINE:
+            return ('cartridge', address & ~m.ROM_MASK)
+        return None
+
+    def create_memory(self, log):
+        m = memory.Memory()
+        m.set_cartridge(Recorder('cartridge', log))
+        m.set_riot(Recorder('riot', log))
+        m.set_stella(Recorder('stella', log))
+        return m
+
+    def test_all_mirrors(self):
+        log = []
+        m = self.create_memory(log)
+        for address in range(0x10000):
+            del log[:]
+            m.read(address)
+            self.assertEqual(log, [self.decode_read(address)])
+
+            del log[:]
+            expected = self.decode_write(address)
+            if expected is None:
+                self.assertRaises(Exception, m.write, address, 5)
+            else:
+                m.write(address, 5)
+                self.assertEqual(log, [expected + (5,)])
+
+    def test_stack(self):
+        # The top half of the stack page is RIOT ram, the bottom half
+        # mirrors the TIA.
+        log = []
+        m = self.create_memory(log)
+        riot = Recorder('riot', log)
+        riot.ram = bytearray(0x80)
+        m.set_riot(riot)
+        m.writeSp(0xC5, 7)
+        m.writeSp(0x45, 8)
+        self.assertEqual(m.readSp(0x45), 0)
+        self.assertEqual(m.readSp(0xC5), 7)
+        self.assertEqual(riot.ram[0x45], 7)
+        self.assertEqual(log, [('stella', 0x145, 8), ('stella', 0x145)])
+
+    def test_set_cartridge(self):
+        # Changing the cartridge rebinds its pages.
+        log = []
+        m = self.create_memory(log)
+        m.set_cartridge(Recorder('new_cartridge', log))
+        m.read(0xF123)
+        m.write(0x1FF9, 1)
+        m.read(0x0081)
+        self.assertEqual(log, [('new_cartridge', 0x2123), ('new_cartridge', 0x0FF9, 1), ('riot', 0x0001)])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,114 @@
+import pytari2600.recompile as recompile
+import pytari2600.cache as cache
+import pytari2600.cpu_gen.core as gen_core
+import pytari2600.cpu_static.core as static_core
+import pytari2600.memory.cartridge as cartridge
+from .test_translator import CoreHarness, DummyCartridge
+import os
+import shutil
+import tempfile
+import unittest
+
+class TestRecompile(unittest.TestCase):
+
+    #       JSR sub; ROL A; LDX #3
+    # loop: DEX; BNE loop
+    #       BEQ end
+    # sub:  LDA #5; STA $80; RTS
+    #       NOP
+    # end:  JMP end
+    PROGRAM = [0x20, 0x0B, 0xF0, 0x2A, 0xA2, 0x03,
+               0xCA, 0xD0, 0xFD,
+               0xF0, 0x06,
+               0xA9, 0x05, 0x85, 0x80, 0x60,
+               0xEA,
+               0x4C, 0x11, 0xF0]
+    END = 0xF011
+
+    def setUp(self):
+        self.saved_dir = cache.CACHE_DIR
+        self.temp_dir = tempfile.mkdtemp()
+        cache.set_cache_dir(os.path.join(self.temp_dir, 'cache'))
+
+    def tearDown(self):
+        cache.set_cache_dir(self.saved_dir)
+        shutil.rmtree(self.temp_dir)
+
+    def run_program(self, core_module, static_blocks=None):
+        harness = CoreHarness(DummyCartridge(self.PROGRAM), core_module)
+        if static_blocks is not None:
+            # Decoders are created on first execution, after the reset.
+            harness.cpu.static_blocks = static_blocks
+        harness.run_to(self.END)
+        return (harness.cpu,) + harness.result()
+
+    def test_follows_code(self):
+        blocks = recompile.Recompiler(DummyCartridge(self.PROGRAM)).recompile()
+        # Untranslated 'ROL A' is skipped over, the unreached 'NOP' isn't
+        # translated.
+        self.assertEqual(sorted(blocks.keys()), [0x0, 0x4, 0x6, 0x9, 0xB, 0x11])
+        self.assertEqual(blocks[0x11][0], self.END)
+
+    def test_matches_cpu_gen(self):
+        source = recompile.Recompiler(DummyCartridge(self.PROGRAM)).module_source('digest', 'test.bin')
+        static_blocks = recompile.run_module(source, 'test_static.py')['BLOCKS']
+
+        (cpu, clock, state, log) = self.run_program(static_core, static_blocks)
+        (ref_cpu, ref_clock, ref_state, ref_log) = self.run_program(gen_core)
+        self.assertEqual(clock, ref_clock)
+        self.assertEqual(state, ref_state)
+        self.assertEqual(log, ref_log)
+        self.assertTrue(len([d for d in cpu.op_decoder if isinstance(d, static_core.StaticBlock)]) > 0)
+
+    def write_rom(self, banks):
+        rom_name = os.path.join(self.temp_dir, 'rom.bin')
+        with open(rom_name, 'wb') as rom_file:
+            for bank in banks:
+                rom = bytearray(0x1000)
+                rom[0:len(bank)] = bytearray(bank)
+                rom[0xFFC] = 0x00
+                rom[0xFFD] = 0xF0
+                rom_file.write(rom)
+        return rom_name
+
+    def test_banks(self):
+        # Bank 0: JMP $F000, bank 1: NOP; JMP $F001
+        rom_name = self.write_rom([[0x4C, 0x00, 0xF0], [0xEA, 0x4C, 0x01, 0xF0]])
+        cart = cartridge.GenericCartridge(rom_name, 2, 0x1000, 0xFF9, 0)
+        blocks = recompile.Recompiler(cart).recompile()
+        self.assertEqual(sorted(blocks.keys()), [0x0, 0x1000, 0x1001])
+        self.assertEqual(cart.current_bank, 0)
+
+    def test_load(self):
+        rom_name = self.write_rom([[0x4C, 0x00, 0xF0]])
+        cart = cartridge.GenericCartridge(rom_name, 1, 0x1000, 0xFF9, 0)
+        blocks = recompile.load(cart, rom_name)
+        self.assertEqual(list(blocks.keys()), [0x0])
+        self.assertTrue(os.path.exists(recompile.module_path(rom_name)))
+
+        # Changing the rom, recompiles the module.
+        rom_name = self.write_rom([[0xEA, 0x4C, 0x01, 0xF0]])
+        cart = cartridge.GenericCartridge(rom_name, 1, 0x1000, 0xFF9, 0)
+        blocks = recompile.load(cart, rom_name)
+        self.assertEqual(sorted(blocks.keys()), [0x0, 0x1])
+
+    def test_load_invalid(self):
+        rom_name = self.write_rom([[0x4C, 0x00, 0xF0]])
+        cart = cartridge.GenericCartridge(rom_name, 1, 0x1000, 0xFF9, 0)
+        path = recompile.module_path(rom_name)
+        source = recompile.write_module(cart, rom_name)
+
+        # Modules for another version aren't run.
+        with open(path, 'w') as module_file:
+            module_file.write('VERSION = %d\nraise RuntimeError()\n' % (recompile.VERSION - 1))
+        self.assertEqual(list(recompile.load(cart, rom_name).keys()), [0x0])
+
+        # Partially written modules are recompiled.
+        with open(path, 'w') as module_file:
+            module_file.write(source[:len(source) // 2])
+        self.assertEqual(list(recompile.load(cart, rom_name).keys()), [0x0])
+        with open(path, 'r') as module_file:
+            self.assertEqual(module_file.read(), source)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,5 +13,43 @@ class TestRiot(unittest.TestCase):
         riot_test.write(0x100, 7)
         self.assertEqual(riot_test.read(0x100), 7)
 
+    def test_next_change(self):
+        clock = clocks.Clock()
+        riot_test = riot.Riot(clock, inputs.Input())
+        # TIM8T, then read INTIM and TIMINT through and past expiration.
+        riot_test.write(0x215, 5)
+        for addr in (0x204, 0x205):
+            for start in range(0, 5 * 8 * 3 + 40):
+                value = riot_test.peek(addr, start)
+                change = riot_test.next_change(addr, start)
+                self.assertTrue(change > start)
+                for now in range(start, min(change, 200)):
+                    self.assertEqual(riot_test.peek(addr, now), value)
+                if change < 200:
+                    self.assertNotEqual(riot_test.peek(addr, change), value)
+
+        clock.system_clock = 50
+        self.assertEqual(riot_test.read(0x204), riot_test.peek(0x204, 50))
+
+    def test_ram_state(self):
+        clock = clocks.Clock()
+        riot_test = riot.Riot(clock, inputs.Input())
+        ram = riot_test.ram
+        riot_test.write(0x80, 0x1FF)
+        self.assertEqual(riot_test.read(0x80), 0xFF)
+
+        # Restoring a state updates the shared ram in place.
+        state = riot_test.get_save_state()
+        riot_test.write(0x80, 3)
+        riot_test.set_save_state(state)
+        self.assertTrue(riot_test.ram is ram)
+        self.assertEqual(ram[0], 0xFF)
+
+        # Ram is saved as base64 text, lists of older states are restored.
+        self.assertEqual(state['ram'], '/w' + 'A' * 169 + '=')
+        state['ram'] = [7] * 128
+        riot_test.set_save_state(state)
+        self.assertEqual(ram, bytearray([7] * 128))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,35 @@
+from .test_translator import CoreHarness, DummyCartridge
+import unittest
+
+class TestRiotRam(unittest.TestCase):
+
+    # Zero page, indexed and indirect accesses, to the ram and to the TIA
+    # mirrors next to it.
+    #        LDX #$10; LDY #2; LDA #$33; STA $80; ADC $80
+    #        STA $70,X; STA $F8,X
+    #        LDA #$84; STA $90; LDA #0; STA $91; INC $86
+    #        LDA ($90),Y; LDA ($80,X); STA $FF; LDA ($FF),Y
+    #        LDX #$7F; LDA ($80,X); PHA; PLA
+    #        LDX #$40; TXS; PHA; PLA; LDA $90,X
+    # end:   JMP end
+    PROGRAM = [0xA2, 0x10, 0xA0, 0x02, 0xA9, 0x33, 0x85, 0x80, 0x65, 0x80,
+               0x95, 0x70, 0x95, 0xF8,
+               0xA9, 0x84, 0x85, 0x90, 0xA9, 0x00, 0x85, 0x91, 0xE6, 0x86,
+               0xB1, 0x90, 0xA1, 0x80, 0x85, 0xFF, 0xB1, 0xFF,
+               0xA2, 0x7F, 0xA1, 0x80, 0x48, 0x68,
+               0xA2, 0x40, 0x9A, 0x48, 0x68, 0xB5, 0x90,
+               0x4C, 0x2D, 0xF0]
+    END = 0xF02D
+
+    def run_program(self, translate, direct):
+        harness = CoreHarness(DummyCartridge(self.PROGRAM), translate=translate,
+                              with_riot=True, direct_ram=direct)
+        harness.run_to(self.END)
+        return harness.result() + (list(harness.riot.ram),)
+
+    def test_matches_memory(self):
+        for translate in (True, False):
+            self.assertEqual(self.run_program(translate, True), self.run_program(translate, False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import pytari2600.cpu.core as core
+import pytari2600.cpu.pc_state as pc_state
+import pytari2600.cpu_gen.core as gen_core
+import pytari2600.cpu_gen.pc_state as gen_pc_state
+from .test_translator import CoreHarness, DummyCartridge
+import unittest
+
+class TestSpinLoop(unittest.TestCase):
+
+    # LDA #10; STA TIM64T
+    # loop:  LDA INTIM; BNE loop
+    #        LDA #3; STA TIM8T
+    # loop2: BIT TIMINT; BPL loop2
+    # end:   JMP end
+    PROGRAM = [0xA9, 0x0A, 0x8D, 0x96, 0x02,
+               0xAD, 0x84, 0x02, 0xD0, 0xFB,
+               0xA9, 0x03, 0x8D, 0x95, 0x02,
+               0x2C, 0x85, 0x02, 0x10, 0xFB,
+               0x4C, 0x14, 0xF0]
+    END = 0xF014
+
+    def create(self, cpu_module, state_module):
+        return CoreHarness(DummyCartridge(self.PROGRAM), cpu_module, state_module, with_riot=True)
+
+    def run_program(self, cpu_module, state_module):
+        harness = self.create(cpu_module, state_module)
+        harness.run_to(self.END)
+        return (harness.cpu, harness.clocks.system_clock, harness.pc_state.get_save_state())
+
+    def test_matches_cpu(self):
+        (cpu, clock, state) = self.run_program(gen_core, gen_pc_state)
+        (ref_cpu, ref_clock, ref_state) = self.run_program(core, pc_state)
+
+        self.assertEqual(clock, ref_clock)
+        self.assertEqual(state, ref_state)
+        self.assertTrue(cpu.spin_iterations_skipped > 0)
+
+    def test_stop_in_loop(self):
+        # Stopping part way through either loop leaves the registers and
+        # flags as the last skipped read set them.
+        for limit in (300, 1000, 1900, 2000, 2030, 2100):
+            harness = self.create(gen_core, gen_pc_state)
+            harness.cpu.run(limit)
+            clock = harness.clocks.system_clock
+            ref = self.create(core, pc_state)
+            ref.cpu.run(limit)
+            ref.cpu.run_until(lambda: ref.clocks.system_clock >= clock)
+
+            self.assertEqual(harness.result(), ref.result())
+
+if __name__ == '__main__':
+    unittest.main()
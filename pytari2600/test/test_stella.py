@@ -23,6 +23,56 @@ class TestCollisions(unittest.TestCase):
         self.assertEqual(collisions._cxblpf, 0x80)
         self.assertEqual(collisions._cxppmm, 0xC0)
 
+    def test_lazy_collisions(self):
+        collisions = stella.CollisionState()
+        # p0 and the playfield overlap on pixel 3, only drawn up to pixel 2
+        # by the first scan.
+        objects = (0x0C, 0, 0, 0, 0, 0x03 | 0x08)
+        collisions.add_scan(objects, 0x07)
+        collisions.resolve()
+        self.assertEqual(collisions._cxpfb, [0, 0])
+
+        collisions.add_scan(objects, 0x0F)
+        self.assertEqual(collisions._cxpfb, [0, 0])
+        self.assertEqual(collisions.get_save_state()['cxpfb'], [0x80, 0])
+
+        # Scans before a clear don't collide.
+        collisions.add_scan(objects, 0x0F)
+        collisions.clear()
+        collisions.resolve()
+        self.assertEqual(collisions._cxpfb, [0, 0])
+
+        # Scans are latched before too many are held.
+        for i in range(stella.CollisionState.MAX_PENDING):
+            collisions.add_scan(objects, 0x0F)
+        self.assertEqual(collisions._cxpfb, [0x80, 0])
+
+    def test_line_cache(self):
+        line_cache = stella.LineCache()
+        lines = [[y] * stella.Stella.FRAME_WIDTH for y in range(4)]
+
+        # Line 0 changes mid-line, line 1 is completed with key 'b'.
+        line_cache.drawn('a', lines, 0, 0, 0)
+        line_cache.drawn('b', lines, 0, 2, 50)
+        self.assertEqual(line_cache.get('a'), None)
+        self.assertEqual(line_cache.get('b'), lines[1])
+
+        # Line 2 is drawn with 'c' over two scans, line 3 changes mid-line.
+        line_cache.drawn('c', lines, 2, 2, 0)
+        line_cache.drawn('c', lines, 2, 3, 80)
+        line_cache.drawn('d', lines, 3, 4, 80)
+        self.assertEqual(line_cache.get('c'), lines[2])
+        self.assertEqual(line_cache.get('d'), None)
+
+        self.assertEqual((line_cache.hits, line_cache.misses), (2, 2))
+        self.assertEqual(line_cache.hit_rate(), 0.5)
+
+        # Least recently used lines are dropped.
+        for i in range(stella.LineCache.MAX_LINES):
+            line_cache.drawn(i, lines, 0, 1, 0)
+        self.assertEqual(line_cache.get('b'), None)
+        self.assertEqual(line_cache.get(stella.LineCache.MAX_LINES - 1), lines[0])
+
     def test_colors(self):
         """ Test color lookup. """
         c = pygamestella.PygameColors()
@@ -98,6 +148,18 @@ class TestDrawing(unittest.TestCase):
 
         return drawn
 
+    def test_scan_bits(self):
+        scan = [False] * stella.Stella.FRAME_WIDTH
+        scan[0] = True
+        scan[3] = True
+        scan[159] = True
+        bits = stella.scan_to_bits(scan)
+        self.assertEqual(bits, 0x9 | (1 << 159))
+        self.assertEqual(stella.bits_to_scan(bits), scan)
+        # Pixels moved off the right of the line wrap to the left.
+        self.assertEqual(stella.rotate_bits(bits, 1), 0x13)
+        self.assertEqual(stella.rotate_bits(bits, 161), 0x13)
+
     def test_update_player(self):
         test_clocks = clocks.Clock()
         test_input = inputs.Input()
@@ -0,0 +1,140 @@
+import pytari2600.cpu_gen.core as core
+import pytari2600.cpu_gen.pc_state as pc_state
+import pytari2600.memory.memory as memory
+import pytari2600.memory.riot as riot
+import pytari2600.clocks as clocks
+import pytari2600.inputs as inputs
+import unittest
+
+class DummyCartridge(object):
+    def __init__(self, program):
+        self.rom = bytearray(0x1000)
+        self.rom[0:len(program)] = bytearray(program)
+        # Reset vector
+        self.rom[0xFFC] = 0x00
+        self.rom[0xFFD] = 0xF0
+
+    def get_absolute_address(self, address):
+        return address & 0xFFF
+
+    def read(self, address):
+        return self.rom[address & 0xFFF]
+
+    def write(self, address, data):
+        pass
+
+class DummyDevice(object):
+    """ Records each access, with the clock and 'PC' it happened at. """
+    def __init__(self, clocks, pc_state):
+        self.clocks   = clocks
+        self.pc_state = pc_state
+        self.data     = {}
+        self.log      = []
+
+    def read(self, address):
+        self.log.append(('r', address, self.clocks.system_clock, self.pc_state.PC))
+        return self.data.get(address, address & 0xFF)
+
+    def write(self, address, data):
+        self.log.append(('w', address, data, self.clocks.system_clock, self.pc_state.PC))
+        self.data[address] = data
+
+class CoreHarness(object):
+    """ Core running 'cartridge', with a 'device_class' device for the TIA
+    and for the RIOT (a 'riot.Riot' if 'with_riot'). 'direct_ram' false
+    sends every RIOT ram access through 'Memory.read'/'Memory.write'. """
+    def __init__(self, cartridge, core_module=core, state_module=pc_state,
+                 translate=True, fuse=True, with_riot=False,
+                 device_class=DummyDevice, direct_ram=True):
+        self.clocks   = clocks.Clock()
+        self.pc_state = state_module.PC_State()
+        self.device   = device_class(self.clocks, self.pc_state)
+        self.memory   = memory.Memory()
+        self.memory.set_cartridge(cartridge)
+        if with_riot:
+            self.riot = riot.Riot(self.clocks, inputs.Input())
+        else:
+            self.riot = self.device
+        self.memory.set_riot(self.riot)
+        self.memory.set_stella(self.device)
+        if not direct_ram:
+            self.memory.ram = None
+
+        self.cpu = core_module.Core(self.clocks, self.memory, self.pc_state)
+        if not translate:
+            self.cpu.translator = None
+        if not fuse:
+            self.cpu.fuse_instructions = False
+        self.cpu.initialise()
+        self.cpu.reset()
+        self.pc_state.S.set_value(0xFF)
+
+    def run_to(self, pc):
+        self.cpu.run_until(lambda: self.pc_state.PC == pc)
+
+    def result(self):
+        """ Clock, registers and device accesses, for comparing runs. """
+        return (self.clocks.system_clock, self.pc_state.get_save_state(), self.device.log)
+
+class TestTranslator(unittest.TestCase):
+
+    # LDX #5; LDY #2
+    # loop: LDA $80,X; ADC #3; STA $90,X; LDA ($84),Y; STA $1B; PHA; PLA
+    #       STA $02; DEX; BNE loop
+    # end:  JMP end
+    PROGRAM = [0xA2, 0x05, 0xA0, 0x02,
+               0xB5, 0x80, 0x69, 0x03, 0x95, 0x90, 0xB1, 0x84, 0x85, 0x1B,
+               0x48, 0x68, 0x85, 0x02, 0xCA, 0xD0, 0xEF,
+               0x4C, 0x15, 0xF0]
+    END = 0xF015
+
+    def run_program(self, translate, run=None):
+        harness = CoreHarness(DummyCartridge(self.PROGRAM), translate=translate)
+        if run is None:
+            while harness.pc_state.PC != self.END:
+                harness.cpu.step()
+        else:
+            run(harness.cpu, harness.pc_state)
+        return (harness.cpu,) + harness.result()
+
+    def test_matches_decoder(self):
+        (translated, clock, state, log) = self.run_program(True)
+        (decoded, ref_clock, ref_state, ref_log) = self.run_program(False)
+
+        self.assertEqual(clock, ref_clock)
+        self.assertEqual(state, ref_state)
+        self.assertEqual(log, ref_log)
+        self.assertTrue(translated.translator.blocks_compiled > 0)
+
+    def test_rom_window(self):
+        (cpu, clock, state, log) = self.run_program(True)
+        # Hot spots and vectors are left to the instruction decoder.
+        self.assertEqual(cpu.translator.translate(0xFFE0), None)
+        # Only cartridge addresses are translated.
+        self.assertEqual(cpu.translator.translate(0x0080), None)
+
+    def test_run(self):
+        (cpu, clock, state, log) = self.run_program(True)
+        (run_cpu, run_clock, run_state, run_log) = self.run_program(True,
+                lambda cpu, state: cpu.run_until(lambda: state.PC == self.END))
+        self.assertEqual(run_clock, clock)
+        self.assertEqual(run_state, state)
+        self.assertEqual(run_log, log)
+
+        # Stops on the first instruction to reach the clock budget.
+        (run_cpu, run_clock, run_state, run_log) = self.run_program(True,
+                lambda cpu, state: cpu.run(200))
+        self.assertTrue(run_clock >= 200)
+        self.assertTrue(run_clock < 200 + 7 * 3 * 32)
+
+    def test_lazy_decoders(self):
+        (cpu, clock, state, log) = self.run_program(True)
+        # Sized to the cartridge, only executed addresses have decoders.
+        self.assertEqual(len(cpu.op_decoder), 0x1000)
+        (decoders, size) = cpu.get_memory_usage()
+        self.assertEqual(decoders, len([d for d in cpu.op_decoder if d is not cpu.lazy_decoder]))
+        self.assertTrue(0 < decoders < 16)
+        self.assertTrue(size > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,20 @@ from .test.test_addressing   import *
 from .test.test_input        import *
 from .test.test_instructions import *
 from .test.test_tiasound     import *
+from .test.test_translator   import *
+from .test.test_cpu_flat     import *
+from .test.test_alu          import *
+from .test.test_gen_pc_state import *
+from .test.test_clocks       import *
+from .test.test_spin_loop    import *
+from .test.test_cache        import *
+from .test.test_fusion       import *
+from .test.test_recompile    import *
+from .test.test_bank_decoders import *
+from .test.test_riot_ram     import *
+from .test.test_bound_writes import *
+from .test.test_detect      import *
+from .test.test_compositor  import *
 import unittest
 
 if __name__ == '__main__':
@@ -8,6 +8,9 @@ setup(name='pytari2600',
                 'pytari2600.memory',
                 'pytari2600.cpu',
                 'pytari2600.cpu_gen',
+                'pytari2600.cpu_flat',
+                'pytari2600.cpu_static',
+                'pytari2600.cpu_fused',
                 'pytari2600.graphics',
                 'pytari2600.test',
                 'pytari2600.audio'],